@@ -0,0 +1,348 @@
+"""
+Admission control for the tool routes.
+
+AdmissionMiddleware sits in front of /tools/* and /mcp and decides whether to
+run each request, in O(1) time and memory per request:
+
+  1. per-client token bucket (client = peer IP, see client_id())         -> 429
+  2. per-tool token bucket (keyed by the tool's endpoint)                -> 429
+     REST calls are checked here; calls by tool name (/tools/batch items,
+     MCP tools/call, /ws) take from the same bucket in the registry's
+     dispatch path, see admit_tool()
+  3. a cap on requests in flight, with a bounded FIFO wait queue         -> 503
+
+Rejections are answered immediately, before any parsing or tool work, with a
+Retry-After header. Requests that wait in the queue longer than the queue
+timeout get 503 as well, so a request is either admitted quickly or turned
+away quickly. That keeps tail latency flat for admitted requests under
+overload instead of letting every caller's latency grow.
+
+Clients are keyed by their peer IP address. Headers naming a client
+(X-Client-Id, X-Forwarded-For) are only believed from the reverse proxies
+listed in MCP_TRUSTED_PROXIES; from anyone else they would let a caller pick
+a fresh bucket for every request.
+
+All state is in process memory and touched only from the event loop, so
+no locks are needed. With several workers each one enforces its own limits.
+
+Configure with environment variables (rates in requests/second, 0 = no limit):
+  MCP_LIMIT_CLIENT_RATE     per-client rate, default 0
+  MCP_LIMIT_CLIENT_BURST    per-client bucket size, default max(1, rate)
+  MCP_LIMIT_TOOL_RATE       per-tool rate for every tool, default 0
+  MCP_LIMIT_TOOL_BURST      per-tool bucket size, default max(1, rate)
+  MCP_LIMIT_TOOLS           per-tool overrides, e.g. "analyze-text=50:100,sqrt=500"
+  MCP_LIMIT_MAX_IN_FLIGHT   default 256 (0 disables the cap)
+  MCP_LIMIT_QUEUE           requests allowed to wait for a slot, default 256
+  MCP_LIMIT_QUEUE_TIMEOUT   seconds a request may wait, default 1.0
+  MCP_TRUSTED_PROXIES       proxy addresses or networks whose client headers are
+                            honoured, e.g. "127.0.0.1,10.0.0.0/8"; default none
+"""
+
+from collections import OrderedDict, deque
+import asyncio
+import ipaddress
+import json
+import math
+import os
+import time
+
+PREFIXES = ("/tools/", "/mcp")
+
+
+class TokenBucket:
+    __slots__ = ("rate", "burst", "tokens", "stamp")
+
+    def __init__(self, rate, burst, now):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.stamp = now
+
+    def take(self, now):
+        """Take one token; returns 0 on success, else seconds until one is available."""
+        tokens = min(self.burst, self.tokens + (now - self.stamp) * self.rate)
+        self.stamp = now
+        if tokens >= 1:
+            self.tokens = tokens - 1
+            return 0.0
+        self.tokens = tokens
+        return (1 - tokens) / self.rate
+
+
+class BucketTable:
+    """Token buckets by key, evicting the least recently used beyond max_keys.
+
+    An evicted bucket was idle for longest and would likely be full again, so
+    evicting it changes nothing but memory use.
+    """
+
+    def __init__(self, max_keys=10000):
+        self.max_keys = max_keys
+        self.buckets = OrderedDict()
+
+    def take(self, key, rate, burst, now):
+        bucket = self.buckets.get(key)
+        if bucket is None:
+            bucket = self.buckets[key] = TokenBucket(rate, burst, now)
+            if len(self.buckets) > self.max_keys:
+                self.buckets.popitem(last=False)
+        else:
+            self.buckets.move_to_end(key)
+        return bucket.take(now)
+
+
+def _parse_networks(spec):
+    """Parse "address-or-network,..." into ip_network objects."""
+    return tuple(ipaddress.ip_network(item.strip(), strict=False) for item in spec.split(",") if item.strip())
+
+
+def _parse_limits(spec):
+    """Parse "tool=rate[:burst],..." into {tool: (rate, burst)}."""
+    limits = {}
+    for item in spec.split(","):
+        if not item.strip():
+            continue
+        name, _, value = item.partition("=")
+        rate, _, burst = value.partition(":")
+        rate = float(rate)
+        limits[name.strip()] = (rate, float(burst) if burst else max(1.0, rate))
+    return limits
+
+
+class AdmissionControl:
+    """Limits and counters shared by the middleware and the stats endpoints."""
+
+    def __init__(self, client_rate=0.0, client_burst=None, tool_rate=0.0, tool_burst=None,
+                 tool_limits=None, max_in_flight=256, max_queue=256, queue_timeout=1.0,
+                 max_clients=10000, trusted_proxies=()):
+        self.client_rate = client_rate
+        self.client_burst = client_burst or max(1.0, client_rate)
+        self.tool_rate = tool_rate
+        self.tool_burst = tool_burst or max(1.0, tool_rate)
+        self.tool_limits = tool_limits or {}
+        self.max_in_flight = max_in_flight
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.clients = BucketTable(max_clients)
+        self.trusted_proxies = tuple(trusted_proxies)
+        self.tools = BucketTable()
+        # endpoint -> (rate, burst), filled in by bind() once tool routes are known
+        self.paths = {}
+        # tool name -> endpoint, for the tools with a limit
+        self.endpoints = {}
+        self.in_flight = 0
+        self.waiting = 0
+        self.waiters = deque()
+        self.admitted = 0
+        self.queued = 0
+        self.rejected = {"client_rate": 0, "tool_rate": 0, "queue_full": 0, "queue_timeout": 0}
+
+    @classmethod
+    def from_env(cls):
+        env = os.environ.get
+        return cls(
+            client_rate=float(env("MCP_LIMIT_CLIENT_RATE", 0)),
+            client_burst=float(env("MCP_LIMIT_CLIENT_BURST", 0)) or None,
+            tool_rate=float(env("MCP_LIMIT_TOOL_RATE", 0)),
+            tool_burst=float(env("MCP_LIMIT_TOOL_BURST", 0)) or None,
+            tool_limits=_parse_limits(env("MCP_LIMIT_TOOLS", "")),
+            max_in_flight=int(env("MCP_LIMIT_MAX_IN_FLIGHT", 256)),
+            max_queue=int(env("MCP_LIMIT_QUEUE", 256)),
+            queue_timeout=float(env("MCP_LIMIT_QUEUE_TIMEOUT", 1.0)),
+            trusted_proxies=_parse_networks(env("MCP_TRUSTED_PROXIES", "")),
+        )
+
+    def bind(self, registry):
+        """Resolve per-tool limits to endpoints; only known tool paths get buckets.
+
+        Also hooks admit_tool into the registry, so calls dispatched by tool
+        name are limited like the REST routes.
+        """
+        self.paths = {}
+        for spec in registry.specs:
+            limit = self.tool_limits.get(spec.name) or self.tool_limits.get(spec.endpoint)
+            if limit is None and self.tool_rate:
+                limit = (self.tool_rate, self.tool_burst)
+            if limit is not None and limit[0] > 0:
+                self.paths[spec.endpoint] = limit
+        self.endpoints = {spec.name: spec.endpoint for spec in registry.specs if spec.endpoint in self.paths}
+        registry.admit = self.admit_tool
+
+    def trusted(self, host):
+        try:
+            address = ipaddress.ip_address(host)
+        except ValueError:
+            return False
+        return any(address in network for network in self.trusted_proxies)
+
+    def client_id(self, scope):
+        """The per-client bucket key: the peer IP address, unless the peer is a
+        trusted proxy, which names the client with X-Client-Id or X-Forwarded-For."""
+        client = scope.get("client")
+        peer = client[0] if client else "unknown"
+        if not self.trusted_proxies or not self.trusted(peer):
+            return peer
+        forwarded = []
+        for name, value in scope["headers"]:
+            if name == b"x-client-id":
+                return value.decode("latin-1")
+            if name == b"x-forwarded-for":
+                forwarded.extend(value.decode("latin-1").split(","))
+        # The nearest address that is not a trusted proxy; anything further
+        # left was written by the caller and could be forged
+        for address in reversed(forwarded):
+            address = address.strip()
+            if address and not self.trusted(address):
+                return address
+        return peer
+
+    def check_rate(self, client, path, now):
+        """Return (reason, retry_after) if a token bucket rejects the request, else None."""
+        return self.check_client(client, now) or self.check_tool(path, now)
+
+    def check_client(self, client, now):
+        if self.client_rate:
+            wait = self.clients.take(client, self.client_rate, self.client_burst, now)
+            if wait:
+                self.rejected["client_rate"] += 1
+                return "client_rate", wait
+        return None
+
+    def check_tool(self, path, now):
+        limit = self.paths.get(path)
+        if limit is not None:
+            wait = self.tools.take(path, limit[0], limit[1], now)
+            if wait:
+                self.rejected["tool_rate"] += 1
+                return "tool_rate", wait
+        return None
+
+    def admit_tool(self, name):
+        """The per-tool check for a call by tool name: (status, error record) or None."""
+        path = self.endpoints.get(name)
+        if path is None:
+            return None
+        rejected = self.check_tool(path, time.monotonic())
+        if rejected is None:
+            return None
+        reason, retry_after = rejected
+        status, error = rejection(reason)
+        return status, {**error, "retry_after": max(1, math.ceil(retry_after))}
+
+    async def acquire(self):
+        """Take an in-flight slot, waiting in FIFO order; returns the rejection reason or None."""
+        if self.in_flight < self.max_in_flight:
+            self.in_flight += 1
+            return None
+        if self.waiting >= self.max_queue:
+            self.rejected["queue_full"] += 1
+            return "queue_full"
+        waiter = asyncio.get_running_loop().create_future()
+        self.waiters.append(waiter)
+        self.waiting += 1
+        self.queued += 1
+        try:
+            # release() hands its slot straight to the waiter, so in_flight is already counted
+            await asyncio.wait_for(waiter, self.queue_timeout)
+        except asyncio.TimeoutError:
+            self.rejected["queue_timeout"] += 1
+            return "queue_timeout"
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                self.release()
+            raise
+        finally:
+            self.waiting -= 1
+        return None
+
+    def release(self):
+        while self.waiters:
+            waiter = self.waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.in_flight -= 1
+
+    def info(self):
+        return {
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            "admitted": self.admitted,
+            "queued": self.queued,
+            "rejected": dict(self.rejected),
+            "limits": {
+                "client_rate": self.client_rate,
+                "client_burst": self.client_burst,
+                "tools": {path: {"rate": rate, "burst": burst} for path, (rate, burst) in self.paths.items()},
+                "max_in_flight": self.max_in_flight,
+                "max_queue": self.max_queue,
+                "queue_timeout": self.queue_timeout,
+                "trusted_proxies": [str(network) for network in self.trusted_proxies],
+            },
+        }
+
+
+_MESSAGES = {
+    "client_rate": "Client rate limit exceeded",
+    "tool_rate": "Tool rate limit exceeded",
+    "queue_full": "Server is overloaded",
+    "queue_timeout": "Server is overloaded",
+}
+
+
+def rejection(reason):
+    """(HTTP status, error body) for a request turned away for `reason`."""
+    status = 429 if reason in ("client_rate", "tool_rate") else 503
+    return status, {"error": _MESSAGES[reason], "reason": reason}
+
+
+class AdmissionMiddleware:
+    """Pure ASGI middleware applying an AdmissionControl to the tool routes."""
+
+    def __init__(self, app, control, prefixes=PREFIXES):
+        self.app = app
+        self.control = control
+        self.prefixes = prefixes
+
+    async def reject(self, send, reason, retry_after):
+        status, error = rejection(reason)
+        body = json.dumps(error).encode()
+        await send({
+            "type": "http.response.start",
+            "status": status,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(max(1, math.ceil(retry_after))).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not scope["path"].startswith(self.prefixes):
+            await self.app(scope, receive, send)
+            return
+
+        control = self.control
+        rejected = control.check_rate(control.client_id(scope), scope["path"], time.monotonic())
+        if rejected is not None:
+            await self.reject(send, *rejected)
+            return
+        if not control.max_in_flight:
+            control.admitted += 1
+            await self.app(scope, receive, send)
+            return
+
+        reason = await control.acquire()
+        if reason is not None:
+            await self.reject(send, reason, control.queue_timeout)
+            return
+        control.admitted += 1
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            control.release()
+
+
+# The admission control shared by the app and its stats endpoints
+admission = AdmissionControl.from_env()
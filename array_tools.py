@@ -0,0 +1,276 @@
+"""
+Array (vectorized) variants of the numeric MCP tools.
+
+Each endpoint takes whole columns of numbers instead of scalars, either as
+JSON lists or as a compact binary body of little-endian float64 values, and
+computes the result with NumPy kernels. Rounding matches the scalar tools in
+main.py exactly (Python's round() semantics).
+"""
+
+from fastapi import APIRouter, Request
+from fastapi.responses import JSONResponse, Response
+import numpy as np
+
+from registry import tool
+from units import CELSIUS_TO_FAHRENHEIT, CELSIUS_TO_KELVIN, UnitError, apply_conversion, conversion, unit_symbol
+
+router = APIRouter()
+
+BINARY_MEDIA_TYPE = "application/octet-stream"
+FLOAT64_LE = np.dtype("<f8")
+
+# Array add works in int64; keep inputs small enough that a + b cannot overflow.
+_INT_LIMIT = 2 ** 62
+# Integers parsed as float64 (binary bodies, JSON lists mixing in floats) are
+# only exact below this
+_FLOAT_INT_LIMIT = 2 ** 53
+
+
+class ArrayInputError(ValueError):
+    """Raised when an array request body cannot be turned into columns."""
+
+
+def round_like_python(values, ndigits):
+    """Round a float array exactly like Python's round(x, ndigits).
+
+    np.round scales by 10**ndigits before rounding, which can land on the
+    wrong side of a tie. Elements whose scaled value sits near .5 are
+    re-rounded with Python's correctly-rounded round(); the rest keep the
+    vectorized result.
+    """
+    rounded = np.round(values, ndigits)
+    with np.errstate(invalid="ignore", over="ignore"):
+        scaled = values * (10.0 ** ndigits)
+        frac = np.abs(scaled - np.trunc(scaled))
+        suspect = np.abs(frac - 0.5) < 1e-7 + np.abs(scaled) * 1e-12
+    for i in np.flatnonzero(suspect):
+        rounded[i] = round(float(values[i]), ndigits)
+    return rounded
+
+
+# ----- Kernels -----
+
+def add_kernel(a, b):
+    return a + b
+
+
+def multiply_kernel(a, b):
+    return a * b
+
+
+def temp_convert_kernel(celsius):
+    # Same conversion table as temp_convert_tool so results are bit-identical
+    fahrenheit = apply_conversion(CELSIUS_TO_FAHRENHEIT, celsius)
+    kelvin = apply_conversion(CELSIUS_TO_KELVIN, celsius)
+    return round_like_python(fahrenheit, 2), round_like_python(kelvin, 2)
+
+
+def sqrt_kernel(number):
+    valid = number >= 0
+    roots = np.full(number.shape, np.nan)
+    np.sqrt(number, out=roots, where=valid)
+    return round_like_python(roots, 4), valid
+
+
+# ----- Request / response helpers -----
+
+def _json_column(values, integers):
+    """A JSON list as a float64 column, or as int64 when `integers` and every value is an int."""
+    if integers:
+        column = np.asarray(values)
+        if column.dtype.kind == "i":
+            return column.astype(np.int64, copy=False)
+        if column.dtype.kind == "u" or (column.dtype.kind == "O" and all(isinstance(v, int) for v in values)):
+            # Beyond int64
+            raise ArrayInputError("Array mode supports integers up to 2**62 in magnitude")
+    return np.asarray(values, dtype=np.float64)
+
+
+async def read_columns(request, names, integers=False):
+    """Read equal-length float64 columns from a JSON or binary request body.
+
+    JSON bodies are objects with one list per column name. Binary bodies are
+    the columns back to back as little-endian float64, in `names` order.
+    With `integers`, JSON lists of integers become int64 columns instead, so
+    values above 2**53 keep every digit.
+    """
+    content_type = request.headers.get("content-type", "")
+    if content_type.startswith(BINARY_MEDIA_TYPE):
+        raw = await request.body()
+        if len(raw) % (FLOAT64_LE.itemsize * len(names)):
+            raise ArrayInputError(
+                f"Binary body must hold {len(names)} equal-length float64 column(s)"
+            )
+        flat = np.frombuffer(raw, dtype=FLOAT64_LE)
+        return [column.astype(np.float64) for column in np.split(flat, len(names))]
+
+    try:
+        body = await request.json()
+    except ValueError:
+        raise ArrayInputError("Request body must be JSON or little-endian float64 binary")
+    if not isinstance(body, dict):
+        raise ArrayInputError(f"Expected a JSON object with list fields: {', '.join(names)}")
+
+    columns = []
+    for name in names:
+        values = body.get(name)
+        if not isinstance(values, list):
+            raise ArrayInputError(f"'{name}' must be a list of numbers")
+        try:
+            columns.append(_json_column(values, integers))
+        except ArrayInputError:
+            raise
+        except (TypeError, ValueError):
+            raise ArrayInputError(f"'{name}' must be a list of numbers")
+        if columns[-1].ndim != 1:
+            raise ArrayInputError(f"'{name}' must be a flat list of numbers")
+        if not np.all(np.isfinite(columns[-1])):
+            raise ArrayInputError(f"'{name}' must contain only finite numbers")
+    if any(len(column) != len(columns[0]) for column in columns):
+        raise ArrayInputError(f"Columns {', '.join(names)} must have the same length")
+    return columns
+
+
+def wants_binary(request):
+    return BINARY_MEDIA_TYPE in request.headers.get("accept", "")
+
+
+def binary_response(columns):
+    """Return result columns back to back as little-endian float64."""
+    names = list(columns)
+    payload = b"".join(np.ascontiguousarray(columns[n], dtype=FLOAT64_LE).tobytes() for n in names)
+    length = len(columns[names[0]]) if names else 0
+    return Response(
+        payload,
+        media_type=BINARY_MEDIA_TYPE,
+        headers={"X-Columns": ",".join(names), "X-Length": str(length)},
+    )
+
+
+def input_error(e):
+    return JSONResponse({"error": str(e)}, status_code=422)
+
+
+# ----- Endpoints -----
+
+@router.post("/tools/add/array")
+@tool("add-array", "Adds two columns of integers element-wise", params={
+    "a": {"type": "array", "description": "First column of integers", "required": True},
+    "b": {"type": "array", "description": "Second column of integers", "required": True},
+})
+async def add_array_tool(request: Request):
+    """
+    MCP Tool: Adds two columns of integers element-wise.
+    """
+    try:
+        a, b = await read_columns(request, ["a", "b"], integers=True)
+    except ArrayInputError as e:
+        return input_error(e)
+    for column in (a, b):
+        if column.dtype.kind == "f":
+            if not np.all(column == np.trunc(column)):
+                return input_error("'a' and 'b' must contain only integers")
+            if np.any(np.abs(column) >= _FLOAT_INT_LIMIT):
+                # Already rounded when parsed as float64; the sum would be silently off
+                return input_error("Integers of 2**53 or more must be sent as a JSON list of integers only")
+        elif np.any((column >= _INT_LIMIT) | (column <= -_INT_LIMIT)):
+            return input_error("Array mode supports integers up to 2**62 in magnitude")
+    result = add_kernel(a.astype(np.int64), b.astype(np.int64))
+    if wants_binary(request):
+        return binary_response({"result": result})
+    return {"operation": "addition", "count": len(result), "result": result.tolist()}
+
+
+@router.post("/tools/multiply/array")
+@tool("multiply-array", "Multiplies two columns of numbers element-wise", params={
+    "a": {"type": "array", "description": "First column of numbers", "required": True},
+    "b": {"type": "array", "description": "Second column of numbers", "required": True},
+})
+async def multiply_array_tool(request: Request):
+    """
+    MCP Tool: Multiplies two columns of numbers element-wise.
+    """
+    try:
+        a, b = await read_columns(request, ["a", "b"])
+    except ArrayInputError as e:
+        return input_error(e)
+    result = multiply_kernel(a, b)
+    if wants_binary(request):
+        return binary_response({"result": result})
+    return {"operation": "multiplication", "count": len(result), "result": result.tolist()}
+
+
+@router.post("/tools/temp-convert/array")
+@tool("temp-convert-array", "Converts a column of Celsius values to Fahrenheit and Kelvin", params={
+    "celsius": {"type": "array", "description": "Column of temperatures in Celsius", "required": True},
+})
+async def temp_convert_array_tool(request: Request):
+    """
+    MCP Tool: Converts a column of Celsius values to Fahrenheit and Kelvin.
+    """
+    try:
+        (celsius,) = await read_columns(request, ["celsius"])
+    except ArrayInputError as e:
+        return input_error(e)
+    fahrenheit, kelvin = temp_convert_kernel(celsius)
+    if wants_binary(request):
+        return binary_response({"fahrenheit": fahrenheit, "kelvin": kelvin})
+    return {
+        "count": len(celsius),
+        "fahrenheit": fahrenheit.tolist(),
+        "kelvin": kelvin.tolist(),
+    }
+
+
+@router.post("/tools/convert/array")
+@tool("convert-array", "Converts a column of values from one unit to another", params={
+    "value": {"type": "array", "description": "Column of values to convert", "required": True},
+    "from_unit": {"type": "string", "description": "Query param: unit of the values, e.g. 'km'", "required": True},
+    "to_unit": {"type": "string", "description": "Query param: unit to convert to", "required": True},
+})
+async def convert_array_tool(request: Request):
+    """
+    MCP Tool: Converts a column of values between units.
+
+    The units are query parameters, so JSON and binary bodies carry only
+    the column; no rounding is applied, as with the scalar convert tool.
+    """
+    units = [request.query_params.get(name) for name in ("from_unit", "to_unit")]
+    if None in units:
+        return input_error("'from_unit' and 'to_unit' query parameters are required")
+    try:
+        source, target = unit_symbol(units[0]), unit_symbol(units[1])
+        factors = conversion(source, target)
+        (value,) = await read_columns(request, ["value"])
+    except (UnitError, ArrayInputError) as e:
+        return input_error(e)
+    result = apply_conversion(factors, value)
+    if wants_binary(request):
+        return binary_response({"result": result})
+    return {"from_unit": source, "to_unit": target, "count": len(result), "result": result.tolist()}
+
+
+@router.post("/tools/sqrt/array")
+@tool("sqrt-array", "Calculates square roots of a column of numbers, with a per-element validity mask", params={
+    "number": {"type": "array", "description": "Column of numbers to take square roots of", "required": True},
+})
+async def sqrt_array_tool(request: Request):
+    """
+    MCP Tool: Calculates square roots of a column of numbers.
+
+    Negative inputs do not fail the whole call: their `square_root` is null
+    (NaN in binary mode) and `valid` is false for that element.
+    """
+    try:
+        (number,) = await read_columns(request, ["number"])
+    except ArrayInputError as e:
+        return input_error(e)
+    roots, valid = sqrt_kernel(number)
+    if wants_binary(request):
+        return binary_response({"square_root": roots})
+    return {
+        "count": len(number),
+        "square_root": [r if ok else None for r, ok in zip(roots.tolist(), valid.tolist())],
+        "valid": valid.tolist(),
+        "error_count": int(len(valid) - np.count_nonzero(valid)),
+    }
@@ -0,0 +1,153 @@
+"""
+Preloaded, precompressed response bodies with strong ETags.
+
+An Asset holds a body in memory together with its gzip (and, when the
+optional `brotli` package is installed, brotli) encodings, computed once at
+startup. Each response picks the best encoding the client accepts, carries
+a strong ETag per encoding plus Cache-Control and `Vary: Accept-Encoding`,
+and is answered with 304 Not Modified when If-None-Match already names it.
+Serving an asset does no filesystem access and no compression.
+
+StaticAssets serves a whole directory this way (it replaces StaticFiles for
+/static); the registry's pre-serialized JSON documents are Assets too.
+
+Environment variables:
+  MCP_STATIC_MAX_AGE  seconds browsers may reuse static files without
+                      revalidating, default 0 (always revalidate, 304 if unchanged)
+"""
+
+import gzip
+import hashlib
+import mimetypes
+import os
+
+from starlette.requests import Request
+from starlette.responses import PlainTextResponse, Response
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Bodies smaller than this are not worth compressing
+MIN_COMPRESS_BYTES = 256
+STATIC_MAX_AGE = int(os.environ.get("MCP_STATIC_MAX_AGE", 0))
+
+# Preferred first when a client accepts several encodings equally
+_PREFERENCE = {"br": 2, "gzip": 1, "identity": 0}
+_ENCODING_CACHE_SIZE = 256
+
+
+def cache_control(max_age):
+    return f"public, max-age={max_age}" if max_age else "no-cache"
+
+
+def _accepted(header):
+    """{encoding: q} from an Accept-Encoding header."""
+    accepted = {}
+    for item in header.split(","):
+        coding, _, params = item.partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[coding] = q
+    return accepted
+
+
+class Asset:
+    """A preloaded body and its precompressed encodings."""
+
+    def __init__(self, body, media_type, cache_control="no-cache"):
+        self.media_type = media_type
+        self.cache_control = cache_control
+        tag = hashlib.sha1(body).hexdigest()[:20]
+        # encoding -> (body, strong ETag); each encoding is its own representation
+        self.encodings = {"identity": (body, f'"{tag}"')}
+        if len(body) >= MIN_COMPRESS_BYTES:
+            compressed = {"gzip": gzip.compress(body, compresslevel=9, mtime=0)}
+            if brotli is not None:
+                compressed["br"] = brotli.compress(body, quality=11)
+            for encoding, data in compressed.items():
+                if len(data) < len(body):
+                    self.encodings[encoding] = (data, f'"{tag}-{encoding}"')
+        self._choices = {}
+
+    @property
+    def body(self):
+        return self.encodings["identity"][0]
+
+    @property
+    def etag(self):
+        return self.encodings["identity"][1]
+
+    def choose(self, accept_encoding):
+        """The best available encoding for an Accept-Encoding header value."""
+        choice = self._choices.get(accept_encoding)
+        if choice is None:
+            accepted = _accepted(accept_encoding)
+            wildcard = accepted.get("*", 0.0)
+            best, best_key = "identity", None
+            for encoding in self.encodings:
+                q = accepted.get(encoding, 1.0 if encoding == "identity" else wildcard)
+                if q > 0 and (best_key is None or (q, _PREFERENCE[encoding]) > best_key):
+                    best, best_key = encoding, (q, _PREFERENCE[encoding])
+            choice = best
+            # Clients send a handful of distinct headers; remember their answers
+            if len(self._choices) < _ENCODING_CACHE_SIZE:
+                self._choices[accept_encoding] = choice
+        return choice
+
+    def response(self, request, head=False):
+        """The asset in the best accepted encoding, or 304 if the client has it."""
+        encoding = self.choose(request.headers.get("accept-encoding", ""))
+        body, etag = self.encodings[encoding]
+        headers = {"ETag": etag, "Cache-Control": self.cache_control}
+        if len(self.encodings) > 1:
+            headers["Vary"] = "Accept-Encoding"
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match and (if_none_match.strip() == "*" or etag in if_none_match):
+            return Response(status_code=304, headers=headers)
+        if encoding != "identity":
+            headers["Content-Encoding"] = encoding
+        if head:
+            headers["Content-Length"] = str(len(body))
+            return Response(media_type=self.media_type, headers=headers)
+        return Response(body, media_type=self.media_type, headers=headers)
+
+
+def load_asset(path, max_age=STATIC_MAX_AGE):
+    with open(path, "rb") as f:
+        body = f.read()
+    # Starlette adds "; charset=utf-8" to text/* media types
+    media_type = mimetypes.guess_type(path)[0] or "application/octet-stream"
+    return Asset(body, media_type, cache_control(max_age))
+
+
+class StaticAssets:
+    """ASGI app serving every file under `directory`, all loaded at startup."""
+
+    def __init__(self, directory, max_age=STATIC_MAX_AGE):
+        self.assets = {}
+        for root, _, files in os.walk(directory):
+            for name in files:
+                path = os.path.join(root, name)
+                url = "/" + os.path.relpath(path, directory).replace(os.sep, "/")
+                self.assets[url] = load_asset(path, max_age)
+
+    async def __call__(self, scope, receive, send):
+        method = scope["method"]
+        asset = self.assets.get(scope["path"])
+        if method not in ("GET", "HEAD"):
+            response = PlainTextResponse("Method Not Allowed", status_code=405, headers={"Allow": "GET, HEAD"})
+        elif asset is None:
+            response = PlainTextResponse("Not Found", status_code=404)
+        else:
+            response = asset.response(Request(scope), head=method == "HEAD")
+        await response(scope, receive, send)
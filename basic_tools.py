@@ -0,0 +1,163 @@
+"""
+The basic tools: greeting, arithmetic, temperature and text analysis.
+
+Like the other tool modules, this one can be reloaded while the server runs
+(see reloader.py).
+"""
+
+from datetime import datetime
+import math
+
+from fastapi import APIRouter, Request
+from fastapi.responses import JSONResponse
+
+from registry import tool
+from response_models import (
+    AddResult, ExtendedTextAnalysisResult, HelloResult, MultiplyResult, SqrtResult,
+    TempConvertResult, TextAnalysisResult,
+)
+from text_stream import (
+    analyze_byte_stream, analyze_text, analyze_text_extended, check_options, make_stats, options_from_query,
+)
+from units import CELSIUS_TO_FAHRENHEIT, CELSIUS_TO_KELVIN, apply_conversion
+
+router = APIRouter()
+
+# Texts shorter than this are analyzed on the event loop (under 0.5 ms); for
+# them the process pool's pickling and IPC cost many times the analysis itself
+# (see benchmarks/bench_execution.py)
+INLINE_TEXT = 4096
+
+# Tool 1: Greeting Tool
+@router.get("/tools/hello")
+@tool("hello", "Returns a personalized greeting message with timestamp",
+      params={"name": "Name to greet"}, cache=False,  # timestamp changes every call
+      response=HelloResult)
+def hello_tool(name: str = "Student"):
+    """
+    MCP Tool: Returns a personalized greeting message.
+    """
+    return {
+        "message": f"Hello, {name}! This is your MCP Server speaking 👋",
+        "timestamp": datetime.now().isoformat()
+    }
+
+# Tool 2: Math Addition Tool
+@router.get("/tools/add")
+@tool("add", "Adds two numbers and returns the result",
+      params={"a": "First number", "b": "Second number"}, response=AddResult)
+def add_tool(a: int, b: int):
+    """
+    MCP Tool: Adds two numbers and returns the result.
+    """
+    return {
+        "operation": "addition",
+        "a": a,
+        "b": b,
+        "result": a + b
+    }
+
+# Tool 3: Math Multiply Tool
+@router.get("/tools/multiply")
+@tool("multiply", "Multiplies two numbers",
+      params={"a": "First number", "b": "Second number"}, response=MultiplyResult)
+def multiply_tool(a: float, b: float):
+    """
+    MCP Tool: Multiplies two numbers.
+    """
+    return {
+        "operation": "multiplication",
+        "a": a,
+        "b": b,
+        "result": a * b
+    }
+
+# Tool 4: Temperature Converter
+@router.get("/tools/temp-convert")
+@tool("temp-convert", "Converts temperature from Celsius to Fahrenheit and Kelvin",
+      params={"celsius": "Temperature in Celsius"}, response=TempConvertResult)
+def temp_convert_tool(celsius: float):
+    """
+    MCP Tool: Converts Celsius to Fahrenheit and Kelvin.
+    """
+    # Table-driven (see units.py); computes celsius * 9 / 5 + 32 and celsius + 273.15
+    fahrenheit = apply_conversion(CELSIUS_TO_FAHRENHEIT, celsius)
+    kelvin = apply_conversion(CELSIUS_TO_KELVIN, celsius)
+    return {
+        "celsius": celsius,
+        "fahrenheit": round(fahrenheit, 2),
+        "kelvin": round(kelvin, 2)
+    }
+
+# Tool 5: Text Analysis Tool
+@router.get("/tools/analyze-text")
+@tool("analyze-text", "Analyzes text and returns character/word statistics",
+      params={"text": "Text to analyze"}, response=TextAnalysisResult,
+      execution="process", inline_below=INLINE_TEXT)  # long texts stay off the event loop
+def analyze_text_tool(text: str):
+    """
+    MCP Tool: Analyzes text and returns statistics.
+    """
+    return {"text": text, **analyze_text(text)}
+
+# Tool 5b: Streaming Text Analysis (request body instead of query string)
+@router.post("/tools/analyze-text")
+@tool("analyze-text-stream", "Analyzes a UTF-8 request body of any size in one streaming pass",
+      params={
+          "body": {"type": "string", "description": "Raw UTF-8 text sent as the request body", "required": True},
+          "extended": {"type": "boolean", "description": "Query flag: return the analyze-text-extended statistics", "default": False},
+          "top_k": {"type": "integer", "description": "Query param for extended mode: most frequent terms to return", "default": 10},
+          "ngram": {"type": "integer", "description": "Query param for extended mode: words per term (1-3)", "default": 1},
+          "approximate": {"type": "boolean", "description": "Query flag for extended mode: bounded-memory sketches", "default": False},
+      })
+async def analyze_text_stream_tool(request: Request):
+    """
+    MCP Tool: Analyzes a UTF-8 request body of any size in one streaming pass.
+
+    Returns the same counts as GET /tools/analyze-text; the text itself is
+    not echoed back so memory use stays constant. With ?extended=true the
+    result is that of analyze-text-extended (without the text).
+    """
+    options, error = options_from_query(request.query_params)
+    if error:
+        return JSONResponse({"error": error}, status_code=400)
+    try:
+        return await analyze_byte_stream(request.stream(), stats=make_stats(options))
+    except UnicodeDecodeError:
+        return JSONResponse({"error": "Request body must be UTF-8 text"}, status_code=400)
+
+# Tool 5c: Extended Text Analysis
+@router.get("/tools/analyze-text/extended")
+@tool("analyze-text-extended",
+      "Analyzes text in one pass: the analyze-text counts plus line, sentence and unique-word "
+      "counts, the most frequent words or n-grams and a character-class histogram",
+      params={
+          "text": "Text to analyze",
+          "top_k": "Number of most frequent terms to return (1-1000)",
+          "ngram": "Words per term: 1 for words, 2 for bigrams, 3 for trigrams",
+          "approximate": "Use fixed-memory sketches (Count-Min, HyperLogLog) instead of exact counters",
+      },
+      response=ExtendedTextAnalysisResult, execution="process", inline_below=INLINE_TEXT)
+def analyze_text_extended_tool(text: str, top_k: int = 10, ngram: int = 1, approximate: bool = False):
+    """
+    MCP Tool: Analyzes text with word frequencies and extra statistics.
+    """
+    error = check_options(top_k, ngram)
+    if error:
+        return {"error": error}
+    return {"text": text, **analyze_text_extended(text, top_k, ngram, approximate)}
+
+# Tool 6: Square Root Calculator
+@router.get("/tools/sqrt")
+@tool("sqrt", "Calculates the square root of a number",
+      params={"number": "Number to calculate square root of"}, response=SqrtResult)
+def sqrt_tool(number: float):
+    """
+    MCP Tool: Calculates the square root of a number.
+    """
+    if number < 0:
+        return {"error": "Cannot calculate square root of negative number"}
+    return {
+        "number": number,
+        "square_root": round(math.sqrt(number), 4)
+    }
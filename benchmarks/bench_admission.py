@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Admission control load test
+Offers more load than a server can handle and reports, for admitted requests
+only, throughput and p50/p99 latency, plus how many requests were turned
+away. Rejected clients back off briefly and retry, like a client honouring
+Retry-After would (scaled down to keep runs short).
+
+  1. in-flight cap: AdmissionMiddleware in front of a model backend with a
+     fixed capacity (--slots requests at a time, --service-ms each), called
+     directly over ASGI at rising concurrency. A real backend's capacity is
+     its pools and CPUs; the model keeps client and HTTP overhead (which
+     share this machine's CPU in-process) out of the measurement.
+  2. per-tool token bucket: the real app's `add` route at high concurrency
+     with and without a rate limit.
+
+Without limits, admitted latency grows with the offered load. With them it
+stays flat and the excess is rejected quickly.
+
+  python3 benchmarks/bench_admission.py --duration 3 --concurrency 4 16 64 256
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+import httpx
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from admission import AdmissionControl, AdmissionMiddleware, admission  # noqa: E402
+from harness import summarize  # noqa: E402
+from main import app, registry  # noqa: E402
+
+
+def model_backend(slots, service):
+    """An ASGI app that serves `slots` requests at a time, `service` seconds each."""
+    capacity = asyncio.Semaphore(slots)
+
+    async def backend(scope, receive, send):
+        async with capacity:
+            await asyncio.sleep(service)
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"{}"})
+    return backend
+
+
+async def receive():
+    return {"type": "http.request", "body": b"", "more_body": False}
+
+
+async def call_asgi(asgi_app, n):
+    status = None
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+    scope = {"type": "http", "method": "GET", "path": "/tools/model", "query_string": b"",
+             "headers": [(b"x-client-id", str(n).encode())], "client": ("127.0.0.1", n)}
+    await asgi_app(scope, receive, send)
+    return status
+
+
+async def drive(request, concurrency, duration, backoff):
+    latencies = []
+    rejected = 0
+    deadline = time.monotonic() + duration
+
+    async def worker(n):
+        nonlocal rejected
+        i = 0
+        while time.monotonic() < deadline:
+            start = time.perf_counter()
+            await asyncio.sleep(0)  # see harness.load
+            status = await request(n, i)
+            i += 1
+            if status in (429, 503):
+                rejected += 1
+                await asyncio.sleep(backoff)
+                continue
+            if status != 200:
+                raise RuntimeError(f"unexpected status {status}")
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker(n) for n in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    result = summarize(latencies, 0, elapsed)
+    result["rejected_per_s"] = rejected / elapsed
+    return result
+
+
+def print_row(label, concurrency, r):
+    print(f"{label:<12}{concurrency:>6}{r['rps']:>12,.0f}{r['rejected_per_s']:>12,.0f}"
+          f"{r['p50_ms']:>10.2f}{r['p99_ms']:>10.2f}")
+
+
+def print_header(title):
+    print(f"\n{title}")
+    print(f"\n{'limits':<12}{'conc':>6}{'admitted/s':>12}{'rejected/s':>12}{'p50 ms':>10}{'p99 ms':>10}")
+    print("=" * 62)
+
+
+async def run(args):
+    service = args.service_ms / 1000
+    print_header(f"in-flight cap: model backend, {args.slots} slots x {args.service_ms:g} ms "
+                 f"(capacity {args.slots / service:,.0f} req/s)")
+    backend = model_backend(args.slots, service)
+    for concurrency in args.concurrency:
+        for label, cap in (("none", 0), (f"cap {args.slots}", args.slots)):
+            control = AdmissionControl(max_in_flight=cap, max_queue=args.queue, queue_timeout=args.queue_timeout)
+            limited = AdmissionMiddleware(backend, control)
+            r = await drive(lambda n, i: call_asgi(limited, n), concurrency, args.duration, args.backoff)
+            print_row(label, concurrency, r)
+
+    concurrency = max(args.concurrency)
+    limits = httpx.Limits(max_connections=None, max_keepalive_connections=None)
+    async with httpx.AsyncClient(app=app, base_url="http://bench", limits=limits, timeout=60) as client:
+        async def add(n, i):
+            return (await client.get("/tools/add", params={"a": n, "b": i})).status_code
+
+        print_header(f"per-tool token bucket: add at {args.rate:,.0f} req/s")
+        for label, limit in (("none", None), (f"{args.rate:,.0f}/s", (args.rate, args.rate / 10))):
+            admission.paths.pop("/tools/add", None)
+            if limit is not None:
+                admission.paths["/tools/add"] = limit
+            r = await drive(add, concurrency, args.duration, args.backoff)
+            print_row(label, concurrency, r)
+    registry.shutdown()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[4, 16, 64, 256])
+    parser.add_argument("--duration", type=float, default=3.0, help="seconds per measurement")
+    parser.add_argument("--slots", type=int, default=8, help="model backend capacity, also the in-flight cap")
+    parser.add_argument("--service-ms", type=float, default=10.0, help="model backend time per request")
+    parser.add_argument("--queue", type=int, default=8, help="requests allowed to wait for a slot")
+    parser.add_argument("--queue-timeout", type=float, default=0.02)
+    parser.add_argument("--rate", type=float, default=500.0, help="token bucket rate for add")
+    parser.add_argument("--backoff", type=float, default=0.02, help="seconds a rejected client waits")
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
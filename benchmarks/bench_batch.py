@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Batch vs one-by-one benchmark
+Compares calls/sec for N tool calls issued individually against the same
+calls sent through POST /tools/batch (JSON and streamed NDJSON).
+
+Runs in-process against the ASGI app by default, or against a live server
+with --url http://localhost:8000
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+import httpx
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+CALLS = [
+    ("add", {"a": 3, "b": 4}, "/tools/add"),
+    ("multiply", {"a": 2.5, "b": 4}, "/tools/multiply"),
+    ("temp-convert", {"celsius": 21.5}, "/tools/temp-convert"),
+    ("sqrt", {"number": 81}, "/tools/sqrt"),
+]
+
+
+def make_client(url):
+    if url:
+        return httpx.AsyncClient(base_url=url)
+    from main import app
+    return httpx.AsyncClient(app=app, base_url="http://bench")
+
+
+def workload(n):
+    return [CALLS[i % len(CALLS)] for i in range(n)]
+
+
+async def one_by_one(client, calls):
+    for _, params, endpoint in calls:
+        response = await client.get(endpoint, params=params)
+        response.raise_for_status()
+
+
+async def batch_json(client, calls):
+    body = {"calls": [{"tool": tool, "params": params} for tool, params, _ in calls]}
+    response = await client.post("/tools/batch", json=body)
+    response.raise_for_status()
+    assert response.json()["count"] == len(calls)
+
+
+async def batch_ndjson(client, calls):
+    body = "\n".join(json.dumps({"tool": tool, "params": params}) for tool, params, _ in calls)
+    response = await client.post(
+        "/tools/batch?stream=true",
+        content=body.encode(),
+        headers={"content-type": "application/x-ndjson"},
+    )
+    response.raise_for_status()
+    assert response.text.count("\n") == len(calls)
+
+
+async def run(args):
+    calls = workload(args.calls)
+    async with make_client(args.url) as client:
+        # Warm up routing and validation caches
+        await one_by_one(client, calls[:20])
+        await batch_json(client, calls[:20])
+
+        print(f"\n{'mode':<14}{'calls':>8}{'seconds':>10}{'calls/sec':>14}")
+        print("=" * 46)
+        baseline = None
+        for name, fn in (("one-by-one", one_by_one), ("batch-json", batch_json), ("batch-ndjson", batch_ndjson)):
+            start = time.perf_counter()
+            await fn(client, calls)
+            elapsed = time.perf_counter() - start
+            rate = len(calls) / elapsed
+            baseline = baseline or rate
+            print(f"{name:<14}{len(calls):>8}{elapsed:>10.3f}{rate:>14,.0f}   ({rate / baseline:.1f}x)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=2000, help="number of tool calls per mode")
+    parser.add_argument("--url", help="benchmark a running server instead of the in-process app")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
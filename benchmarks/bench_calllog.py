@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Call log overhead benchmark
+Runs the load harness (in-process, one child process per configuration) with
+the call log off and in several configurations, and compares req/s and
+p50/p99 latency per tool. Configurations are interleaved over `--rounds`
+rounds and each one's best round is reported, to keep machine noise out of
+the comparison:
+
+  off         MCP_CALL_LOG unset
+  full        every call logged
+  sampled     MCP_CALL_LOG_SAMPLE=0.1
+  gzip        every call logged, rotated every few MB into gzipped segments
+
+On a small machine the harness numbers swing more between runs than the
+log costs, so the benchmark also times CallLogMiddleware directly around a
+trivial ASGI app (as bench_metrics.py does), writer thread included.
+
+Then replays the log written by `full` through `harness.py run --traffic` to
+check the log is directly usable as load-generator input.
+
+  python3 benchmarks/bench_calllog.py --duration 5 --concurrency 32
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+HARNESS = os.path.join(ROOT, "benchmarks", "harness.py")
+sys.path.insert(0, ROOT)
+
+from calllog import CallLog, CallLogMiddleware, current_call  # noqa: E402
+
+START = {"type": "http.response.start", "status": 200, "headers": [(b"content-type", b"application/json")]}
+BODY = {"type": "http.response.body", "body": b"{}"}
+SCOPE = {"type": "http", "method": "GET", "path": "/tools/add", "root_path": "",
+         "query_string": b"a=1&b=2", "headers": []}
+
+CONFIGS = [
+    ("off", {}),
+    ("full", {"MCP_CALL_LOG": "{dir}/full.jsonl"}),
+    ("sampled", {"MCP_CALL_LOG": "{dir}/sampled.jsonl", "MCP_CALL_LOG_SAMPLE": "0.1"}),
+    ("gzip", {"MCP_CALL_LOG": "{dir}/gzip.jsonl", "MCP_CALL_LOG_GZIP": "1", "MCP_CALL_LOG_MAX_BYTES": "4000000"}),
+]
+
+
+def harness(args, env, output, extra):
+    command = [sys.executable, HARNESS, "run", "--concurrency", str(args.concurrency),
+               "--duration", str(args.duration), "--seed", str(args.seed), "-o", output, *extra]
+    subprocess.run(command, check=True, cwd=ROOT, env=env, stdout=subprocess.DEVNULL)
+    with open(output) as f:
+        return json.load(f)["results"]
+
+
+async def trivial_app(scope, receive, send):
+    # Mimic a tool route reporting its params and cache lookup
+    call = current_call.get()
+    if call is not None:
+        call["params"] = {"a": 1, "b": 2}
+        call["cache"] = "miss"
+    await send(START)
+    await send(BODY)
+
+
+async def receive():
+    return {"type": "http.request", "body": b"", "more_body": False}
+
+
+async def send(message):
+    pass
+
+
+async def time_app(asgi_app, n):
+    start = time.perf_counter()
+    for _ in range(n):
+        await asgi_app(SCOPE, receive, send)
+    return (time.perf_counter() - start) / n * 1e6
+
+
+async def middleware_costs(directory, n):
+    """Microseconds per request: bare app, then with the call log at each sampling rate."""
+    costs = [("bare", await time_app(trivial_app, n))]
+    for sample in (1.0, 0.1, 0.0):
+        log = CallLog(os.path.join(directory, "micro.jsonl"), sample=sample)
+        log.routes = {("GET", "/tools/add"): ("add", True)}
+        costs.append((f"sample {sample:g}", await time_app(CallLogMiddleware(trivial_app, log), n)))
+        log.close()
+    return costs
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--duration", type=float, default=3.0, help="seconds per tool")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--tools", nargs="+", default=["add", "temp-convert", "analyze-text"])
+    parser.add_argument("--rounds", type=int, default=3, help="rounds; each configuration's best is reported")
+    parser.add_argument("--micro-requests", type=int, default=200_000, help="requests for the middleware timing")
+    parser.add_argument("--seed", type=int, default=1234)
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp(prefix="bench-calllog-")
+    try:
+        results = {name: {} for name, _ in CONFIGS}
+        for _ in range(args.rounds):
+            for name, settings in CONFIGS:
+                env = {k: v for k, v in os.environ.items() if not k.startswith("MCP_CALL_LOG")}
+                env.update({k: v.format(dir=directory) for k, v in settings.items()})
+                output = os.path.join(directory, f"{name}.results.json")
+                for tool, r in harness(args, env, output, ["--tools", *args.tools]).items():
+                    best = results[name].get(tool)
+                    if best is None or r["p99_ms"] < best["p99_ms"]:
+                        results[name][tool] = r
+
+        print(f"\n{'tool':<16}{'log':<10}{'req/s':>10}{'p50 ms':>9}{'p99 ms':>9}{'p99 vs off':>12}")
+        print("=" * 66)
+        for tool in args.tools:
+            base = results["off"][tool]
+            for name, _ in CONFIGS:
+                r = results[name][tool]
+                change = (r["p99_ms"] - base["p99_ms"]) / base["p99_ms"] if base["p99_ms"] else 0.0
+                print(f"{tool:<16}{name:<10}{r['rps']:>10,.0f}{r['p50_ms']:>9.2f}{r['p99_ms']:>9.2f}"
+                      f"{'' if name == 'off' else format(change, '+.1%'):>12}")
+
+        print(f"\n{'middleware':<22}{'us/request':>12}")
+        print("=" * 34)
+        costs = asyncio.run(middleware_costs(directory, args.micro_requests))
+        for label, cost in costs:
+            print(f"{label:<22}{cost:>12.2f}")
+
+        segments = sorted(f for f in os.listdir(directory) if f.startswith("gzip.jsonl"))
+        print(f"\ngzip run wrote {len(segments)} file(s): {', '.join(segments)}")
+
+        log = os.path.join(directory, "full.jsonl")
+        with open(log) as f:
+            calls = sum(1 for _ in f)
+        env = {k: v for k, v in os.environ.items() if not k.startswith("MCP_CALL_LOG")}
+        replay = harness(args, env, os.path.join(directory, "replay.json"),
+                         ["--traffic", log, "--duration", "600"])["replay"]
+        print(f"replayed {replay['requests'] + replay['errors']:,} of {calls:,} logged calls "
+              f"({replay['errors']} errors) at {replay['rps']:,.0f} req/s")
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Request coalescing benchmark
+Runs the in-process app with the result cache off, so repeated work is only
+saved by coalescing:
+
+  1. sessions: `--sessions` concurrent callers each ask for one of
+     `--distinct` analyze-text inputs at the same moment (through the MCP /
+     batch dispatcher, on the process pool)
+  2. batch: one /tools/batch request whose calls repeat `--distinct` inputs
+
+Each is run with coalescing off and on; the table shows wall time, tool
+executions and the coalescing counters.
+
+  python3 benchmarks/bench_coalesce.py --sessions 64 --distinct 4 --words 20000
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+import httpx
+
+os.environ["MCP_CACHE"] = "off"
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from execution import SingleFlight  # noqa: E402
+from main import app, registry  # noqa: E402
+
+
+def texts(distinct, words):
+    return [" ".join(f"Word{(i * 7 + j) % 97} {j}" for j in range(words // 2)) for i in range(distinct)]
+
+
+async def sessions(args, inputs):
+    call = registry.dispatch["analyze-text"]
+    start = time.perf_counter()
+    results = await asyncio.gather(*(call(text=inputs[n % len(inputs)]) for n in range(args.sessions)))
+    assert all(r == results[n % len(inputs)] for n, r in enumerate(results))
+    return time.perf_counter() - start
+
+
+async def batch(args, inputs):
+    calls = [{"tool": "analyze-text", "params": {"text": inputs[n % len(inputs)]}} for n in range(args.batch)]
+    async with httpx.AsyncClient(app=app, base_url="http://bench", timeout=300) as client:
+        start = time.perf_counter()
+        response = await client.post("/tools/batch", json={"calls": calls})
+        response.raise_for_status()
+        return time.perf_counter() - start
+
+
+async def run(args):
+    inputs = texts(args.distinct, args.words)
+    await registry.dispatch["analyze-text"](text="warm up the pool")
+    print(f"\n{args.distinct} distinct inputs of {args.words} words; "
+          f"{registry.pools['process'].workers} process worker(s); cache off")
+    print(f"\n{'workload':<22}{'coalescing':<12}{'seconds':>9}{'executions':>12}{'coalesced':>11}{'batch dups':>12}")
+    print("=" * 78)
+    for name, workload, size in (("sessions", sessions, args.sessions), ("batch", batch, args.batch)):
+        for enabled in (False, True):
+            registry.flights = SingleFlight() if enabled else None
+            pool = registry.pools["process"]
+            before = pool.completed
+            elapsed = await workload(args, inputs)
+            info = registry.flights.info() if enabled else {"coalesced": 0, "batch_duplicates": 0}
+            print(f"{f'{name} x {size}':<22}{'on' if enabled else 'off':<12}{elapsed:>9.3f}"
+                  f"{pool.completed - before:>12}{info['coalesced']:>11}{info['batch_duplicates']:>12}")
+    registry.shutdown()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=64, help="concurrent callers")
+    parser.add_argument("--batch", type=int, default=64, help="calls in the batch request")
+    parser.add_argument("--distinct", type=int, default=4, help="distinct inputs among them")
+    parser.add_argument("--words", type=int, default=20000, help="words per input")
+    args = parser.parse_args()
+    # Room for every uncoalesced call to queue on the pool
+    registry.pools["process"].queue_depth = max(args.sessions, args.batch)
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
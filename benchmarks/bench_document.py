@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Large document analysis benchmark
+Writes synthetic text files of each size in `--sizes` MB and, for each one,
+runs every scan in a fresh child process so its peak RSS can be read:
+
+  read        f.read() the whole file, decode, analyze (the naive way)
+  mapped      text_stream.analyze_mapped: memory-mapped chunked scan
+  mapped xN   the file in N whitespace-aligned slices on N processes,
+              merged in order (peak RSS is the largest worker's)
+
+plus one end-to-end upload through POST /tools/analyze-document (raw body,
+in-process). `mapped` peak RSS should stay flat as the file grows; `read`
+grows with it. Parallel slices only help with more than one CPU.
+
+  python3 benchmarks/bench_document.py --sizes 64 256 --parallel 2 4 --extended
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import httpx
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+
+from text_stream import analyze_bytes, analyze_mapped, file_slices  # noqa: E402
+
+WORDS = ["The", "quick", "brown", "fox", "jumps", "over", "the", "lazy", "dog.", "ERROR", "request", "id=42",
+         "took", "12ms", "GET", "/tools/add", "200", "OK", "user", "session", "timeout,", "retry", "café", "naïve"]
+
+
+def write_corpus(path, megabytes, seed):
+    rng = random.Random(seed)
+    block = "\n".join(" ".join(rng.choices(WORDS, k=12)) for _ in range(20000)) + "\n"
+    data = block.encode()
+    with open(path, "wb") as f:
+        for _ in range(max(1, megabytes * 1_000_000 // len(data))):
+            f.write(data)
+
+
+def child(mode, path, options, parallel):
+    """Runs in a fresh process; prints seconds and peak RSS as JSON."""
+    start = time.perf_counter()
+    if mode == "read":
+        with open(path, "rb") as f:
+            result = analyze_bytes(f.read(), options).result()
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    elif parallel == 1:
+        result = analyze_mapped(path, options=options).result()
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    else:
+        slices = file_slices(path, parallel)
+        with ProcessPoolExecutor(parallel) as pool:
+            parts = list(pool.map(analyze_mapped, [path] * len(slices), *zip(*slices), [options] * len(slices)))
+        stats = parts[0]
+        for part in parts[1:]:
+            stats.merge(part)
+        result = stats.result()
+        rss = max(resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss,
+                  resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+    print(json.dumps({"seconds": time.perf_counter() - start, "rss_kb": rss, "words": result["word_count"]}))
+
+
+def run_child(mode, path, options, parallel):
+    command = [sys.executable, os.path.abspath(__file__), "--child", mode, path,
+               "--options", json.dumps(options), "--parallel", str(parallel)]
+    return json.loads(subprocess.run(command, check=True, capture_output=True, text=True).stdout)
+
+
+async def upload(path, options):
+    from main import app, registry
+    params = {"extended": "true", **options} if options else {}
+
+    async def body():
+        with open(path, "rb") as f:
+            while chunk := f.read(1024 * 1024):
+                yield chunk
+    async with httpx.AsyncClient(app=app, base_url="http://bench", timeout=None) as client:
+        start = time.perf_counter()
+        response = await client.post("/tools/analyze-document", params=params, content=body())
+        response.raise_for_status()
+        elapsed = time.perf_counter() - start
+    registry.shutdown()
+    return elapsed, response.json()["word_count"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[64, 256], help="file sizes in MB")
+    parser.add_argument("--parallel", type=int, nargs="*", default=[2], help="slice counts to try")
+    parser.add_argument("--extended", action="store_true", help="extended statistics instead of the basic counts")
+    parser.add_argument("--approximate", action="store_true", help="with --extended, use sketches")
+    parser.add_argument("--dir", default=None, help="where to write the test files")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--child", nargs=2, metavar=("MODE", "PATH"), help=argparse.SUPPRESS)
+    parser.add_argument("--options", default="null", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        mode, path = args.child
+        child(mode, path, json.loads(args.options), args.parallel[0])
+        return
+
+    options = {"top_k": 10, "ngram": 1, "approximate": args.approximate} if args.extended else None
+    print(f"\n{'extended' + (' approximate' if args.approximate else '') if options else 'basic'} "
+          f"analysis; {os.cpu_count()} CPU(s)")
+    print(f"\n{'size MB':>8}  {'scan':<14}{'seconds':>9}{'MB/s':>8}{'peak RSS MB':>13}")
+    print("=" * 54)
+    for megabytes in args.sizes:
+        fd, path = tempfile.mkstemp(prefix="bench-document-", suffix=".txt", dir=args.dir)
+        os.close(fd)
+        try:
+            write_corpus(path, megabytes, args.seed)
+            size = os.path.getsize(path) / 1e6
+            runs = [("read", 1), ("mapped", 1)] + [(f"mapped x{n}", n) for n in args.parallel]
+            words = set()
+            for label, parallel in runs:
+                r = run_child(label.split()[0], path, options, parallel)
+                words.add(r["words"])
+                print(f"{size:>8.0f}  {label:<14}{r['seconds']:>9.2f}{size / r['seconds']:>8.1f}{r['rss_kb'] / 1024:>13.1f}")
+            elapsed, upload_words = asyncio.run(upload(path, options))
+            words.add(upload_words)
+            print(f"{size:>8.0f}  {'upload':<14}{elapsed:>9.2f}{size / elapsed:>8.1f}{'':>13}")
+            assert len(words) == 1, f"word counts differ between scans: {words}"
+        finally:
+            os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Exact mode benchmark
+Times the tool functions in-process (no HTTP, no result cache) on random
+inputs of each shape and prints microseconds per call:
+
+  float      add / multiply / sqrt, the machine-number tools
+  exact      add-exact / multiply-exact / sqrt-exact, including parsing and
+             formatting the number strings
+  Decimal    the same work done naively with decimal.Decimal in a context
+             of the needed precision (parse, compute, str), for comparison
+
+The sqrt rows also show which method sqrt-exact chose (float, decimal or
+isqrt) for that shape and digit count.
+
+  python3 benchmarks/bench_exact.py --calls 20000
+"""
+
+import argparse
+from decimal import Decimal, localcontext
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from main import registry  # noqa: E402
+from exact_math import exact_sqrt, parse_number  # noqa: E402
+
+
+def shapes(rng):
+    """(label, number generator) for the inputs timed."""
+    return [
+        ("small int", lambda: str(rng.randint(1, 10**6))),
+        ("decimal 9 digits", lambda: f"{rng.randint(1, 10**6)}.{rng.randint(0, 999):03d}"),
+        ("decimal 30 digits", lambda: f"{rng.randint(1, 10**15)}.{rng.randint(0, 10**15 - 1):015d}"),
+        ("fraction", lambda: f"{rng.randint(1, 10**6)}/{rng.randint(1, 10**6)}"),
+        ("500-digit int", lambda: str(rng.randint(10**499, 10**500))),
+    ]
+
+
+def per_call(fn, inputs):
+    start = time.perf_counter()
+    for args in inputs:
+        fn(*args)
+    return (time.perf_counter() - start) / len(inputs) * 1e6
+
+
+def decimal_binary(op, digits):
+    def run(a, b):
+        with localcontext() as context:
+            context.prec = digits
+            return str(op(Decimal(a), Decimal(b)))
+    return run
+
+
+def decimal_sqrt(digits):
+    def run(number):
+        with localcontext() as context:
+            context.prec = digits
+            return str(Decimal(number).sqrt())
+    return run
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=20000, help="calls per row")
+    parser.add_argument("--digits", type=int, nargs="+", default=[15, 50, 200, 1000], help="sqrt digit counts")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    rng = random.Random(args.seed)
+    tools = {name: spec.fn for name, spec in registry.tools.items()}
+
+    print(f"\n{'add / multiply':<20}{'float us':>10}{'exact us':>10}{'Decimal us':>12}")
+    print("=" * 52)
+    for label, make in shapes(rng):
+        if label == "fraction":
+            continue
+        pairs = [(make(), make()) for _ in range(args.calls)]
+        # Decimal needs enough precision to hold the exact sum and product
+        needed = 2 * max(len(a) + len(b) for a, b in pairs)
+        for operation, float_tool, exact_tool, op in [
+            ("add", "add", "add-exact", lambda x, y: x + y),
+            ("multiply", "multiply", "multiply-exact", lambda x, y: x * y),
+        ]:
+            if float_tool == "add":
+                # add takes ints; decimal inputs do not apply
+                floats = [(int(a), int(b)) for a, b in pairs] if "." not in pairs[0][0] else None
+            else:
+                floats = [(float(a), float(b)) for a, b in pairs]
+            float_us = f"{per_call(tools[float_tool], floats):>10.2f}" if floats else f"{'-':>10}"
+            exact_us = per_call(tools[exact_tool], pairs)
+            decimal_us = per_call(decimal_binary(op, needed), pairs)
+            print(f"{operation + ' ' + label:<20}{float_us}{exact_us:>10.2f}{decimal_us:>12.2f}")
+
+    print(f"\n{'sqrt':<20}{'digits':>7}{'method':>9}{'float us':>10}{'exact us':>10}{'Decimal us':>12}")
+    print("=" * 68)
+    for label, make in shapes(rng):
+        numbers = [make() for _ in range(args.calls)]
+        for digits in args.digits:
+            calls = max(1, args.calls // max(1, digits // 50))
+            inputs = [(number, digits) for number in numbers[:calls]]
+            methods = {exact_sqrt(parse_number(number), digits)[2] for number, _ in inputs[:200]}
+            float_us = per_call(tools["sqrt"], [(float(Decimal(number.split("/")[0])),) for number, _ in inputs])
+            exact_us = per_call(tools["sqrt-exact"], inputs)
+            decimal_us = f"{per_call(decimal_sqrt(digits), [(number,) for number, _ in inputs]):>12.2f}" \
+                if "/" not in numbers[0] else f"{'-':>12}"
+            print(f"{label:<20}{digits:>7}{'/'.join(sorted(methods)):>9}{float_us:>10.2f}{exact_us:>10.2f}{decimal_us}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Tool execution policy benchmark
+Runs against the in-process app (no network), switching tools between
+execution policies at runtime:
+
+  1. light tools: req/s and latency for each light tool run inline on the
+     event loop vs. hopping to a thread pool (what Starlette does for every
+     sync route)
+  2. small texts: GET /tools/analyze-text with short texts under each
+     policy, and under its default (process pool, but inline below
+     inline_below characters). For these the pool hop is the cost.
+  3. mixed load: `add` calls alongside a stream of large analyze-text calls,
+     with analyze-text run inline, in the thread pool and in the process
+     pool. Reports how much the heavy tool hurts the light one.
+
+Heavy calls go through the registry dispatcher (same policy and pools as the
+route) with unique texts and the cache bypassed, so the client does not spend
+its time URL-encoding megabytes.
+
+  python3 benchmarks/bench_execution.py --duration 3 --text-kb 256 --small-sizes 16 1024 4096
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+
+import httpx
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from harness import generate_params, load, summarize  # noqa: E402
+from main import app, registry  # noqa: E402
+
+LIGHT_TOOLS = ["add", "multiply", "temp-convert", "sqrt"]
+
+
+def tool_call(tool, rng):
+    spec = registry.tools[tool]
+
+    def next_call():
+        return spec.method, spec.endpoint, {"params": generate_params(tool, rng)}
+    return next_call
+
+
+async def light(client, args, rng):
+    print(f"\nlight tools, concurrency {args.concurrency}")
+    print(f"\n{'tool':<16}{'policy':<9}{'req/s':>10}{'p50 ms':>9}{'p99 ms':>9}")
+    print("=" * 53)
+    for tool in LIGHT_TOOLS:
+        spec = registry.tools[tool]
+        default = spec.execution
+        for policy in ("thread", "inline"):
+            spec.execution = policy
+            await load(client, tool_call(tool, rng), args.concurrency, 0.5, 200)  # warm-up
+            r = await load(client, tool_call(tool, rng), args.concurrency, args.duration, None)
+            print(f"{tool:<16}{policy:<9}{r['rps']:>10,.0f}{r['p50_ms']:>9.2f}{r['p99_ms']:>9.2f}")
+        spec.execution = default
+
+
+async def small_text(client, args, rng):
+    spec = registry.tools["analyze-text"]
+    default_policy, default_threshold, default_cached = spec.execution, spec.inline_below, spec.cached
+    spec.cached = False
+    words = ["alpha", "Beta", "GAMMA", "42", "fox"]
+    print(f"\nsmall texts: GET /tools/analyze-text, concurrency {args.small_concurrency}, cache off")
+    print(f"\n{'chars':>7}  {'policy':<22}{'req/s':>10}{'p50 ms':>9}{'p99 ms':>9}")
+    print("=" * 57)
+    for size in args.small_sizes:
+        base = " ".join(rng.choice(words) for _ in range(size // 6 + 1))[:max(1, size - 8)]
+        counter = iter(range(10**9))
+
+        def next_call():
+            # Unique texts, so no call joins another one in flight
+            return "GET", spec.endpoint, {"params": {"text": f"{base} {next(counter)}"}}
+        for policy, threshold in (("inline", 0), ("thread", 0), ("process", 0),
+                                  (default_policy, default_threshold)):
+            spec.execution, spec.inline_below = policy, threshold
+            label = f"{policy} <{threshold} inline" if threshold else policy
+            await load(client, next_call, args.small_concurrency, 0.5, 200)  # warm-up, starts the pool
+            r = await load(client, next_call, args.small_concurrency, args.duration, None)
+            print(f"{size:>7,}  {label:<22}{r['rps']:>10,.0f}{r['p50_ms']:>9.2f}{r['p99_ms']:>9.2f}")
+    spec.execution, spec.inline_below, spec.cached = default_policy, default_threshold, default_cached
+
+
+async def mixed(client, args, rng):
+    heavy = registry.tools["analyze-text"]
+    default_policy, default_threshold, default_cached = heavy.execution, heavy.inline_below, heavy.cached
+    heavy.cached, heavy.inline_below = False, 0
+    words = ["alpha", "Beta", "GAMMA", "42", "fox"]
+    base = " ".join(rng.choice(words) for _ in range(args.text_kb * 1024 // 6))
+    call_heavy = registry.dispatch["analyze-text"]
+
+    print(f"\nmixed load: {args.heavy} x analyze-text ({args.text_kb} KB) + {args.concurrency} x add")
+    print(f"\n{'analyze-text':<14}{'heavy/s':>9}{'add req/s':>11}{'add p50':>9}{'add p99':>9}{'add max':>9}")
+    print("=" * 61)
+    for policy in ("inline", "thread", "process"):
+        heavy.execution = policy
+        await call_heavy(text=base)  # start the pool
+        deadline = time.monotonic() + args.duration
+        heavy_latencies = []
+
+        async def heavy_worker(n):
+            i = 0
+            while time.monotonic() < deadline:
+                start = time.perf_counter()
+                await call_heavy(text=f"{base} {n}-{i}")
+                heavy_latencies.append(time.perf_counter() - start)
+                i += 1
+                await asyncio.sleep(0)
+
+        heavy_tasks = [asyncio.create_task(heavy_worker(n)) for n in range(args.heavy)]
+        r = await load(client, tool_call("add", rng), args.concurrency, args.duration, None)
+        await asyncio.gather(*heavy_tasks)
+        h = summarize(heavy_latencies, 0, args.duration)
+        print(f"{policy:<14}{h['rps']:>9,.1f}{r['rps']:>11,.0f}{r['p50_ms']:>9.2f}"
+              f"{r['p99_ms']:>9.2f}{r['max_ms']:>9.2f}")
+    heavy.execution, heavy.inline_below, heavy.cached = default_policy, default_threshold, default_cached
+
+
+async def run(args):
+    rng = random.Random(1234)
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(app=app, base_url="http://bench", limits=limits) as client:
+        if not args.skip_light:
+            await light(client, args, rng)
+        if args.small_sizes:
+            await small_text(client, args, rng)
+        await mixed(client, args, rng)
+    registry.shutdown()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, default=32, help="concurrent light-tool requests")
+    parser.add_argument("--duration", type=float, default=3.0, help="seconds per measurement")
+    parser.add_argument("--heavy", type=int, default=2, help="concurrent heavy analyze-text callers")
+    parser.add_argument("--text-kb", type=int, default=256, help="size of each heavy text")
+    parser.add_argument("--small-sizes", type=int, nargs="*", default=[16, 1024, 4096],
+                        help="text lengths for the small-text rows (none to skip them)")
+    parser.add_argument("--small-concurrency", type=int, default=1, help="concurrent small-text requests")
+    parser.add_argument("--skip-light", action="store_true")
+    args = parser.parse_args()
+    print(f"\nCPUs: {os.cpu_count()}   thread workers: {registry.pools['thread'].workers}   "
+          f"process workers: {registry.pools['process'].workers}")
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Expression evaluation benchmark
+Computes sqrt((a + b) * c) for N random value sets four ways and prints
+the wall time and value sets per second:
+
+  chained        GET add, then multiply, then sqrt per value set: three
+                 round trips, each waiting for the one before
+  evaluate       one POST /tools/evaluate per value set
+  evaluate-bulk  one POST /tools/evaluate with all N sets as `bindings`
+                 (vectorized with NumPy)
+  batch          the chained calls for all sets in one POST /tools/batch
+                 per step (three requests in total)
+
+Then times compiling an expression in-process, on a miss (parsed) and a
+hit (taken from the compiled-expression LRU).
+
+Runs in-process against the ASGI app by default, or against a live server
+with --url http://localhost:8000
+
+  python3 benchmarks/bench_expressions.py --sets 1000
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+
+import httpx
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+EXPRESSION = "sqrt((a + b) * c)"
+
+
+def make_client(url):
+    if url:
+        return httpx.AsyncClient(base_url=url, timeout=60)
+    from main import app
+    return httpx.AsyncClient(app=app, base_url="http://bench", timeout=60)
+
+
+def value_sets(n, rng):
+    # Distinct values, so no call is answered by the result cache
+    return [{"a": i, "b": rng.randint(0, 10**6), "c": round(rng.uniform(1, 100), 6)} for i in range(n)]
+
+
+async def chained(client, sets):
+    results = []
+    for v in sets:
+        total = (await client.get("/tools/add", params={"a": v["a"], "b": v["b"]})).json()["result"]
+        product = (await client.get("/tools/multiply", params={"a": total, "b": v["c"]})).json()["result"]
+        results.append((await client.get("/tools/sqrt", params={"number": product})).json()["square_root"])
+    return results
+
+
+async def evaluate(client, sets):
+    results = []
+    for v in sets:
+        response = await client.post("/tools/evaluate", json={"expression": EXPRESSION, "variables": v})
+        results.append(response.json()["result"])
+    return results
+
+
+async def evaluate_bulk(client, sets):
+    response = await client.post("/tools/evaluate", json={"expression": EXPRESSION, "bindings": sets})
+    return response.json()["results"]
+
+
+async def batch(client, sets):
+    async def step(tool, params):
+        response = await client.post("/tools/batch", json={"calls": [{"tool": tool, "params": p} for p in params]})
+        return [r["result"] for r in response.json()["results"]]
+
+    totals = [r["result"] for r in await step("add", [{"a": v["a"], "b": v["b"]} for v in sets])]
+    products = [r["result"] for r in await step("multiply", [{"a": t, "b": v["c"]} for t, v in zip(totals, sets)])]
+    return [r["square_root"] for r in await step("sqrt", [{"number": p} for p in products])]
+
+
+def compile_times(rounds):
+    """Microseconds per compile on an LRU miss and on a hit."""
+    from expressions import compile_program
+    texts = [(("result", f"sqrt((a + {i}) * c) / (b - {i}) + multiply(a, -c)"),) for i in range(rounds)]
+    compile_program.cache_clear()
+    start = time.perf_counter()
+    for steps in texts:
+        compile_program(steps)
+    miss = (time.perf_counter() - start) / rounds * 1e6
+    start = time.perf_counter()
+    for steps in texts:
+        compile_program(steps)
+    hit = (time.perf_counter() - start) / rounds * 1e6
+    return miss, hit
+
+
+async def run(args):
+    rng = random.Random(args.seed)
+    modes = (("chained", chained), ("evaluate", evaluate), ("evaluate-bulk", evaluate_bulk), ("batch", batch))
+    async with make_client(args.url) as client:
+        # Warm up routing and validation
+        for _, fn in modes:
+            await fn(client, value_sets(20, rng))
+
+        print(f"\n{EXPRESSION} for {args.sets} value sets")
+        print(f"{'mode':<15}{'requests':>10}{'seconds':>10}{'sets/sec':>12}")
+        print("=" * 47)
+        baseline = None
+        for name, fn in modes:
+            sets = value_sets(args.sets, rng)
+            start = time.perf_counter()
+            results = await fn(client, sets)
+            elapsed = time.perf_counter() - start
+            requests = {"chained": 3 * len(sets), "evaluate": len(sets), "evaluate-bulk": 1, "batch": 3}[name]
+            rate = len(sets) / elapsed
+            baseline = baseline or rate
+            print(f"{name:<15}{requests:>10,}{elapsed:>10.3f}{rate:>12,.0f}   ({rate / baseline:.1f}x)")
+            assert len(results) == len(sets) and all(r is not None for r in results)
+
+    if args.url is None:
+        miss, hit = compile_times(args.compiles)
+        print(f"\n{'compile':<15}{'us':>10}")
+        print("=" * 25)
+        print(f"{'LRU miss':<15}{miss:>10.2f}")
+        print(f"{'LRU hit':<15}{hit:>10.2f}   ({miss / hit:.0f}x)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sets", type=int, default=500, help="value sets per mode")
+    parser.add_argument("--compiles", type=int, default=1000, help="distinct expressions compiled (at most the LRU size)")
+    parser.add_argument("--url", help="benchmark a running server instead of the in-process app")
+    parser.add_argument("--seed", type=int, default=3)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
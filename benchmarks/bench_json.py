@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Response serialization benchmark
+Compares, for every tool in main.py that declares a response model:
+
+  1. serialization alone: FastAPI's default (jsonable_encoder + json), the
+     stdlib render_json path, and the model's precompiled serializer
+  2. end to end: benchmarks/harness.py against the in-process app with
+     MCP_FAST_JSON=0 and =1 at high concurrency (result cache off)
+
+  python3 benchmarks/bench_json.py --concurrency 64 --duration 3
+"""
+
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+from harness import generate_params  # noqa: E402
+from main import registry  # noqa: E402
+from result_cache import render_json  # noqa: E402
+from pydantic import TypeAdapter  # noqa: E402
+
+
+def time_encoder(encode, results, rounds):
+    best = float("inf")
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for result in results:
+            encode(result)
+        best = min(best, (time.perf_counter() - start) / len(results))
+    return best * 1e6
+
+
+def serialization(n, rounds):
+    rng = random.Random(1234)
+    print(f"\n{'tool':<16}{'fastapi us':>12}{'stdlib us':>12}{'typed us':>12}{'speedup':>10}")
+    print("=" * 62)
+    for spec in registry.specs:
+        if spec.response is None:
+            continue
+        results = [spec.fn(**generate_params(spec.name, rng)) for _ in range(n)]
+        typed = TypeAdapter(spec.response).dump_json
+        default = time_encoder(lambda r: render_json(jsonable_encoder(r)), results, rounds)
+        stdlib = time_encoder(render_json, results, rounds)
+        fast = time_encoder(typed, results, rounds)
+        print(f"{spec.name:<16}{default:>12.2f}{stdlib:>12.2f}{fast:>12.2f}{default / fast:>9.1f}x")
+
+
+def end_to_end(args):
+    tools = [s.name for s in registry.specs if s.response is not None]
+    reports = {}
+    for fast in ("0", "1"):
+        env = dict(os.environ, MCP_FAST_JSON=fast, MCP_CACHE="off")
+        with tempfile.NamedTemporaryFile(suffix=".json", delete=False) as f:
+            output = f.name
+        try:
+            subprocess.run(
+                [sys.executable, os.path.join(ROOT, "benchmarks", "harness.py"), "run",
+                 "--concurrency", str(args.concurrency), "--duration", str(args.duration),
+                 "--tools", *tools, "-o", output],
+                env=env, cwd=ROOT, check=True, stdout=subprocess.DEVNULL,
+            )
+            with open(output) as f:
+                reports[fast] = json.load(f)["results"]
+        finally:
+            os.unlink(output)
+
+    print(f"\nconcurrency: {args.concurrency}   duration: {args.duration}s per tool")
+    print(f"\n{'tool':<16}{'stdlib req/s':>14}{'typed req/s':>13}{'gain':>8}{'stdlib p99':>12}{'typed p99':>11}")
+    print("=" * 74)
+    for tool in tools:
+        slow, fast = reports["0"][tool], reports["1"][tool]
+        gain = fast["rps"] / slow["rps"] - 1 if slow["rps"] else 0.0
+        print(f"{tool:<16}{slow['rps']:>14,.0f}{fast['rps']:>13,.0f}{gain:>+8.1%}"
+              f"{slow['p99_ms']:>12.2f}{fast['p99_ms']:>11.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--results", type=int, default=10000, help="results serialized per round")
+    parser.add_argument("--rounds", type=int, default=5, help="rounds; the fastest is reported")
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--duration", type=float, default=3.0, help="seconds per tool and mode")
+    parser.add_argument("--skip-load", action="store_true", help="only time serialization")
+    args = parser.parse_args()
+    serialization(args.results, args.rounds)
+    if not args.skip_load:
+        end_to_end(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+MCP JSON-RPC vs REST benchmark
+Compares throughput and per-call latency of the same `add` call issued as:
+  - REST          GET /tools/add
+  - mcp-http      POST /mcp, one JSON-RPC request per HTTP request, one session
+  - mcp-http-batch POST /mcp with JSON-RPC batches of --batch requests
+  - mcp-stdio     python3 mcp_server.py subprocess, requests pipelined on stdin
+
+HTTP modes run in-process against the ASGI app by default, or against a live
+server with --url http://localhost:8000
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import threading
+import time
+
+import httpx
+
+ROOT = os.path.join(os.path.dirname(__file__), "..")
+sys.path.insert(0, ROOT)
+
+
+def make_client(url):
+    if url:
+        return httpx.AsyncClient(base_url=url)
+    from main import app
+    return httpx.AsyncClient(app=app, base_url="http://bench")
+
+
+def rpc(i, a, b):
+    return {"jsonrpc": "2.0", "id": i, "method": "tools/call",
+            "params": {"name": "add", "arguments": {"a": a, "b": b}}}
+
+
+def summarize(name, n, elapsed, latencies=None):
+    line = f"{name:<16}{n:>8}{n / elapsed:>14,.0f}"
+    if latencies:
+        latencies.sort()
+        p50 = statistics.median(latencies) * 1e6
+        p99 = latencies[int(len(latencies) * 0.99) - 1] * 1e6
+        line += f"{p50:>12.0f}{p99:>12.0f}"
+    else:
+        line += f"{'-':>12}{'-':>12}"
+    print(line)
+
+
+async def bench_rest(client, n):
+    latencies = []
+    start = time.perf_counter()
+    for i in range(n):
+        t = time.perf_counter()
+        response = await client.get("/tools/add", params={"a": i, "b": 1})
+        response.raise_for_status()
+        latencies.append(time.perf_counter() - t)
+    summarize("rest", n, time.perf_counter() - start, latencies)
+
+
+async def open_session(client):
+    response = await client.post("/mcp", json={"jsonrpc": "2.0", "id": 0, "method": "initialize",
+                                               "params": {"protocolVersion": "2025-03-26"}})
+    return {"mcp-session-id": response.headers["mcp-session-id"]}
+
+
+async def bench_mcp_http(client, n):
+    headers = await open_session(client)
+    latencies = []
+    start = time.perf_counter()
+    for i in range(n):
+        t = time.perf_counter()
+        response = await client.post("/mcp", json=rpc(i, i, 1), headers=headers)
+        assert "result" in response.json()
+        latencies.append(time.perf_counter() - t)
+    summarize("mcp-http", n, time.perf_counter() - start, latencies)
+
+
+async def bench_mcp_http_batch(client, n, batch):
+    headers = await open_session(client)
+    start = time.perf_counter()
+    for offset in range(0, n, batch):
+        body = [rpc(i, i, 1) for i in range(offset, min(offset + batch, n))]
+        response = await client.post("/mcp", json=body, headers=headers)
+        assert len(response.json()) == len(body)
+    summarize("mcp-http-batch", n, time.perf_counter() - start)
+
+
+def bench_mcp_stdio(n):
+    proc = subprocess.Popen(
+        [sys.executable, os.path.join(ROOT, "mcp_server.py")],
+        stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True, cwd=ROOT,
+    )
+    proc.stdin.write(json.dumps({"jsonrpc": "2.0", "id": 0, "method": "initialize", "params": {}}) + "\n")
+    proc.stdin.flush()
+    proc.stdout.readline()
+
+    start = time.perf_counter()
+    payload = "".join(json.dumps(rpc(i, i, 1)) + "\n" for i in range(n))
+
+    def feed():
+        # Write from a thread so a full stdout pipe cannot deadlock us
+        proc.stdin.write(payload)
+        proc.stdin.close()
+
+    writer = threading.Thread(target=feed)
+    writer.start()
+    replies = sum(1 for _ in proc.stdout)
+    elapsed = time.perf_counter() - start
+    writer.join()
+    proc.wait()
+    assert replies == n
+    summarize("mcp-stdio", n, elapsed)
+
+
+async def run(args):
+    async with make_client(args.url) as client:
+        await client.get("/tools/add", params={"a": 1, "b": 1})
+        print(f"\n{'mode':<16}{'calls':>8}{'calls/sec':>14}{'p50 (us)':>12}{'p99 (us)':>12}")
+        print("=" * 62)
+        await bench_rest(client, args.calls)
+        await bench_mcp_http(client, args.calls)
+        await bench_mcp_http_batch(client, args.calls, args.batch)
+    bench_mcp_stdio(args.calls)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=2000, help="number of calls per mode")
+    parser.add_argument("--batch", type=int, default=100, help="JSON-RPC batch size for mcp-http-batch")
+    parser.add_argument("--url", help="benchmark a running server instead of the in-process app")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Metrics middleware overhead benchmark
+Drives a trivial ASGI app directly (no HTTP client, no network) with and
+without MetricsMiddleware in front of it, and reports the added cost per
+request in microseconds. The route table is the real app's, so route-label
+lookup is included. Two more rows show Server-Timing (MCP_PROFILING=1):
+enabled but not asked for, and asked for with an X-Server-Timing header.
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from main import app  # noqa: E402
+from metrics import Metrics, MetricsMiddleware, request_phases  # noqa: E402
+
+START = {"type": "http.response.start", "status": 200, "headers": [(b"content-type", b"application/json")]}
+BODY = {"type": "http.response.body", "body": b"{}"}
+
+
+async def trivial_app(scope, receive, send):
+    # Mimic a tool route reporting its phases
+    phases = request_phases.get()
+    if phases is not None:
+        phases.mark("validation")
+        phases.mark("tool")
+        phases.mark("serialization")
+    await send(START)
+    await send(BODY)
+
+
+async def receive():
+    return {"type": "http.request", "body": b"", "more_body": False}
+
+
+async def send(message):
+    pass
+
+
+def scope_for(path, headers=()):
+    return {"type": "http", "method": "GET", "path": path, "root_path": "",
+            "query_string": b"a=1&b=2", "headers": list(headers)}
+
+
+async def time_app(asgi_app, scopes, n):
+    start = time.perf_counter()
+    for i in range(n):
+        await asgi_app(scopes[i % len(scopes)], receive, send)
+    return (time.perf_counter() - start) / n
+
+
+async def run(n, rounds):
+    paths = ("/tools/add", "/tools/sqrt", "/tools/temp-convert", "/tools/multiply")
+    scopes = [scope_for(p) for p in paths]
+    asking = [scope_for(p, [(b"x-server-timing", b"1")]) for p in paths]
+    wrapped = MetricsMiddleware(trivial_app, router=app.router, metrics=Metrics())
+    timed = MetricsMiddleware(trivial_app, router=app.router, metrics=Metrics(), server_timing=True)
+    rows = [("bare", trivial_app, scopes), ("with metrics", wrapped, scopes),
+            ("Server-Timing, unasked", timed, scopes), ("Server-Timing, asked", timed, asking)]
+    for _, asgi_app, row_scopes in rows:
+        await time_app(asgi_app, row_scopes, 1000)
+
+    times = {name: [] for name, _, _ in rows}
+    for _ in range(rounds):
+        for name, asgi_app, row_scopes in rows:
+            times[name].append(await time_app(asgi_app, row_scopes, n))
+    bare = min(times["bare"]) * 1e6
+    print(f"\n{'app':<24}{'us/request':>12}{'overhead':>10}")
+    print("=" * 46)
+    for name, _, _ in rows:
+        us = min(times[name]) * 1e6
+        print(f"{name:<24}{us:>12.2f}{us - bare:>10.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=100000, help="requests per round")
+    parser.add_argument("--rounds", type=int, default=5, help="rounds; the fastest is reported")
+    args = parser.parse_args()
+    asyncio.run(run(args.requests, args.rounds))
+
+
+if __name__ == "__main__":
+    main()
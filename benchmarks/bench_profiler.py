@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Sampling profiler overhead benchmark
+Runs a CPU-bound tool body (analyze-text-extended on a generated text)
+in a loop for --duration seconds, alone and while this process's sampling
+thread (the one /admin/profile starts) samples every thread at each rate.
+The configurations are interleaved for --rounds rounds and the best rate
+of each is printed, with the slowdown against sampling off.
+
+Also times one sample on its own: sys._current_frames() plus walking
+every thread's stack.
+
+  python3 benchmarks/bench_profiler.py --duration 3 --rounds 3 --hz 100 1000
+"""
+
+import argparse
+import os
+import random
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from harness import WORDS  # noqa: E402
+from main import registry  # noqa: E402
+from profiler import collapse, sample_stacks  # noqa: E402
+
+
+def calls_per_second(fn, text, duration):
+    calls = 0
+    end = time.perf_counter() + duration
+    while time.perf_counter() < end:
+        fn(text=text, top_k=10, ngram=2)
+        calls += 1
+    return calls / duration
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--duration", type=float, default=3.0, help="seconds per measurement")
+    parser.add_argument("--rounds", type=int, default=3, help="rounds; the best of each configuration is reported")
+    parser.add_argument("--hz", type=int, nargs="+", default=[100, 1000], help="sampling rates")
+    parser.add_argument("--words", type=int, default=2000, help="words in the analyzed text")
+    parser.add_argument("--seed", type=int, default=11)
+    args = parser.parse_args()
+    rng = random.Random(args.seed)
+    text = " ".join(rng.choice(WORDS) for _ in range(args.words))
+    fn = registry.tools["analyze-text-extended"].fn
+
+    rates = {hz: 0.0 for hz in [0, *args.hz]}
+    samples = {}
+    for _ in range(args.rounds):
+        for hz in rates:
+            if not hz:
+                rates[hz] = max(rates[hz], calls_per_second(fn, text, args.duration))
+                continue
+            counts = {}
+            sampler = threading.Thread(target=lambda: counts.update(sample_stacks(time.time() + args.duration, hz)))
+            sampler.start()
+            rates[hz] = max(rates[hz], calls_per_second(fn, text, args.duration))
+            sampler.join()
+            samples[hz] = sum(counts.values()), len(collapse(counts))
+
+    print(f"\n{'sampling':<12}{'calls/s':>10}{'slowdown':>10}{'samples':>9}{'stacks':>8}")
+    print("=" * 49)
+    baseline = rates[0]
+    print(f"{'off':<12}{baseline:>10,.1f}{'-':>10}{'-':>9}{'-':>8}")
+    for hz in args.hz:
+        slowdown = (baseline - rates[hz]) / baseline * 100
+        print(f"{f'{hz} Hz':<12}{rates[hz]:>10,.1f}{slowdown:>9.1f}%{samples[hz][0]:>9,}{samples[hz][1]:>8}")
+
+    start = time.perf_counter()
+    rounds = 2000
+    for _ in range(rounds):
+        for frame in sys._current_frames().values():
+            while frame is not None:
+                frame = frame.f_back
+    print(f"\none sample of {threading.active_count()} threads: {(time.perf_counter() - start) / rounds * 1e6:.1f} us")
+
+
+if __name__ == "__main__":
+    main()
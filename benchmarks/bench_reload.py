@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+Hot reload under load
+Copies the project to a temporary directory, starts `serve.py` there with
+MCP_HOT_RELOAD=1 and drives it with a closed-loop mix of tool calls, first
+without reloads and then while, every --interval seconds, a tool module of
+the copy is edited and POST /admin/reload reloads it in every worker.
+Failed or dropped requests show up in the errors column.
+
+The edits alternate between basic_tools.py, whose `add` result gets a new
+version string (and whose process-pool tools restart the pool), and
+units.py, which also reloads the modules importing it. At the end every
+worker must serve the last version of `add`; the script exits with status 1
+when a request failed or a worker serves another version. The in-process
+check that runs with the test suite is tests/test_reload.py.
+
+  python3 benchmarks/bench_reload.py --workers 2 --duration 10 --interval 1
+"""
+
+import argparse
+import asyncio
+import itertools
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from harness import ROOT, generate_params, load, make_client, request_kwargs, wait_ready  # noqa: E402
+
+TOOLS = ["add", "sqrt", "temp-convert", "convert", "analyze-text", "evaluate"]
+ADD_OPERATION = '"operation": "addition'
+
+
+def copy_project(directory):
+    for name in os.listdir(ROOT):
+        path = os.path.join(ROOT, name)
+        if name.endswith(".py"):
+            shutil.copy(path, directory)
+        elif name == "static":
+            shutil.copytree(path, os.path.join(directory, name))
+
+
+def start_server(directory, args):
+    env = {**os.environ, "MCP_HOT_RELOAD": "1"}
+    cmd = [sys.executable, os.path.join(directory, "serve.py"), "--workers", str(args.workers),
+           "--port", str(args.port), "--no-access-log", "--log-level", "warning"]
+    server = subprocess.Popen(cmd, cwd=directory, env=env)
+    try:
+        wait_ready(args.url)
+    except RuntimeError:
+        server.kill()
+        raise
+    return server
+
+
+def edit(directory, version):
+    """Change a tool module of the copy; returns the module name."""
+    if version % 2:
+        path = os.path.join(directory, "basic_tools.py")
+        with open(path) as f:
+            source = f.read()
+        start = source.index(ADD_OPERATION) + len(ADD_OPERATION)
+        end = source.index('"', start)
+        source = source[:start] + f" v{version}" + source[end:]
+        module = "basic_tools"
+    else:
+        path = os.path.join(directory, "units.py")
+        with open(path) as f:
+            source = f.read()
+        source += f"\n# reload {version}\n"
+        module = "units"
+    with open(path, "w") as f:
+        f.write(source)
+    return module
+
+
+async def reload_loop(url, directory, interval, deadline, reports):
+    async with httpx.AsyncClient(base_url=url, timeout=30) as client:
+        for version in itertools.count(1):
+            await asyncio.sleep(interval)
+            if time.monotonic() >= deadline:
+                return
+            module = edit(directory, version)
+            response = await client.post("/admin/reload")
+            reports.append((version, module, response.status_code, response.json()))
+
+
+async def run(args, directory, specs):
+    rng = random.Random(args.seed)
+    pool = [(tool, generate_params(tool, rng)) for _ in range(args.distinct) for tool in TOOLS]
+    calls = itertools.cycle(pool)
+
+    def next_call():
+        tool, params = next(calls)
+        spec = specs[tool]
+        return spec["method"], spec["endpoint"], request_kwargs(spec, params)
+
+    print(f"\n{args.workers} workers, concurrency {args.concurrency}, {args.duration:g} s per row, "
+          f"tools: {', '.join(TOOLS)}")
+    print(f"{'phase':<16}{'requests':>10}{'errors':>8}{'req/s':>9}{'p50 ms':>9}{'p99 ms':>9}{'max ms':>9}")
+    print("=" * 70)
+    reports = []
+    errors = 0
+    for phase in ("no reloads", "reloading"):
+        async with make_client(args.url, args.concurrency) as client:
+            if phase == "reloading":
+                deadline = time.monotonic() + args.duration
+                reloading = asyncio.create_task(reload_loop(args.url, directory, args.interval, deadline, reports))
+            r = await load(client, next_call, args.concurrency, args.duration, None)
+            if phase == "reloading":
+                await reloading
+        errors += r["errors"]
+        print(f"{phase:<16}{r['requests']:>10,}{r['errors']:>8}{r['rps']:>9,.0f}"
+              f"{r['p50_ms']:>9.2f}{r['p99_ms']:>9.2f}{r['max_ms']:>9.2f}")
+    return reports, errors
+
+
+def check_versions(url, reports, probes=50):
+    """The `add` operations served on fresh connections, which land on any worker."""
+    versions = [version for version, module, _, _ in reports if module == "basic_tools"]
+    expected = f"addition v{versions[-1]}" if versions else "addition"
+    # Other workers reload on the master's signal, shortly after the reply
+    time.sleep(1.0)
+    seen = {}
+    for _ in range(probes):
+        operation = httpx.get(f"{url}/tools/add", params={"a": 1, "b": 2}).json()["operation"]
+        seen[operation] = seen.get(operation, 0) + 1
+    return expected, seen
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8767)
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds per row")
+    parser.add_argument("--interval", type=float, default=1.0, help="seconds between reloads")
+    parser.add_argument("--distinct", type=int, default=200, help="distinct param sets per tool")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    args.url = f"http://127.0.0.1:{args.port}"
+
+    directory = tempfile.mkdtemp(prefix="mcp-reload-")
+    server = None
+    try:
+        copy_project(directory)
+        server = start_server(directory, args)
+        config = httpx.get(f"{args.url}/mcp-config").json()
+        specs = {t["name"]: t for t in config["mcpServers"]["fastapi-mcp"]["tools"]}
+        reports, errors = asyncio.run(run(args, directory, specs))
+        expected, seen = check_versions(args.url, reports)
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+        shutil.rmtree(directory, ignore_errors=True)
+
+    failed = [report for report in reports if report[2] != 200]
+    swaps = [report[3]["swap_seconds"] for report in reports if report[2] == 200]
+    totals = [report[3]["seconds"] for report in reports if report[2] == 200]
+    print(f"\nreloads: {len(reports)} ({len(failed)} failed)", end="")
+    if swaps:
+        print(f", reload {sum(totals) / len(totals) * 1000:.1f} ms on average, "
+              f"event loop paused {sum(swaps) / len(swaps) * 1000:.2f} ms (max {max(swaps) * 1000:.2f})")
+    else:
+        print()
+    print(f"after the last reload, expected '{expected}', served: {seen}")
+    if errors or failed or set(seen) != {expected}:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Cold start benchmark
+Spawns fresh server processes and measures time from spawn to:
+
+  stdio lazy    `python3 mcp_server.py` with tool_manifest.json: the
+                initialize and tools/list replies, the first tools/call right
+                after, and the first call after a `--think` pause (the tools
+                are prefetched in the background once the list is sent)
+  stdio eager   the same with MCP_LAZY_TOOLS=0 (everything imported up front)
+  http          `python3 serve.py --workers 1` until GET /readyz answers
+
+and prints the heaviest imports behind `import main` (python -X importtime).
+`-o` writes the timings in the harness result format, so startup can be
+tracked across commits with `python3 benchmarks/harness.py compare`.
+Exits 1 if the median lazy tools/list exceeds `--target-ms`.
+
+  python3 benchmarks/bench_startup.py --runs 10 --target-ms 150 -o startup.json
+"""
+
+import argparse
+import http.client
+import json
+import os
+import platform
+import socket
+import subprocess
+import sys
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+
+from harness import git_commit, summarize  # noqa: E402
+
+INITIALIZE = {"jsonrpc": "2.0", "id": 1, "method": "initialize", "params": {"protocolVersion": "2025-03-26"}}
+LIST = {"jsonrpc": "2.0", "id": 2, "method": "tools/list"}
+CALL = {"jsonrpc": "2.0", "id": 3, "method": "tools/call", "params": {"name": "add", "arguments": {"a": 1, "b": 2}}}
+
+
+def stdio_run(env, think):
+    """Seconds from spawn to each reply of one stdio session."""
+    start = time.perf_counter()
+    server = subprocess.Popen([sys.executable, os.path.join(ROOT, "mcp_server.py")], cwd=ROOT, env=env,
+                              stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True)
+    times = {}
+
+    def ask(label, message):
+        server.stdin.write(json.dumps(message) + "\n")
+        server.stdin.flush()
+        reply = json.loads(server.stdout.readline())
+        times[label] = time.perf_counter() - start
+        return reply
+
+    try:
+        ask("initialize", INITIALIZE)
+        ask("tools/list", LIST)
+        if think:
+            time.sleep(think)
+            sent = time.perf_counter()
+            reply = ask("first call", CALL)
+            times["first call"] -= sent - start
+        else:
+            reply = ask("first call", CALL)
+        assert reply["result"]["structuredContent"]["result"] == 3, reply
+    finally:
+        server.stdin.close()
+        server.wait()
+    return times
+
+
+def http_run(env):
+    """Seconds from spawn until a serve.py worker answers /readyz."""
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    start = time.perf_counter()
+    server = subprocess.Popen([sys.executable, os.path.join(ROOT, "serve.py"), "--workers", "1", "--port", str(port),
+                               "--no-access-log", "--log-level", "warning"], cwd=ROOT, env=env)
+    try:
+        while True:
+            # http.client rather than httpx: polling must not steal CPU from the server starting up
+            try:
+                connection = http.client.HTTPConnection("127.0.0.1", port, timeout=5)
+                connection.request("GET", "/readyz")
+                if connection.getresponse().status == 200:
+                    return time.perf_counter() - start
+            except OSError:
+                time.sleep(0.01)
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def import_breakdown(top):
+    """(module, cumulative ms) for the slowest direct imports of main, and main's total."""
+    stderr = subprocess.run([sys.executable, "-X", "importtime", "-c", "import main"], cwd=ROOT,
+                            capture_output=True, text=True, check=True).stderr
+    # Each import is printed after the imports it triggered, one indent level deeper
+    children = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if not cumulative.strip().isdigit():
+            continue
+        depth = (len(name) - len(name.lstrip())) // 2
+        entry = (name.strip(), int(cumulative) / 1000)
+        if depth == 1:
+            children.append(entry)
+        elif depth == 0:
+            if entry[0] == "main":
+                return [entry] + sorted(children, key=lambda item: -item[1])[:top]
+            children = []
+    return []
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5, help="process starts per scenario")
+    parser.add_argument("--think", type=float, default=1.0, help="pause before the second lazy run's first call")
+    parser.add_argument("--target-ms", type=float, default=150.0, help="budget for the lazy tools/list reply")
+    parser.add_argument("--top", type=int, default=12, help="imports to show in the breakdown")
+    parser.add_argument("-o", "--output", help="write results in the harness JSON format")
+    args = parser.parse_args()
+
+    base_env = {k: v for k, v in os.environ.items() if k != "MCP_LAZY_TOOLS"}
+    scenarios = [
+        ("stdio lazy", {**base_env, "MCP_LAZY_TOOLS": "1"}, 0.0),
+        ("stdio lazy+think", {**base_env, "MCP_LAZY_TOOLS": "1"}, args.think),
+        ("stdio eager", {**base_env, "MCP_LAZY_TOOLS": "0"}, 0.0),
+    ]
+    samples = {}
+    for name, env, think in scenarios:
+        for _ in range(args.runs):
+            for label, seconds in stdio_run(env, think).items():
+                samples.setdefault(f"{name} {label}", []).append(seconds)
+    samples["http /readyz"] = [http_run(base_env) for _ in range(args.runs)]
+
+    results = {name: summarize(values, 0, 0) for name, values in samples.items()}
+    print(f"\n{'time from spawn to':<34}{'p50 ms':>9}{'p95 ms':>9}{'max ms':>9}")
+    print("=" * 61)
+    for name, r in results.items():
+        print(f"{name:<34}{r['p50_ms']:>9.1f}{r['p95_ms']:>9.1f}{r['max_ms']:>9.1f}")
+    print(f"('think' rows time the first call from when it is sent, {args.think:g} s after tools/list)")
+
+    print(f"\n{'import main: slowest direct imports':<44}{'ms':>8}")
+    print("=" * 52)
+    for module, ms in import_breakdown(args.top):
+        print(f"{module:<44}{ms:>8.1f}")
+
+    if args.output:
+        report = {
+            "meta": {"commit": git_commit(), "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+                     "target": "startup", "runs": args.runs, "python": platform.python_version(),
+                     "cpus": os.cpu_count()},
+            "results": results,
+        }
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nResults written to {args.output}")
+
+    listed = results["stdio lazy tools/list"]["p50_ms"]
+    verdict = "ok" if listed <= args.target_ms else "OVER BUDGET"
+    print(f"\nstdio tools/list p50 {listed:.1f} ms, target {args.target_ms:g} ms: {verdict}")
+    sys.exit(0 if listed <= args.target_ms else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Web UI and config endpoint benchmark
+Requests `/`, `/static/index.html`, `/mcp-config` and `/api/info` in-process
+(no network) three ways and reports bytes on the wire and time per request:
+
+  identity    no Accept-Encoding
+  gzip        Accept-Encoding: gzip, deflate, br (what browsers send)
+  304         the same, revalidating with the ETag from a previous response
+
+  python3 benchmarks/bench_static.py --requests 2000
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+import httpx
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from main import app  # noqa: E402
+
+PATHS = ["/", "/static/index.html", "/mcp-config", "/api/info"]
+BROWSER = "gzip, deflate, br"
+
+
+async def fetch(client, path, headers):
+    """Status and body size as sent; reading the raw stream skips client-side decompression."""
+    async with client.stream("GET", path, headers=headers) as response:
+        size = 0
+        async for chunk in response.aiter_raw():
+            size += len(chunk)
+        return response.status_code, size
+
+
+async def measure(client, path, headers, n):
+    status, size = await fetch(client, path, headers)
+    start = time.perf_counter()
+    for _ in range(n):
+        await fetch(client, path, headers)
+    return status, size, (time.perf_counter() - start) / n * 1e6
+
+
+async def run(n):
+    async with httpx.AsyncClient(app=app, base_url="http://bench") as client:
+        print(f"\n{'path':<22}{'request':<10}{'status':>7}{'bytes':>9}{'us/request':>12}")
+        print("=" * 60)
+        for path in PATHS:
+            etag = (await client.get(path, headers={"Accept-Encoding": BROWSER})).headers.get("etag")
+            runs = [
+                ("identity", {"Accept-Encoding": "identity"}),
+                ("gzip", {"Accept-Encoding": BROWSER}),
+                ("304", {"Accept-Encoding": BROWSER, "If-None-Match": etag or ""}),
+            ]
+            for label, headers in runs:
+                status, size, micros = await measure(client, path, headers, n)
+                print(f"{path:<22}{label:<10}{status:>7}{size:>9,}{micros:>12.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=2000, help="requests per path and mode")
+    args = parser.parse_args()
+    asyncio.run(run(args.requests))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Text analysis benchmark on multi-MB inputs
+Generates a synthetic corpus (Zipf-distributed words, punctuation, sentences
+and lines) of each size in `--sizes` MB, or reads `--file`, and times one
+pass of:
+
+  basic       TextStats, the analyze-text counts
+  exact       ExtendedTextStats, exact counters (words, then bigrams)
+  approx      ExtendedTextStats with Count-Min / HyperLogLog / top-k heap
+
+The table shows MB/s and the peak memory of the pass (tracemalloc, measured
+in a second, untimed run). For approximate modes it also shows the error of
+unique_word_count and how many of the exact top-k terms were found.
+
+  python3 benchmarks/bench_text.py --sizes 4 16 --vocabulary 500000
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from text_stream import CHUNK_SIZE, ExtendedTextStats, TextStats  # noqa: E402
+
+LETTERS = "abcdefghijklmnopqrstuvwxyz"
+
+
+def corpus(megabytes, vocabulary, seed):
+    """About `megabytes` MB of text whose word frequencies follow Zipf's law."""
+    rng = random.Random(seed)
+    words = ["".join(rng.choice(LETTERS) for _ in range(rng.randint(2, 10))) for _ in range(vocabulary)]
+    words[:5] = ["The", "of", "and", "a", "to"]
+    weights = [1 / (rank + 1) for rank in range(vocabulary)]
+    tokens = rng.choices(words, weights, k=megabytes * 1_000_000 // 6)
+    for i in range(0, len(tokens), 7):
+        tokens[i] += rng.choice(",,,;:")
+    for i in range(11, len(tokens), 13):
+        tokens[i] += rng.choice("...!?")
+    for i in range(97, len(tokens), 101):
+        tokens[i] += "\n"
+    return " ".join(tokens)
+
+
+def analyze(make_stats, text):
+    stats = make_stats()
+    for start in range(0, len(text), CHUNK_SIZE):
+        stats.feed(text[start:start + CHUNK_SIZE])
+    return stats.result()
+
+
+def measure(make_stats, text):
+    start = time.perf_counter()
+    result = analyze(make_stats, text)
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    analyze(make_stats, text)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+MODES = [
+    ("basic", TextStats),
+    ("exact 1-gram", lambda top_k: ExtendedTextStats(top_k, 1)),
+    ("approx 1-gram", lambda top_k: ExtendedTextStats(top_k, 1, approximate=True)),
+    ("exact 2-gram", lambda top_k: ExtendedTextStats(top_k, 2)),
+    ("approx 2-gram", lambda top_k: ExtendedTextStats(top_k, 2, approximate=True)),
+]
+
+
+def run(text, label, top_k):
+    megabytes = len(text.encode()) / 1e6
+    print(f"\n{label}: {megabytes:.1f} MB, {len(text.split()):,} words")
+    print(f"\n{'mode':<16}{'seconds':>9}{'MB/s':>8}{'peak MB':>10}{'unique':>12}{'unique err':>12}{'top-k found':>13}")
+    print("=" * 80)
+    exact = {}
+    for name, factory in MODES:
+        make_stats = factory if factory is TextStats else (lambda factory=factory: factory(top_k))
+        result, elapsed, peak = measure(make_stats, text)
+        row = f"{name:<16}{elapsed:>9.2f}{megabytes / elapsed:>8.1f}{peak / 1e6:>10.1f}"
+        if "unique_word_count" in result:
+            unique = result["unique_word_count"]
+            terms = {t["term"] for t in result["top_terms"]}
+            mode, _, ngram = name.partition(" ")
+            if mode == "exact":
+                exact[ngram] = (unique, terms)
+                row += f"{unique:>12,}{'':>12}{'':>13}"
+            else:
+                true_unique, true_terms = exact[ngram]
+                error = (unique - true_unique) / true_unique
+                row += f"{unique:>12,}{error:>+11.2%} {len(terms & true_terms):>6}/{len(true_terms)}"
+        print(row)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[4, 16], help="corpus sizes in MB")
+    parser.add_argument("--vocabulary", type=int, default=500_000, help="distinct words in the corpus")
+    parser.add_argument("--file", help="analyze this UTF-8 file instead of synthetic corpora")
+    parser.add_argument("--top-k", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    if args.file:
+        with open(args.file, encoding="utf-8") as f:
+            run(f.read(), args.file, args.top_k)
+        return
+    for megabytes in args.sizes:
+        run(corpus(megabytes, args.vocabulary, args.seed), "synthetic corpus", args.top_k)
+
+
+if __name__ == "__main__":
+    main()
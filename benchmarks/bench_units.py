@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Unit conversion benchmark
+Times conversions in-process on random values and unit pairs and prints
+nanoseconds per value:
+
+  table      the precomputed any-to-any lookup (symbol -> symbol), then
+             value * numerator / denominator + offset
+  via base   composing the two units' affine maps at call time (convert to
+             the base unit, then out of it), what a per-unit registry
+             without the table would do
+  column     the table factors applied to a whole NumPy column, as
+             convert-array does, for several column lengths
+
+  python3 benchmarks/bench_units.py --values 200000
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from units import DIMENSIONS, apply_conversion, conversion, unit_symbol  # noqa: E402
+
+# symbol -> (dimension, float scale, float offset)
+UNITS = {symbol: (dimension, float(scale), float(offset))
+         for dimension, units in DIMENSIONS.items() for symbol, _, scale, offset in units}
+
+
+def via_base(value, from_unit, to_unit):
+    source_dimension, source_scale, source_offset = UNITS[unit_symbol(from_unit)]
+    target_dimension, target_scale, target_offset = UNITS[unit_symbol(to_unit)]
+    if source_dimension != target_dimension:
+        raise ValueError("dimensions differ")
+    return ((value * source_scale + source_offset) - target_offset) / target_scale
+
+
+def table(value, from_unit, to_unit):
+    return apply_conversion(conversion(from_unit, to_unit), value)
+
+
+def per_value(fn, calls):
+    start = time.perf_counter()
+    for value, source, target in calls:
+        fn(value, source, target)
+    return (time.perf_counter() - start) / len(calls) * 1e9
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--values", type=int, default=200000, help="scalar conversions timed")
+    parser.add_argument("--lengths", type=int, nargs="+", default=[10, 1000, 100000], help="column lengths")
+    parser.add_argument("--seed", type=int, default=5)
+    args = parser.parse_args()
+    rng = random.Random(args.seed)
+
+    pairs = [(source, target) for units in DIMENSIONS.values()
+             for source, *_ in units for target, *_ in units]
+    calls = [(rng.uniform(-1000, 1000), *rng.choice(pairs)) for _ in range(args.values)]
+    print(f"\n{'scalar':<12}{'ns/value':>10}")
+    print("=" * 22)
+    baseline = per_value(via_base, calls)
+    print(f"{'via base':<12}{baseline:>10.0f}")
+    fast = per_value(table, calls)
+    print(f"{'table':<12}{fast:>10.0f}   ({baseline / fast:.1f}x)")
+
+    print(f"\n{'column':<12}{'length':>10}{'ns/value':>10}")
+    print("=" * 32)
+    for length in args.lengths:
+        column = np.array([rng.uniform(-1000, 1000) for _ in range(length)])
+        factors = conversion("F", "C")
+        rounds = max(1, args.values // length)
+        start = time.perf_counter()
+        for _ in range(rounds):
+            apply_conversion(factors, column)
+        elapsed = (time.perf_counter() - start) / (rounds * length) * 1e9
+        print(f"{'table':<12}{length:>10,}{elapsed:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Worker scaling load test
+Starts `serve.py` with 1, 2, 4, ... workers on a local port, drives it with
+several client processes for a fixed duration, and reports requests/sec for
+each worker count. Uses a mid-sized analyze-text call so the server, not the
+client, is the bottleneck.
+
+  python3 benchmarks/bench_workers.py --workers 1 2 4 --duration 10
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import os
+import signal
+import subprocess
+import sys
+import time
+
+import httpx
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+# Vary the text so the result cache does not turn this into a cache benchmark
+TEXT = "The Quick brown fox 42 jumps over the lazy dog. " * 40
+
+
+async def client_loop(url, duration, concurrency, seed):
+    done = 0
+    deadline = time.monotonic() + duration
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=30) as client:
+        async def worker(offset):
+            nonlocal done
+            i = offset
+            while time.monotonic() < deadline:
+                response = await client.get("/tools/analyze-text", params={"text": f"{TEXT}{seed}-{i}"})
+                response.raise_for_status()
+                done += 1
+                i += concurrency
+        await asyncio.gather(*(worker(n) for n in range(concurrency)))
+    return done
+
+
+def client_process(url, duration, concurrency, seed, results):
+    results.put(asyncio.run(client_loop(url, duration, concurrency, seed)))
+
+
+def wait_ready(url, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(f"{url}/readyz").status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError("server did not become ready")
+
+
+def run_load(url, args):
+    results = multiprocessing.Queue()
+    clients = [
+        multiprocessing.Process(target=client_process, args=(url, args.duration, args.concurrency, n, results))
+        for n in range(args.clients)
+    ]
+    start = time.perf_counter()
+    for c in clients:
+        c.start()
+    total = sum(results.get() for _ in clients)
+    elapsed = time.perf_counter() - start
+    for c in clients:
+        c.join()
+    return total / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds of load per worker count")
+    parser.add_argument("--clients", type=int, default=4, help="client processes")
+    parser.add_argument("--concurrency", type=int, default=32, help="concurrent requests per client process")
+    parser.add_argument("--reuse-port", action="store_true")
+    args = parser.parse_args()
+
+    url = f"http://127.0.0.1:{args.port}"
+    print(f"\nCPUs: {os.cpu_count()}   clients: {args.clients} x {args.concurrency}   duration: {args.duration}s")
+    print(f"\n{'workers':>8}{'req/sec':>12}{'scaling':>10}")
+    print("=" * 30)
+    baseline = None
+    for workers in args.workers:
+        cmd = [sys.executable, os.path.join(ROOT, "serve.py"), "--workers", str(workers),
+               "--port", str(args.port), "--no-access-log", "--log-level", "warning"]
+        if args.reuse_port:
+            cmd.append("--reuse-port")
+        server = subprocess.Popen(cmd, cwd=ROOT)
+        try:
+            wait_ready(url)
+            rate = run_load(url, args)
+        finally:
+            server.send_signal(signal.SIGTERM)
+            server.wait(60)
+        baseline = baseline or rate
+        print(f"{workers:>8}{rate:>12,.0f}{rate / baseline:>9.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+WebSocket channel vs REST benchmark
+Runs the same closed-loop load at each concurrency level two ways against a
+live server and prints messages per second and latency:
+
+  rest   `concurrency` workers sharing a keep-alive httpx pool, one GET
+         /tools/<tool> per call (up to `concurrency` connections)
+  ws     `concurrency` workers sharing ONE /ws socket, each call tagged with
+         an id and its reply matched by id
+
+Starts `serve.py` on a local port unless --url is given, with
+MCP_WS_MAX_IN_FLIGHT raised to the highest concurrency so the channel's
+flow-control window does not cap the ws rows. Needs the `websockets`
+package (installed with uvicorn[standard]).
+
+  python3 benchmarks/bench_ws.py --concurrency 1 8 32 128 --duration 5 --tool add
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import random
+import sys
+import time
+
+import httpx
+import websockets
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from harness import generate_params, make_client, start_server, summarize  # noqa: E402
+
+
+async def rest_load(url, endpoint, calls, concurrency, duration):
+    latencies = []
+    errors = 0
+    deadline = time.monotonic() + duration
+
+    async def worker(client):
+        nonlocal errors
+        while time.monotonic() < deadline:
+            params = next(calls)
+            start = time.perf_counter()
+            response = await client.get(endpoint, params=params)
+            if response.status_code < 400 and "error" not in response.json():
+                latencies.append(time.perf_counter() - start)
+            else:
+                errors += 1
+
+    async with make_client(url, concurrency) as client:
+        start = time.perf_counter()
+        await asyncio.gather(*(worker(client) for _ in range(concurrency)))
+        return summarize(latencies, errors, time.perf_counter() - start)
+
+
+async def ws_load(url, tool, calls, concurrency, duration):
+    latencies = []
+    errors = 0
+    deadline = time.monotonic() + duration
+    pending = {}
+    ids = itertools.count()
+
+    async with websockets.connect(url.replace("http", "ws", 1) + "/ws", max_size=None) as socket:
+        hello = json.loads(await socket.recv())
+        assert hello["type"] == "hello", hello
+
+        async def reader():
+            async for data in socket:
+                reply = json.loads(data)
+                if reply.get("type") == "ping":
+                    await socket.send('{"type": "pong"}')
+                elif reply.get("id") in pending:
+                    pending.pop(reply["id"]).set_result(reply)
+
+        async def worker():
+            nonlocal errors
+            loop = asyncio.get_running_loop()
+            while time.monotonic() < deadline:
+                msg_id = next(ids)
+                future = pending[msg_id] = loop.create_future()
+                start = time.perf_counter()
+                await socket.send(json.dumps({"id": msg_id, "tool": tool, "params": next(calls)}))
+                reply = await future
+                if "result" in reply:
+                    latencies.append(time.perf_counter() - start)
+                else:
+                    errors += 1
+
+        receiving = asyncio.create_task(reader())
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+        receiving.cancel()
+        return summarize(latencies, errors, elapsed)
+
+
+async def run(args, url, endpoint):
+    rng = random.Random(args.seed)
+    # A fixed pool of distinct calls, so both transports see the same cache hit rate
+    pool = [generate_params(args.tool, rng) for _ in range(args.distinct)]
+    print(f"\n{args.tool}: {args.distinct} distinct calls, {args.duration:g} s per row")
+    print(f"{'transport':<10}{'concurrency':>12}{'msgs/s':>10}{'errors':>8}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}")
+    print("=" * 67)
+    for concurrency in args.concurrency:
+        for transport in ("rest", "ws"):
+            calls = itertools.cycle(pool)
+            if transport == "rest":
+                r = await rest_load(url, endpoint, calls, concurrency, args.duration)
+            else:
+                r = await ws_load(url, args.tool, calls, concurrency, args.duration)
+            print(f"{transport:<10}{concurrency:>12}{r['rps']:>10,.0f}{r['errors']:>8}"
+                  f"{r['p50_ms']:>9.2f}{r['p95_ms']:>9.2f}{r['p99_ms']:>9.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="running server (default: start serve.py)")
+    parser.add_argument("--port", type=int, default=8766, help="port for the started server")
+    parser.add_argument("--workers", type=int, default=1, help="worker processes for the started server")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32, 128])
+    parser.add_argument("--duration", type=float, default=5.0, help="seconds per row")
+    parser.add_argument("--tool", default="add", help="a GET tool with generated params (see harness.py)")
+    parser.add_argument("--distinct", type=int, default=1000, help="distinct param sets cycled through")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    server = None
+    if args.url is None:
+        os.environ.setdefault("MCP_WS_MAX_IN_FLIGHT", str(max(args.concurrency)))
+        server = start_server(args)
+    try:
+        config = httpx.get(f"{args.url}/mcp-config").json()
+        tools = {t["name"]: t for t in config["mcpServers"]["fastapi-mcp"]["tools"]}
+        spec = tools[args.tool]
+        if spec["method"] != "GET" or generate_params(args.tool, random.Random()) is None:
+            parser.error(f"tool '{args.tool}' is not a GET tool with generated params")
+        asyncio.run(run(args, args.url, spec["endpoint"]))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,320 @@
+#!/usr/bin/env python3
+"""
+Load-testing and latency benchmark harness for the MCP tool endpoints.
+
+Run a closed-loop load test per tool and record req/s and p50/p95/p99
+latency, either in-process against the ASGI app (no network) or against a
+live server:
+
+  python3 benchmarks/harness.py run --concurrency 32 --duration 5 -o results.json
+  python3 benchmarks/harness.py run --url http://localhost:8000 --tools add sqrt
+  python3 benchmarks/harness.py run --serve --workers 2    # starts serve.py itself
+
+Replay a traffic file instead of generated calls (one JSON object per line,
+{"tool": ..., "params": {...}}, the same format as /tools/batch NDJSON,
+`gemini_cli_setup.py call --file` and the MCP_CALL_LOG call log). Several
+files, including gzipped rotated call-log segments, are replayed in order:
+
+  python3 benchmarks/harness.py run --traffic calls.jsonl -o replay.json
+  python3 benchmarks/harness.py run --traffic calls.jsonl.2.gz calls.jsonl.1.gz calls.jsonl
+
+Compare two result files, e.g. from two commits; exits 1 on a regression:
+
+  python3 benchmarks/harness.py compare base.json head.json --threshold 0.10
+"""
+
+import argparse
+import asyncio
+import gzip
+import json
+import os
+import platform
+import random
+import signal
+import subprocess
+import sys
+import time
+
+import httpx
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+
+UNIT_PAIRS = [("km", "mi"), ("F", "C"), ("lb", "kg"), ("h", "s"), ("GiB", "MB")]
+WORDS = ["alpha", "Beta", "GAMMA", "delta", "42", "fox", "Quick", "lazy", "dog", "MCP"]
+
+
+def generate_params(tool, rng):
+    """Random but valid params for each built-in tool."""
+    if tool == "hello":
+        return {"name": rng.choice(WORDS)}
+    if tool == "add":
+        return {"a": rng.randint(-10**6, 10**6), "b": rng.randint(-10**6, 10**6)}
+    if tool == "multiply":
+        return {"a": round(rng.uniform(-1000, 1000), 3), "b": round(rng.uniform(-1000, 1000), 3)}
+    if tool == "temp-convert":
+        return {"celsius": round(rng.uniform(-100, 200), 2)}
+    if tool == "analyze-text":
+        return {"text": " ".join(rng.choice(WORDS) for _ in range(rng.randint(5, 60)))}
+    if tool == "analyze-text-extended":
+        return {"text": " ".join(rng.choice(WORDS) for _ in range(rng.randint(5, 60))),
+                "top_k": rng.randint(1, 20), "ngram": rng.randint(1, 2)}
+    if tool == "sqrt":
+        return {"number": round(rng.uniform(0, 10**6), 3)}
+    if tool in ("add-exact", "multiply-exact"):
+        return {"a": str(rng.randint(-10**30, 10**30)), "b": f"{rng.randint(-10**6, 10**6)}e{rng.randint(-20, 0)}"}
+    if tool == "sqrt-exact":
+        return {"number": f"{rng.randint(0, 10**9)}.{rng.randint(0, 999)}", "digits": rng.choice([15, 50, 200])}
+    if tool == "convert":
+        return {"value": round(rng.uniform(-1000, 1000), 3), **dict(zip(("from_unit", "to_unit"), rng.choice(UNIT_PAIRS)))}
+    if tool == "evaluate":
+        return {"expression": "sqrt((a + b) * c)",
+                "variables": {"a": rng.randint(0, 1000), "b": rng.randint(0, 1000), "c": round(rng.uniform(0, 100), 2)}}
+    return None
+
+
+def percentile(sorted_values, p):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(p / 100 * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+def summarize(latencies, errors, elapsed):
+    latencies.sort()
+    ms = lambda v: round(v * 1000, 3)  # noqa: E731
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": ms(percentile(latencies, 50)),
+        "p95_ms": ms(percentile(latencies, 95)),
+        "p99_ms": ms(percentile(latencies, 99)),
+        "max_ms": ms(latencies[-1]) if latencies else 0.0,
+    }
+
+
+def make_client(url, concurrency):
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    if url:
+        return httpx.AsyncClient(base_url=url, limits=limits, timeout=30)
+    from main import app
+    return httpx.AsyncClient(app=app, base_url="http://harness", limits=limits, timeout=30)
+
+
+def request_kwargs(spec, params):
+    if spec["method"] == "GET":
+        return {"params": params}
+    return {"json": params}
+
+
+async def load(client, next_call, concurrency, duration, max_requests):
+    """Closed loop: `concurrency` workers issue calls until time or count runs out."""
+    latencies = []
+    errors = 0
+    issued = 0
+    deadline = time.monotonic() + duration
+
+    async def worker():
+        nonlocal errors, issued
+        while time.monotonic() < deadline and (max_requests is None or issued < max_requests):
+            issued += 1
+            method, endpoint, kwargs = next_call()
+            start = time.perf_counter()
+            # In-process requests to async routes may never suspend; yield like a
+            # socket read would, so time spent waiting for the event loop counts
+            await asyncio.sleep(0)
+            try:
+                response = await client.request(method, endpoint, **kwargs)
+                ok = response.status_code < 400
+            except httpx.HTTPError:
+                ok = False
+            if ok:
+                latencies.append(time.perf_counter() - start)
+            else:
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return summarize(latencies, errors, time.perf_counter() - start)
+
+
+def read_traffic(paths):
+    """(tool, params) pairs from JSONL files, skipping call-log records that cannot be replayed."""
+    calls = []
+    for path in paths:
+        with (gzip.open(path, "rt") if path.endswith(".gz") else open(path)) as f:
+            for line in f:
+                if line.strip():
+                    entry = json.loads(line)
+                    if entry.get("replayable", True):
+                        calls.append((entry["tool"], entry.get("params") or {}))
+    return calls
+
+
+async def run(args):
+    rng = random.Random(args.seed)
+    async with make_client(args.url, args.concurrency) as client:
+        config = (await client.get("/mcp-config")).json()
+        specs = {t["name"]: t for t in config["mcpServers"]["fastapi-mcp"]["tools"]}
+        results = {}
+
+        if args.traffic:
+            calls = read_traffic(args.traffic)
+            unknown = sorted({tool for tool, _ in calls if tool not in specs})
+            if unknown:
+                raise SystemExit(f"Unknown tools in traffic file: {', '.join(unknown)}")
+            position = 0
+
+            def next_call():
+                nonlocal position
+                tool, params = calls[position % len(calls)]
+                position += 1
+                spec = specs[tool]
+                return spec["method"], spec["endpoint"], request_kwargs(spec, params)
+
+            requests_cap = args.requests or (None if args.loop else len(calls))
+            results["replay"] = await load(client, next_call, args.concurrency, args.duration, requests_cap)
+            print_row("replay", results["replay"])
+        else:
+            for tool in args.tools:
+                if tool not in specs or generate_params(tool, rng) is None:
+                    print(f"Skipping {tool}: no generator for its params")
+                    continue
+                spec = specs[tool]
+
+                def next_call(spec=spec, tool=tool):
+                    return spec["method"], spec["endpoint"], request_kwargs(spec, generate_params(tool, rng))
+
+                await load(client, next_call, args.concurrency, min(1.0, args.duration), 200)  # warm-up
+                results[tool] = await load(client, next_call, args.concurrency, args.duration, args.requests)
+                print_row(tool, results[tool])
+
+    return {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "target": args.url or "in-process",
+            "concurrency": args.concurrency,
+            "duration": args.duration,
+            "python": platform.python_version(),
+            "cpus": os.cpu_count(),
+        },
+        "results": results,
+    }
+
+
+def wait_ready(url, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(f"{url}/readyz").status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError("server did not become ready")
+
+
+def start_server(args):
+    """Launch serve.py on a local port and point args.url at it."""
+    args.url = f"http://127.0.0.1:{args.port}"
+    cmd = [sys.executable, os.path.join(ROOT, "serve.py"), "--workers", str(args.workers),
+           "--port", str(args.port), "--no-access-log", "--log-level", "warning"]
+    server = subprocess.Popen(cmd, cwd=ROOT)
+    try:
+        wait_ready(args.url)
+    except RuntimeError:
+        server.kill()
+        raise
+    return server
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_header():
+    print(f"\n{'tool':<16}{'requests':>10}{'errors':>8}{'req/s':>10}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}")
+    print("=" * 71)
+
+
+def print_row(name, r):
+    print(f"{name:<16}{r['requests']:>10}{r['errors']:>8}{r['rps']:>10,.0f}"
+          f"{r['p50_ms']:>9.2f}{r['p95_ms']:>9.2f}{r['p99_ms']:>9.2f}")
+
+
+def compare(base_path, head_path, threshold):
+    """Print per-tool deltas; return True if any tool regressed beyond threshold."""
+    with open(base_path) as f:
+        base = json.load(f)
+    with open(head_path) as f:
+        head = json.load(f)
+    print(f"\nbase: {base['meta'].get('commit')}  head: {head['meta'].get('commit')}  threshold: {threshold:.0%}")
+    print(f"\n{'tool':<16}{'req/s':>12}{'change':>9}{'p99 ms':>12}{'change':>9}  status")
+    print("=" * 70)
+    regressed = False
+    for tool, h in head["results"].items():
+        b = base["results"].get(tool)
+        if b is None:
+            print(f"{tool:<16}{h['rps']:>12,.0f}{'new':>9}{h['p99_ms']:>12.2f}{'':>9}")
+            continue
+        rps_change = (h["rps"] - b["rps"]) / b["rps"] if b["rps"] else 0.0
+        p99_change = (h["p99_ms"] - b["p99_ms"]) / b["p99_ms"] if b["p99_ms"] else 0.0
+        bad = rps_change < -threshold or p99_change > threshold or h["errors"] > b["errors"]
+        regressed |= bad
+        print(f"{tool:<16}{h['rps']:>12,.0f}{rps_change:>+9.1%}{h['p99_ms']:>12.2f}{p99_change:>+9.1%}"
+              f"  {'REGRESSION' if bad else 'ok'}")
+    return regressed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = sub.add_parser("run", help="run a load test")
+    run_parser.add_argument("--url", help="target a running server instead of the in-process app")
+    run_parser.add_argument("--serve", action="store_true", help="start serve.py locally and target it")
+    run_parser.add_argument("--port", type=int, default=8765, help="port for --serve")
+    run_parser.add_argument("--workers", type=int, default=1, help="worker processes for --serve")
+    run_parser.add_argument("--concurrency", type=int, default=16)
+    run_parser.add_argument("--duration", type=float, default=5.0, help="seconds per tool")
+    run_parser.add_argument("--requests", type=int, help="stop each tool after this many requests")
+    run_parser.add_argument("--tools", nargs="+",
+                            default=["hello", "add", "multiply", "temp-convert", "analyze-text", "sqrt"])
+    run_parser.add_argument("--traffic", nargs="+", help="replay JSONL traffic files (or .gz) instead of generated calls")
+    run_parser.add_argument("--loop", action="store_true", help="loop the traffic until --duration ends")
+    run_parser.add_argument("--seed", type=int, default=1234)
+    run_parser.add_argument("-o", "--output", help="write machine-readable results to this JSON file")
+
+    compare_parser = sub.add_parser("compare", help="compare two result files")
+    compare_parser.add_argument("base")
+    compare_parser.add_argument("head")
+    compare_parser.add_argument("--threshold", type=float, default=0.10,
+                                help="allowed fractional drop in req/s or rise in p99 (default 0.10)")
+
+    args = parser.parse_args()
+    if args.command == "compare":
+        sys.exit(1 if compare(args.base, args.head, args.threshold) else 0)
+
+    server = start_server(args) if args.serve else None
+    try:
+        print_header()
+        report = asyncio.run(run(args))
+    finally:
+        if server is not None:
+            server.send_signal(signal.SIGTERM)
+            server.wait(60)
+    report["meta"]["workers"] = args.workers if server is not None else None
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nResults written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
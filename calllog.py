@@ -0,0 +1,248 @@
+"""
+Structured, sampled logging of tool calls.
+
+Every tool call (REST route, /tools/batch entry or MCP tools/call) can be
+written as one JSON line:
+
+  {"ts": 1760000000.123, "transport": "http", "tool": "add",
+   "params": {"a": 1, "b": 2}, "status": 200, "duration_ms": 0.41, "cache": "miss"}
+
+`tool` and `params` are the same shape as /tools/batch calls, so a log file
+(or a rotated .gz segment) can be replayed directly with
+`benchmarks/harness.py run --traffic calls.jsonl`. Params are the validated
+values when the call got that far, else the raw query string values. Tools
+that read a request body are logged without it and marked
+"replayable": false.
+
+The request path only samples the call and appends a tuple to a bounded
+deque; a background thread turns records into JSON, writes them, rotates
+the file by size and optionally gzips rotated segments. When the queue is
+full, records are dropped and counted rather than making requests wait.
+
+Configure with environment variables (logging is off unless MCP_CALL_LOG is set):
+  MCP_CALL_LOG               log file path; "{pid}" is replaced by the worker's pid
+  MCP_CALL_LOG_SAMPLE        fraction of calls logged, default 1.0
+  MCP_CALL_LOG_SAMPLE_TOOLS  per-tool rates, e.g. "add=0.01,analyze-text=1"
+  MCP_CALL_LOG_ERRORS        always log calls with status >= 400, default 1
+  MCP_CALL_LOG_MAX_BYTES     rotate when the file reaches this size, default 100 MB
+  MCP_CALL_LOG_BACKUPS       rotated segments kept, default 5
+  MCP_CALL_LOG_GZIP          gzip rotated segments, default 0
+  MCP_CALL_LOG_QUEUE         records allowed to wait for the writer, default 100000
+"""
+
+from collections import deque
+from contextvars import ContextVar
+from urllib.parse import parse_qsl
+import gzip
+import json
+import os
+import random
+import shutil
+import threading
+import time
+
+# Filled in by the registry's route and dispatch wrappers with the validated
+# params and whether the result came from the cache
+current_call = ContextVar("current_call", default=None)
+
+FLUSH_INTERVAL = 0.2
+
+
+def _parse_rates(spec):
+    """Parse "tool=rate,..." into {tool: rate}."""
+    rates = {}
+    for item in spec.split(","):
+        if item.strip():
+            name, _, rate = item.partition("=")
+            rates[name.strip()] = float(rate)
+    return rates
+
+
+class CallLog:
+    """Sampling front end on the event loop, JSONL writer thread behind it."""
+
+    def __init__(self, path, sample=1.0, tool_samples=None, keep_errors=True, max_bytes=100_000_000,
+                 backups=5, compress=False, max_queue=100_000):
+        self.path = path
+        self.sample = sample
+        self.tool_samples = tool_samples or {}
+        self.keep_errors = keep_errors
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.compress = compress
+        self.max_queue = max_queue
+        self.queue = deque()
+        # (method, path) -> (tool name, whether the tool takes typed params)
+        self.routes = {}
+        self.logged = 0
+        self.written = 0
+        self.sampled_out = 0
+        self.dropped = 0
+        self.rotations = 0
+        self.write_errors = 0
+        self._file = None
+        self._thread = None
+        self._stop = threading.Event()
+
+    @classmethod
+    def from_env(cls):
+        """The configured CallLog, or None when MCP_CALL_LOG is not set."""
+        env = os.environ.get
+        path = env("MCP_CALL_LOG")
+        if not path:
+            return None
+        return cls(
+            path.replace("{pid}", str(os.getpid())),
+            sample=float(env("MCP_CALL_LOG_SAMPLE", 1.0)),
+            tool_samples=_parse_rates(env("MCP_CALL_LOG_SAMPLE_TOOLS", "")),
+            keep_errors=env("MCP_CALL_LOG_ERRORS", "1").lower() not in ("0", "false", "off", "no"),
+            max_bytes=int(env("MCP_CALL_LOG_MAX_BYTES", 100_000_000)),
+            backups=int(env("MCP_CALL_LOG_BACKUPS", 5)),
+            compress=env("MCP_CALL_LOG_GZIP", "0").lower() in ("1", "true", "on", "yes"),
+            max_queue=int(env("MCP_CALL_LOG_QUEUE", 100_000)),
+        )
+
+    def bind(self, registry):
+        """Map each tool route to its tool; only these paths are logged by the middleware."""
+        self.routes = {(spec.method, spec.endpoint): (spec.name, spec.callable) for spec in registry.specs}
+
+    # ----- Event loop side -----
+
+    def record(self, transport, tool, params, status, duration, cache=None, replayable=True):
+        """Queue one call record, subject to sampling; never blocks."""
+        rate = self.tool_samples.get(tool, self.sample)
+        if rate < 1.0 and not (self.keep_errors and status >= 400) and random.random() >= rate:
+            self.sampled_out += 1
+            return
+        if len(self.queue) >= self.max_queue:
+            self.dropped += 1
+            return
+        self.queue.append((time.time(), transport, tool, params, status, duration, cache, replayable))
+        self.logged += 1
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="mcp-call-log", daemon=True)
+            self._thread.start()
+
+    def info(self):
+        return {
+            "path": self.path,
+            "sample": self.sample,
+            "tool_samples": self.tool_samples,
+            "logged": self.logged,
+            "written": self.written,
+            "queued": len(self.queue),
+            "sampled_out": self.sampled_out,
+            "dropped": self.dropped,
+            "rotations": self.rotations,
+            "write_errors": self.write_errors,
+        }
+
+    def close(self):
+        """Write out everything queued and stop the writer thread."""
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+            self._stop.clear()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    # ----- Writer thread -----
+
+    def _run(self):
+        while not self._stop.wait(FLUSH_INTERVAL):
+            self._drain()
+        self._drain()
+
+    def _drain(self):
+        queue = self.queue
+        lines = []
+        while queue:
+            ts, transport, tool, params, status, duration, cache, replayable = queue.popleft()
+            entry = {"ts": round(ts, 3), "transport": transport, "tool": tool, "params": params,
+                     "status": status, "duration_ms": round(duration * 1000, 3), "cache": cache}
+            if not replayable:
+                entry["replayable"] = False
+            lines.append(json.dumps(entry, default=str))
+        if not lines:
+            return
+        try:
+            if self._file is None:
+                self._file = open(self.path, "a", encoding="utf-8")
+            self._file.write("\n".join(lines) + "\n")
+            self._file.flush()
+            self.written += len(lines)
+            if self._file.tell() >= self.max_bytes:
+                self._rotate()
+        except OSError:
+            self.write_errors += 1
+
+    def _segment(self, n):
+        return f"{self.path}.{n}" + (".gz" if self.compress else "")
+
+    def _rotate(self):
+        """calls.jsonl -> calls.jsonl.1[.gz], shifting older segments up by one."""
+        self._file.close()
+        self._file = None
+        self.rotations += 1
+        if self.backups <= 0:
+            os.remove(self.path)
+            return
+        for n in range(self.backups - 1, 0, -1):
+            if os.path.exists(self._segment(n)):
+                os.replace(self._segment(n), self._segment(n + 1))
+        if self.compress:
+            with open(self.path, "rb") as src, gzip.open(self._segment(1), "wb", compresslevel=6) as dst:
+                shutil.copyfileobj(src, dst, 1024 * 1024)
+            os.remove(self.path)
+        else:
+            os.replace(self.path, self._segment(1))
+
+
+class CallLogMiddleware:
+    """Pure ASGI middleware logging each request to a tool route.
+
+    Requests the admission controller rejects are logged too, with their
+    429/503 status. Batch and MCP calls are logged by their handlers, one
+    record per inner call.
+    """
+
+    def __init__(self, app, log):
+        self.app = app
+        self.log = log
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        route = self.log.routes.get((scope["method"], scope["path"]))
+        if route is None:
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        call = {}
+        token = current_call.set(call)
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            current_call.reset(token)
+            name, typed = route
+            params = call.get("params")
+            if params is None:
+                params = dict(parse_qsl(scope["query_string"].decode("latin-1")))
+            self.log.record("http", name, params, status, time.perf_counter() - start,
+                            call.get("cache"), replayable=typed)
+
+
+# The call log shared by the app's middleware and handlers (None when disabled)
+call_log = CallLog.from_env()
@@ -0,0 +1,241 @@
+"""
+Document upload for the text-analysis tools.
+
+POST /tools/analyze-document takes a text file either as a multipart/form-data
+file field or as the raw request body. The upload is read chunk by chunk:
+up to MCP_UPLOAD_SPOOL_BYTES stays in memory, anything larger is spooled to a
+temporary file with aiofiles and then scanned through a memory map on the
+process pool (text_stream.analyze_mapped), so memory use stays flat however
+large the file is. `?parallel=N` splits the file into N whitespace-aligned
+slices scanned by separate workers and merged in order, which gives exactly
+the single-pass counts.
+
+Environment variables:
+  MCP_UPLOAD_DIR          where uploads are spooled, default the system temp dir
+  MCP_UPLOAD_SPOOL_BYTES  largest upload kept in memory, default 1 MiB
+  MCP_UPLOAD_MAX_BYTES    largest upload accepted, default 10 GiB
+"""
+
+import asyncio
+import os
+import tempfile
+
+import aiofiles
+import aiofiles.os
+from fastapi import APIRouter, Request
+from fastapi.responses import JSONResponse
+from multipart.exceptions import MultipartParseError
+from multipart.multipart import MultipartParser, parse_options_header
+
+from execution import PoolFullError
+from registry import overloaded_response, registry, tool
+from text_stream import analyze_bytes, analyze_mapped, file_slices, options_from_query
+
+router = APIRouter()
+
+UPLOAD_DIR = os.environ.get("MCP_UPLOAD_DIR") or None
+SPOOL_BYTES = int(os.environ.get("MCP_UPLOAD_SPOOL_BYTES", 1024 * 1024))
+MAX_UPLOAD_BYTES = int(os.environ.get("MCP_UPLOAD_MAX_BYTES", 10 * 1024 ** 3))
+# Spooled writes are batched to this size, so each one is a single thread hop
+WRITE_BUFFER = 1024 * 1024
+
+
+class UploadError(ValueError):
+    """Raised when an upload cannot be accepted; carries the HTTP status."""
+
+    def __init__(self, message, status_code=400):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class Spool:
+    """Upload bytes held in memory up to `threshold`, then in a temporary file.
+
+    Use as an async context manager; the file is deleted on exit.
+    """
+
+    def __init__(self, threshold=SPOOL_BYTES, limit=MAX_UPLOAD_BYTES, directory=UPLOAD_DIR):
+        self.threshold = threshold
+        self.limit = limit
+        self.directory = directory
+        self.size = 0
+        self.filename = None
+        # The spooled file's path, or None while the upload is in memory
+        self.path = None
+        self.file = None
+        self._pending = []
+        self._pending_size = 0
+
+    @property
+    def data(self):
+        return b"".join(self._pending)
+
+    async def write(self, data):
+        if not data:
+            return
+        self.size += len(data)
+        if self.size > self.limit:
+            raise UploadError(f"Upload exceeds {self.limit} bytes", status_code=413)
+        self._pending.append(data)
+        self._pending_size += len(data)
+        if self.file is None and self.size > self.threshold:
+            fd, self.path = tempfile.mkstemp(prefix="mcp-upload-", suffix=".txt", dir=self.directory)
+            os.close(fd)
+            self.file = await aiofiles.open(self.path, "wb")
+        if self.file is not None and self._pending_size >= WRITE_BUFFER:
+            await self.flush()
+
+    async def flush(self):
+        if self.file is not None and self._pending:
+            await self.file.write(b"".join(self._pending))
+            await self.file.flush()
+            self._pending = []
+            self._pending_size = 0
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        if self.file is not None:
+            await self.file.close()
+            await aiofiles.os.remove(self.path)
+
+
+class _FilePart:
+    """python-multipart callbacks that collect the first file field's data.
+
+    The callbacks run synchronously inside parser.write(); data is queued
+    here and written to the spool by receive_upload between chunks.
+    """
+
+    def __init__(self):
+        self.header_name = b""
+        self.header_value = b""
+        self.disposition = b""
+        self.in_file = False
+        self.found = False
+        self.filename = None
+        self.data = []
+
+    def on_part_begin(self):
+        self.disposition = b""
+
+    def on_header_field(self, data, start, end):
+        self.header_name += data[start:end]
+
+    def on_header_value(self, data, start, end):
+        self.header_value += data[start:end]
+
+    def on_header_end(self):
+        if self.header_name.lower() == b"content-disposition":
+            self.disposition = self.header_value
+        self.header_name = b""
+        self.header_value = b""
+
+    def on_headers_finished(self):
+        _, options = parse_options_header(self.disposition)
+        self.in_file = not self.found and b"filename" in options
+        if self.in_file:
+            self.found = True
+            self.filename = options[b"filename"].decode("utf-8", "replace")
+
+    def on_part_data(self, data, start, end):
+        if self.in_file:
+            self.data.append(data[start:end])
+
+    def on_part_end(self):
+        self.in_file = False
+
+    def callbacks(self):
+        return {name: getattr(self, name) for name in (
+            "on_part_begin", "on_header_field", "on_header_value", "on_header_end",
+            "on_headers_finished", "on_part_data", "on_part_end",
+        )}
+
+
+async def receive_upload(request, spool):
+    """Stream the request's document into `spool`: a multipart file field or the raw body."""
+    length = request.headers.get("content-length")
+    if length and length.isdigit() and int(length) > spool.limit:
+        raise UploadError(f"Upload exceeds {spool.limit} bytes", status_code=413)
+
+    content_type, options = parse_options_header(request.headers.get("content-type", ""))
+    if content_type != b"multipart/form-data":
+        async for chunk in request.stream():
+            await spool.write(chunk)
+        await spool.flush()
+        return
+
+    if b"boundary" not in options:
+        raise UploadError("Missing boundary in multipart body")
+    part = _FilePart()
+    parser = MultipartParser(options[b"boundary"], part.callbacks())
+    try:
+        async for chunk in request.stream():
+            parser.write(chunk)
+            for data in part.data:
+                await spool.write(data)
+            part.data.clear()
+        parser.finalize()
+    except MultipartParseError as e:
+        raise UploadError(f"Malformed multipart body: {e}")
+    if not part.found:
+        raise UploadError("Multipart body must contain a file field")
+    spool.filename = part.filename
+    await spool.flush()
+
+
+async def analyze_spool(spool, options, parallel):
+    """Analyze a received upload on the process pool; returns (result, slices)."""
+    pool = registry.pools["process"]
+    if spool.path is None:
+        stats = await pool.run(analyze_bytes, spool.data, options)
+        return stats.result(), 1
+    slices = file_slices(spool.path, min(parallel or pool.workers, pool.workers))
+    parts = await asyncio.gather(*(
+        pool.run(analyze_mapped, spool.path, start, end, options) for start, end in slices
+    ))
+    stats = parts[0]
+    for part in parts[1:]:
+        stats.merge(part)
+    return stats.result(), len(slices)
+
+
+@router.post("/tools/analyze-document")
+@tool("analyze-document", "Analyzes an uploaded text file of any size (multipart file field or raw body)", params={
+    "file": {"type": "string", "description": "UTF-8 document, as a multipart/form-data file field or the raw request body", "required": True},
+    "extended": {"type": "boolean", "description": "Query flag: return the analyze-text-extended statistics", "default": False},
+    "top_k": {"type": "integer", "description": "Query param for extended mode: most frequent terms to return", "default": 10},
+    "ngram": {"type": "integer", "description": "Query param for extended mode: words per term (1-3)", "default": 1},
+    "approximate": {"type": "boolean", "description": "Query flag for extended mode: bounded-memory sketches", "default": False},
+    "parallel": {"type": "integer", "description": "Query param: slices scanned in parallel on the process pool, 0 for one per worker", "default": 1},
+})
+async def analyze_document_tool(request: Request):
+    """
+    MCP Tool: Analyzes an uploaded text file of any size.
+
+    Returns the analyze-text counts (or, with ?extended=true, the
+    analyze-text-extended statistics) plus the upload's size in bytes and
+    how many slices were scanned.
+    """
+    options, error = options_from_query(request.query_params)
+    if error:
+        return JSONResponse({"error": error}, status_code=400)
+    try:
+        parallel = int(request.query_params.get("parallel", 1))
+    except ValueError:
+        return JSONResponse({"error": "parallel must be an integer"}, status_code=400)
+    if parallel < 0:
+        return JSONResponse({"error": "parallel must be 0 or more"}, status_code=400)
+
+    try:
+        async with Spool() as spool:
+            await receive_upload(request, spool)
+            result, slices = await analyze_spool(spool, options, parallel)
+    except UploadError as e:
+        return JSONResponse({"error": str(e)}, status_code=e.status_code)
+    except UnicodeDecodeError:
+        return JSONResponse({"error": "Document must be UTF-8 text"}, status_code=400)
+    except PoolFullError as e:
+        return overloaded_response(e)
+    return {"filename": spool.filename, "bytes": spool.size, "slices": slices, **result}
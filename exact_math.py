@@ -0,0 +1,266 @@
+"""
+Exact (arbitrary-precision) variants of the math tools.
+
+`add` takes ints and `multiply`/`sqrt` take floats, so large or precise
+values lose precision silently. These tools take numbers as strings and
+return them as strings, so nothing passes through a float on the wire:
+
+  integers   "123456789012345678901234567890"   big-int arithmetic
+  decimals   "0.1", "-2.5e-30"                  exact Decimal arithmetic
+  fractions  "1/3"                               exact Fraction arithmetic
+
+Sums and products are exact, in the widest kind among the inputs
+(integer < decimal < fraction). Integers, the common case, stay plain ints
+and never go through Decimal or Fraction. A square root is returned in full
+when it is exact, and otherwise correctly rounded (half-even) to the
+requested significant digits, by one of:
+
+  decimal  integers and decimals when digits <= 50: Decimal.sqrt
+  isqrt    fractions, and larger digit counts: math.isqrt on scaled integers
+"""
+
+from decimal import Context, Decimal, Inexact, InvalidOperation, ROUND_HALF_EVEN
+from fractions import Fraction
+import math
+import re
+
+from fastapi import APIRouter
+
+from registry import tool
+from response_models import ExactArithmeticResult, ExactSqrtResult
+
+router = APIRouter()
+
+# Bounds on input size keep results under Python's int/str conversion limit
+# (4300 digits) and the work per call small
+MAX_DIGITS = 1000
+MAX_EXPONENT = 1000
+MAX_SQRT_DIGITS = 1000
+# Results with a decimal exponent beyond this are written in E notation
+PLAIN_EXPONENT = 100
+# Decimal.sqrt is faster up to about this many digits, math.isqrt beyond
+# (about 5x at 1000 digits); see benchmarks/bench_exact.py
+DECIMAL_SQRT_DIGITS = 50
+
+# Wide enough that sums and products of bounded inputs are never rounded;
+# Inexact is trapped so a rounded result could not go unnoticed
+EXACT = Context(prec=4 * MAX_DIGITS + 2 * MAX_EXPONENT, Emax=10 * MAX_EXPONENT, Emin=-10 * MAX_EXPONENT,
+                traps=[InvalidOperation, Inexact])
+# Decimal.sqrt contexts by precision; only their precision is read, never their flags
+_SQRT_CONTEXTS = {}
+
+# Underscores between digits as in Python literals, which int() accepts too
+_INTEGER = re.compile(r"[+-]?\d+(?:_\d+)*")
+
+
+class ExactInputError(ValueError):
+    """Raised when a string is not a number the exact tools accept."""
+
+
+# ----- Parsing and formatting -----
+
+def parse_number(text):
+    """int, Decimal or Fraction for a number string."""
+    text = text.strip()
+    if len(text) > MAX_DIGITS and sum(c.isdigit() for c in text) > MAX_DIGITS:
+        raise ExactInputError(f"Numbers are limited to {MAX_DIGITS} digits")
+    if _INTEGER.fullmatch(text):
+        return int(text)
+    if "/" in text:
+        try:
+            return Fraction(text)
+        except ZeroDivisionError:
+            raise ExactInputError("Denominator must not be zero") from None
+        except ValueError:
+            raise ExactInputError(f"Not a fraction: {text[:50]!r} (use integers, like 1/3)") from None
+    try:
+        value = Decimal(text)
+    except InvalidOperation:
+        raise ExactInputError(f"Not a number: {text[:50]!r} (use an integer, a decimal or a fraction like 1/3)") from None
+    if not value.is_finite():
+        raise ExactInputError("Numbers must be finite")
+    if abs(value.adjusted()) > MAX_EXPONENT:
+        raise ExactInputError(f"Exponents are limited to ±{MAX_EXPONENT}")
+    return value
+
+
+def kind(value):
+    if isinstance(value, int):
+        return "integer"
+    if isinstance(value, Fraction):
+        return "fraction"
+    return "decimal"
+
+
+def format_number(value):
+    if isinstance(value, int):
+        return str(value)
+    if isinstance(value, Fraction):
+        return str(value)
+    if not value:
+        return "0"
+    text = str(value)
+    # str() is plain notation for most values; only trailing zeros need trimming
+    if "E" not in text:
+        return text.rstrip("0").rstrip(".") if "." in text else text
+    value = value.normalize(EXACT)
+    if abs(value.adjusted()) > PLAIN_EXPONENT:
+        return str(value)
+    return f"{value:f}"
+
+
+# ----- Arithmetic -----
+
+def exact_add(a, b):
+    if isinstance(a, int) and isinstance(b, int):
+        return a + b
+    if isinstance(a, Fraction) or isinstance(b, Fraction):
+        return Fraction(a) + Fraction(b)
+    return EXACT.add(a, b)
+
+
+def exact_multiply(a, b):
+    if isinstance(a, int) and isinstance(b, int):
+        return a * b
+    if isinstance(a, Fraction) or isinstance(b, Fraction):
+        return Fraction(a) * Fraction(b)
+    return EXACT.multiply(a, b)
+
+
+def _scaled_isqrt(p, q, shift):
+    """floor(sqrt(p/q) * 10**shift), and whether sqrt(p/q) * 10**shift rounds up from it."""
+    if shift >= 0:
+        numerator, denominator = p * 100 ** shift, q
+    else:
+        numerator, denominator = p, q * 100 ** -shift
+    root = math.isqrt(numerator // denominator)
+    # Compare sqrt(n/d) with root + 1/2, i.e. 4n with d * (2 * root + 1)**2
+    difference = 4 * numerator - denominator * (2 * root + 1) ** 2
+    return root, difference > 0 or (difference == 0 and root % 2 == 1)
+
+
+def _sqrt_rational(value, digits):
+    """(root, exact) for sqrt of a Fraction via isqrt: the exact root as a
+    Fraction, or a Decimal rounded half-even to `digits` significant digits."""
+    p, q = value.numerator, value.denominator
+    root_p, root_q = math.isqrt(p), math.isqrt(q)
+    if root_p * root_p == p and root_q * root_q == q:
+        return Fraction(root_p, root_q), True
+    # Decimal digits of sqrt(p/q) before the point, from bit lengths; the
+    # estimate is refined below until the truncated root has `digits` digits
+    magnitude = int((p.bit_length() - q.bit_length()) * 0.150515)
+    shift = digits - 1 - magnitude
+    while True:
+        root, round_up = _scaled_isqrt(p, q, shift)
+        if root >= 10 ** digits:
+            shift -= 1
+        elif root < 10 ** (digits - 1):
+            shift += 1
+        else:
+            # Rounding 99..9 up gives 10**digits, still the correctly rounded value
+            return EXACT.scaleb(Decimal(root + round_up), -shift), False
+
+
+def _sqrt_decimal(value, digits):
+    """(root, exact) from Decimal.sqrt, with the full root when it is exact."""
+    context = _SQRT_CONTEXTS.get(digits)
+    if context is None:
+        context = _SQRT_CONTEXTS.setdefault(digits, Context(prec=digits, rounding=ROUND_HALF_EVEN,
+                                                            Emax=EXACT.Emax, Emin=EXACT.Emin))
+    root = context.sqrt(value)
+    if EXACT.multiply(root, root) == value:
+        return root, True
+    # An exact root may need more than `digits` digits
+    p, q = value.as_integer_ratio()
+    root_p, root_q = math.isqrt(p), math.isqrt(q)
+    if root_p * root_p == p and root_q * root_q == q:
+        # q is a product of 2s and 5s, so the quotient terminates
+        return EXACT.divide(Decimal(root_p), Decimal(root_q)), True
+    return root, False
+
+
+def exact_sqrt(value, digits):
+    """(root, exact, method): the full root when it is exact, else `digits` significant digits.
+
+    root is an int, a Decimal or a Fraction.
+    """
+    if not isinstance(value, Fraction) and digits <= DECIMAL_SQRT_DIGITS:
+        root, exact = _sqrt_decimal(Decimal(value), digits)
+        if exact and isinstance(value, int):
+            root = int(root)
+        return root, exact, "decimal"
+    root, exact = _sqrt_rational(Fraction(value), digits)
+    if exact and isinstance(value, int):
+        root = root.numerator
+    elif exact and isinstance(value, Decimal):
+        # Same kind whichever method ran; q is a product of 2s and 5s, as above
+        root = EXACT.divide(Decimal(root.numerator), Decimal(root.denominator))
+    return root, exact, "isqrt"
+
+
+def is_negative(value):
+    return value < 0
+
+
+# ----- Tools -----
+
+def _binary(operation, fn, a, b):
+    try:
+        x, y = parse_number(a), parse_number(b)
+    except ExactInputError as e:
+        return {"error": str(e)}
+    result = fn(x, y)
+    return {
+        "operation": operation,
+        "a": format_number(x),
+        "b": format_number(y),
+        "result": format_number(result),
+        "type": kind(result),
+    }
+
+
+@router.get("/tools/add/exact")
+@tool("add-exact", "Adds two numbers exactly; numbers are strings (big integers, decimals or fractions like 1/3)",
+      params={"a": "First number, as a string", "b": "Second number, as a string"}, response=ExactArithmeticResult)
+def add_exact_tool(a: str, b: str):
+    """
+    MCP Tool: Adds two numbers with no loss of precision.
+    """
+    return _binary("addition", exact_add, a, b)
+
+
+@router.get("/tools/multiply/exact")
+@tool("multiply-exact", "Multiplies two numbers exactly; numbers are strings (big integers, decimals or fractions)",
+      params={"a": "First number, as a string", "b": "Second number, as a string"}, response=ExactArithmeticResult)
+def multiply_exact_tool(a: str, b: str):
+    """
+    MCP Tool: Multiplies two numbers with no loss of precision.
+    """
+    return _binary("multiplication", exact_multiply, a, b)
+
+
+@router.get("/tools/sqrt/exact")
+@tool("sqrt-exact", "Square root to a requested number of significant digits, or exact when the root is exact",
+      params={"number": "Number, as a string (integer, decimal or fraction)",
+              "digits": f"Significant digits of an inexact root (1-{MAX_SQRT_DIGITS})"},
+      response=ExactSqrtResult)
+def sqrt_exact_tool(number: str, digits: int = 50):
+    """
+    MCP Tool: Calculates a square root to any precision.
+    """
+    if not 1 <= digits <= MAX_SQRT_DIGITS:
+        return {"error": f"digits must be between 1 and {MAX_SQRT_DIGITS}"}
+    try:
+        value = parse_number(number)
+    except ExactInputError as e:
+        return {"error": str(e)}
+    if is_negative(value):
+        return {"error": "Cannot calculate square root of negative number"}
+    root, exact, method = exact_sqrt(value, digits)
+    return {
+        "number": format_number(value),
+        "digits": digits,
+        "square_root": format_number(root),
+        "exact": exact,
+        "method": method,
+    }
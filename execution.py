@@ -0,0 +1,191 @@
+"""
+Execution policies for tool bodies.
+
+Each tool runs under one of three policies, chosen with
+@tool(..., execution=...) and overridable per deployment:
+
+  - "inline":   called directly on the event loop; no thread hop. For
+                trivial tools whose body costs less than a context switch.
+  - "thread":   a bounded thread pool, for tools that block on I/O.
+  - "process":  a bounded process pool, for CPU-heavy tools. These run in
+                parallel with the event loop and each other, so one huge
+                input cannot starve everything else.
+
+Pools are created on first use. When a pool already has `workers +
+queue_depth` calls pending, new calls fail fast with PoolFullError instead
+of queueing without bound.
+
+Identical concurrent calls to a pure tool off the event loop are coalesced by
+SingleFlight: later callers await the call already running instead of
+starting another (disable with MCP_COALESCE=0).
+
+Configure with environment variables:
+  MCP_THREAD_WORKERS   default 8
+  MCP_THREAD_QUEUE     pending calls beyond the workers, default 64
+  MCP_PROCESS_WORKERS  default CPU count
+  MCP_PROCESS_QUEUE    pending calls beyond the workers, default 32
+  MCP_EXECUTION        per-tool overrides, e.g. "analyze-text=thread,sqrt=inline"
+"""
+
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import asyncio
+import os
+
+POLICIES = ("inline", "thread", "process")
+
+
+class PoolFullError(Exception):
+    """A pool's wait queue is full; the caller should retry later."""
+
+    def __init__(self, pool):
+        super().__init__(f"The {pool} pool is full")
+        self.pool = pool
+
+
+class BoundedPool:
+    """A lazily started executor with a cap on pending calls."""
+
+    def __init__(self, kind, workers, queue_depth):
+        self.kind = kind
+        self.workers = max(1, workers)
+        self.queue_depth = max(0, queue_depth)
+        self.executor = None
+        self.pending = 0
+        self.completed = 0
+        self.rejected = 0
+
+    def _start(self):
+        if self.kind == "process":
+            self.executor = ProcessPoolExecutor(max_workers=self.workers)
+        else:
+            self.executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="mcp-tool")
+
+    async def run(self, fn, *args):
+        """Run fn(*args) on the pool; raises PoolFullError when saturated."""
+        if self.pending >= self.workers + self.queue_depth:
+            self.rejected += 1
+            raise PoolFullError(self.kind)
+        if self.executor is None:
+            self._start()
+        self.pending += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self.executor, fn, *args)
+        finally:
+            self.pending -= 1
+            self.completed += 1
+
+    def info(self):
+        return {
+            "workers": self.workers,
+            "queue_depth": self.queue_depth,
+            "pending": self.pending,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "started": self.executor is not None,
+        }
+
+    def shutdown(self):
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
+
+    def recycle(self):
+        """Start a new executor on the next call; the old one finishes its calls and exits."""
+        if self.executor is not None:
+            self.executor.shutdown(wait=False)
+            self.executor = None
+
+
+def overrides_from_env():
+    """Parse MCP_EXECUTION ("tool=policy,...") into a dict."""
+    overrides = {}
+    for item in os.environ.get("MCP_EXECUTION", "").split(","):
+        if not item.strip():
+            continue
+        name, _, policy = item.partition("=")
+        policy = policy.strip()
+        if policy not in POLICIES:
+            raise ValueError(f"MCP_EXECUTION: unknown policy '{policy}' for '{name.strip()}'")
+        overrides[name.strip()] = policy
+    return overrides
+
+
+def pools_from_env():
+    return {
+        "thread": BoundedPool(
+            "thread",
+            int(os.environ.get("MCP_THREAD_WORKERS", 8)),
+            int(os.environ.get("MCP_THREAD_QUEUE", 64)),
+        ),
+        "process": BoundedPool(
+            "process",
+            int(os.environ.get("MCP_PROCESS_WORKERS", os.cpu_count() or 1)),
+            int(os.environ.get("MCP_PROCESS_QUEUE", 32)),
+        ),
+    }
+
+
+class _Flight:
+    __slots__ = ("task", "waiters")
+
+    def __init__(self, task):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Coalesces identical concurrent calls into one execution.
+
+    The first caller for a key starts the work as a task; callers arriving
+    while it runs await the same task. Every waiter gets the same result or
+    the same exception. A waiter that is cancelled leaves without disturbing
+    the others; when the last waiter leaves, the work itself is cancelled.
+    """
+
+    def __init__(self):
+        self.flights = {}
+        self.executions = 0
+        self.coalesced = 0
+        # Repeated calls answered from an earlier entry of the same batch
+        self.batch_duplicates = 0
+
+    async def run(self, key, make_call):
+        """Await make_call() for `key`, sharing it with identical concurrent callers."""
+        flight = self.flights.get(key)
+        if flight is None:
+            flight = self.flights[key] = _Flight(asyncio.ensure_future(make_call()))
+            flight.task.add_done_callback(lambda task: self._finished(key, flight))
+            self.executions += 1
+        else:
+            self.coalesced += 1
+        flight.waiters += 1
+        try:
+            return await asyncio.shield(flight.task)
+        finally:
+            flight.waiters -= 1
+            if not flight.waiters and not flight.task.done():
+                # Everyone gave up: stop the work and let the next caller start afresh
+                self._finished(key, flight)
+                flight.task.cancel()
+
+    def forget(self, tools):
+        """Let new calls of the named tools start afresh instead of joining running ones."""
+        prefixes = tuple(tool + "?" for tool in tools)
+        for key in [key for key in self.flights if key.startswith(prefixes)]:
+            del self.flights[key]
+
+    def _finished(self, key, flight):
+        if self.flights.get(key) is flight:
+            del self.flights[key]
+        if flight.task.done() and not flight.task.cancelled():
+            flight.task.exception()  # mark retrieved; waiters already saw it
+
+    def info(self):
+        calls = self.executions + self.coalesced
+        return {
+            "executions": self.executions,
+            "coalesced": self.coalesced,
+            "in_flight": len(self.flights),
+            "coalesced_rate": round(self.coalesced / calls, 4) if calls else 0.0,
+            "batch_duplicates": self.batch_duplicates,
+        }
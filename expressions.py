@@ -0,0 +1,380 @@
+"""
+The `evaluate` tool: arithmetic pipelines computed server-side in one call.
+
+Instead of chaining add -> multiply -> sqrt calls, each a round trip, an
+agent sends the whole computation:
+
+  {"expression": "sqrt((a + b) * c)", "variables": {"a": 1, "b": 2, "c": 3}}
+
+or a small DAG of named steps, each free to use the variables and any
+earlier step (the last step is the result):
+
+  {"steps": {"s": "a + b", "p": "multiply(s, c)", "r": "sqrt(p)"}, "variables": {...}}
+
+Expressions have numbers, variables, + - * / with the usual precedence,
+unary minus, parentheses, and the tool operations add(x, y), multiply(x, y)
+and sqrt(x). They are parsed by a small recursive-descent parser (never
+eval) into a compiled program, a tree of closures; compiled programs are
+kept in an LRU keyed by the expression text, so a repeated shape is not
+parsed again. Arithmetic is in double precision with no intermediate
+rounding.
+
+`bindings` evaluates one program against many variable sets at once: the
+variables become NumPy columns and the program runs once over all of them.
+Rows that fail (a negative square root or division by zero at any step, or
+a non-finite result) are re-run one by one for their error message and come
+back as null results.
+
+Environment variables:
+  MCP_EXPRESSION_CACHE_SIZE  compiled programs kept, default 1024
+"""
+
+from functools import lru_cache
+import math
+import operator
+import os
+import re
+from typing import Annotated, Dict, List, Optional
+
+from fastapi import APIRouter, Body
+import numpy as np
+
+from registry import tool
+from response_models import EvaluateResult
+
+router = APIRouter()
+
+EXPRESSION_CACHE_SIZE = int(os.environ.get("MCP_EXPRESSION_CACHE_SIZE", 1024))
+MAX_EXPRESSION_LENGTH = 4096
+MAX_DEPTH = 64
+# Operators and function calls per expression; with MAX_DEPTH this bounds
+# the depth of the compiled tree, which is evaluated recursively
+MAX_OPERATIONS = 256
+MAX_STEPS = 64
+MAX_BINDINGS = 100_000
+# Fewer bindings than this are evaluated one by one; NumPy's per-call
+# overhead outweighs the vectorized loop on tiny columns
+VECTOR_MIN_BINDINGS = 16
+
+_TOKEN = re.compile(r"\s*(?:(\d+\.?\d*(?:[eE][+-]?\d+)?|\.\d+(?:[eE][+-]?\d+)?)|([A-Za-z_]\w*)|(.))")
+
+
+class ExpressionError(ValueError):
+    """Raised for an expression that cannot be parsed or evaluated."""
+
+
+# ----- Operations -----
+
+def _divide(x, y):
+    if y == 0:
+        raise ExpressionError("Division by zero")
+    return x / y
+
+
+def _sqrt(x):
+    if x < 0:
+        raise ExpressionError("Cannot calculate square root of negative number")
+    return math.sqrt(x)
+
+
+# name -> (arity, scalar function, column function); the column functions
+# return NaN/inf for the rows the scalar ones reject, and COLUMN_DOMAINS
+# flags those rows as they are computed
+FUNCTIONS = {
+    "add": (2, operator.add, np.add),
+    "multiply": (2, operator.mul, np.multiply),
+    "sqrt": (1, _sqrt, np.sqrt),
+}
+OPERATORS = {
+    "+": (operator.add, np.add),
+    "-": (operator.sub, np.subtract),
+    "*": (operator.mul, np.multiply),
+    "/": (_divide, np.divide),
+}
+# column function -> the rows (a mask) its scalar function raises for. The
+# mask is kept because a failure need not reach the result: 1 / (x / 0) is 0
+COLUMN_DOMAINS = {
+    np.divide: lambda x, y: y == 0,
+    np.sqrt: lambda x: x < 0,
+}
+# Key of the failed-rows mask in a column evaluation's env (never a variable name)
+_FAILED = "#failed"
+
+
+# ----- Parsing -----
+
+class _Parser:
+    """Recursive descent over the tokens of one expression, building a node tree.
+
+    Nodes are ("num", value), ("var", name) and (scalar fn, column fn, *children).
+    """
+
+    def __init__(self, text):
+        if len(text) > MAX_EXPRESSION_LENGTH:
+            raise ExpressionError(f"Expressions are limited to {MAX_EXPRESSION_LENGTH} characters")
+        self.tokens = []
+        for match in _TOKEN.finditer(text):
+            number, name, symbol = match.groups()
+            if symbol is not None and symbol not in "+-*/(),":
+                if symbol.isspace():
+                    continue
+                raise ExpressionError(f"Unexpected {symbol!r} at position {match.start(3)}")
+            kind = "num" if number is not None else "name" if name is not None else symbol
+            self.tokens.append((kind, number or name or symbol, match.start(match.lastindex)))
+        self.tokens.append(("end", "", len(text)))
+        self.index = 0
+        self.depth = 0
+        self.operations = 0
+
+    def peek(self):
+        return self.tokens[self.index][0]
+
+    def take(self, kind=None):
+        token = self.tokens[self.index]
+        if kind is not None and token[0] != kind:
+            found = "end of expression" if token[0] == "end" else repr(token[1])
+            raise ExpressionError(f"Expected {kind!r} but found {found} at position {token[2]}")
+        self.index += 1
+        return token
+
+    def operation(self, *node):
+        self.operations += 1
+        if self.operations > MAX_OPERATIONS:
+            raise ExpressionError(f"Expressions are limited to {MAX_OPERATIONS} operations")
+        return node
+
+    def parse(self):
+        node = self.expression()
+        self.take("end")
+        return node
+
+    def expression(self):
+        node = self.term()
+        while self.peek() in ("+", "-"):
+            node = self.operation(*OPERATORS[self.take()[0]], node, self.term())
+        return node
+
+    def term(self):
+        node = self.unary()
+        while self.peek() in ("*", "/"):
+            node = self.operation(*OPERATORS[self.take()[0]], node, self.unary())
+        return node
+
+    def unary(self):
+        if self.peek() == "-":
+            self.take()
+            return self.operation(operator.neg, np.negative, self.nested(self.unary))
+        if self.peek() == "+":
+            self.take()
+            return self.nested(self.unary)
+        return self.primary()
+
+    def nested(self, rule):
+        self.depth += 1
+        if self.depth > MAX_DEPTH:
+            raise ExpressionError(f"Expressions are limited to {MAX_DEPTH} levels of nesting")
+        node = rule()
+        self.depth -= 1
+        return node
+
+    def primary(self):
+        kind, value, position = self.take()
+        if kind == "num":
+            return ("num", float(value))
+        if kind == "(":
+            node = self.nested(self.expression)
+            self.take(")")
+            return node
+        if kind == "name":
+            if self.peek() != "(":
+                if value in FUNCTIONS:
+                    raise ExpressionError(f"'{value}' is a function; call it like {value}(...)")
+                return ("var", value)
+            if value not in FUNCTIONS:
+                raise ExpressionError(f"Unknown function '{value}' at position {position}; "
+                                      f"use {', '.join(FUNCTIONS)}")
+            arity, scalar, column = FUNCTIONS[value]
+            self.take("(")
+            args = [self.nested(self.expression)]
+            while self.peek() == ",":
+                self.take()
+                args.append(self.nested(self.expression))
+            self.take(")")
+            if len(args) != arity:
+                raise ExpressionError(f"{value}() takes {arity} argument{'s' if arity > 1 else ''}, got {len(args)}")
+            return self.operation(scalar, column, *args)
+        found = "end of expression" if kind == "end" else repr(value)
+        raise ExpressionError(f"Unexpected {found} at position {position}")
+
+
+# ----- Compiling -----
+
+def _fold(node):
+    """Evaluate constant subtrees at compile time."""
+    if node[0] in ("num", "var"):
+        return node
+    scalar, column, *args = node
+    args = [_fold(arg) for arg in args]
+    if all(arg[0] == "num" for arg in args):
+        try:
+            return ("num", scalar(*(arg[1] for arg in args)))
+        except ExpressionError:
+            # Left for evaluation, which reports it for every binding
+            pass
+    return (scalar, column, *args)
+
+
+def _lower(node, column):
+    """A closure computing `node` from a dict of values (floats, or NumPy columns)."""
+    if node[0] == "num":
+        value = node[1]
+        return lambda env: value
+    if node[0] == "var":
+        return operator.itemgetter(node[1])
+    fn = node[1] if column else node[0]
+    args = [_lower(arg, column) for arg in node[2:]]
+    domain = COLUMN_DOMAINS.get(fn) if column else None
+    if domain is not None:
+        def checked(env):
+            values = [arg(env) for arg in args]
+            np.logical_or(env[_FAILED], domain(*values), out=env[_FAILED])
+            return fn(*values)
+        return checked
+    if len(args) == 1:
+        (arg,) = args
+        return lambda env: fn(arg(env))
+    left, right = args
+    return lambda env: fn(left(env), right(env))
+
+
+def _names(node):
+    if node[0] == "var":
+        return {node[1]}
+    if node[0] == "num":
+        return set()
+    return set().union(*(_names(arg) for arg in node[2:]))
+
+
+class Program:
+    """A compiled pipeline of named steps; the last step is the result."""
+
+    def __init__(self, steps):
+        self.nodes = []
+        self.variables = set()
+        names = set()
+        for name, text in steps:
+            try:
+                node = _fold(_Parser(text).parse())
+            except ExpressionError as e:
+                raise ExpressionError(f"{e} in step '{name}'" if len(steps) > 1 else str(e)) from None
+            used = _names(node)
+            later = used & {other for other, _ in steps} - names
+            if later:
+                raise ExpressionError(f"Step '{name}' uses '{sorted(later)[0]}', which is not an earlier step")
+            self.variables |= used - names
+            self.nodes.append((name, node))
+            names.add(name)
+        self.variables = sorted(self.variables)
+        self.scalar = [(name, _lower(node, False)) for name, node in self.nodes]
+        self._column = None
+
+    def evaluate(self, variables):
+        """The result for one binding; raises ExpressionError."""
+        env = dict(variables)
+        for name, fn in self.scalar:
+            env[name] = fn(env)
+        result = env[self.nodes[-1][0]]
+        if not math.isfinite(result):
+            raise ExpressionError("Result is not a finite number")
+        return result
+
+    def evaluate_columns(self, columns, count):
+        """(results, failed) for a dict of `count`-long float64 columns: failed
+        masks the rows evaluate() rejects, whose results are meaningless."""
+        if self._column is None:
+            self._column = [(name, _lower(node, True)) for name, node in self.nodes]
+        env = dict(columns)
+        env[_FAILED] = failed = np.zeros(count, dtype=bool)
+        with np.errstate(all="ignore"):
+            for name, fn in self._column:
+                env[name] = fn(env)
+        values = np.broadcast_to(np.asarray(env[self.nodes[-1][0]], dtype=np.float64), (count,))
+        return values, failed | ~np.isfinite(values)
+
+
+@lru_cache(maxsize=EXPRESSION_CACHE_SIZE)
+def compile_program(steps):
+    """Compiled Program for a tuple of (name, expression) steps, memoized by their text."""
+    if not steps:
+        raise ExpressionError("Give an expression or at least one step")
+    if len(steps) > MAX_STEPS:
+        raise ExpressionError(f"Pipelines are limited to {MAX_STEPS} steps")
+    return Program(steps)
+
+
+# ----- Evaluation -----
+
+def _check_binding(program, binding, index=None):
+    missing = [name for name in program.variables if name not in binding]
+    if missing:
+        where = "" if index is None else f" in binding {index}"
+        raise ExpressionError(f"Missing value for variable '{missing[0]}'{where}")
+
+
+def evaluate_many(program, bindings):
+    """(results, errors) for a list of bindings; failed rows are None with an error record."""
+    for index, binding in enumerate(bindings):
+        _check_binding(program, binding, index)
+    results = [None] * len(bindings)
+    errors = []
+    if len(bindings) >= VECTOR_MIN_BINDINGS:
+        columns = {name: np.fromiter((b[name] for b in bindings), np.float64, len(bindings))
+                   for name in program.variables}
+        values, failed = program.evaluate_columns(columns, len(bindings))
+        results = values.tolist()
+        # Re-run failed rows one by one for the scalar error message
+        failed = np.flatnonzero(failed).tolist()
+    else:
+        failed = range(len(bindings))
+    for index in failed:
+        try:
+            results[index] = program.evaluate(bindings[index])
+        except ExpressionError as e:
+            results[index] = None
+            errors.append({"index": index, "error": str(e)})
+    return results, errors
+
+
+# Tool: Evaluate Expression
+@router.post("/tools/evaluate")
+@tool("evaluate", "Evaluates an arithmetic expression or pipeline of steps (add, multiply, sqrt, + - * /) "
+      "with variables, for one set of values or many at once",
+      params={
+          "expression": "Expression, e.g. 'sqrt((a + b) * c)'",
+          "steps": "Instead of expression: named steps evaluated in order, e.g. "
+                   "{\"s\": \"a + b\", \"r\": \"sqrt(s * c)\"}; the last step is the result",
+          "variables": "Values for the variables, e.g. {\"a\": 1, \"b\": 2}",
+          "bindings": "Instead of variables: a list of value sets, evaluated all at once",
+      }, cache=False, response=EvaluateResult)
+def evaluate_tool(expression: Annotated[str, Body(embed=True)] = "",
+                  steps: Annotated[Optional[Dict[str, str]], Body(embed=True)] = None,
+                  variables: Annotated[Optional[Dict[str, float]], Body(embed=True)] = None,
+                  bindings: Annotated[Optional[List[Dict[str, float]]], Body(embed=True)] = None):
+    """
+    MCP Tool: Evaluates an arithmetic pipeline in one call.
+    """
+    if bool(expression) == bool(steps):
+        return {"error": "Give either 'expression' or 'steps'"}
+    if variables is not None and bindings is not None:
+        return {"error": "Give either 'variables' or 'bindings'"}
+    if bindings is not None and len(bindings) > MAX_BINDINGS:
+        return {"error": f"At most {MAX_BINDINGS} bindings per call"}
+    try:
+        program = compile_program(tuple(steps.items()) if steps else (("result", expression),))
+        if bindings is None:
+            _check_binding(program, variables or {})
+            return {"variables": program.variables, "result": program.evaluate(variables or {})}
+        results, errors = evaluate_many(program, bindings)
+    except ExpressionError as e:
+        return {"error": str(e)}
+    return {"variables": program.variables, "count": len(results), "results": results, "errors": errors}
@@ -4,7 +4,9 @@ Gemini CLI MCP Integration Helper
 This script helps you interact with your FastAPI MCP Server using Gemini-style commands
 """
 
-import requests
+from mcp_client import AsyncMCPClient, MCPClient, MCPClientError
+import asyncio
+import httpx
 import json
 import sys
 
@@ -15,12 +17,13 @@ class GeminiMCPClient:
     
     def __init__(self, server_url):
         self.server_url = server_url
-        self.config = None
+        # One pooled keep-alive client for every call this session makes
+        self.client = MCPClient(server_url)
         
     def list_tools(self):
         """List all available MCP tools"""
         try:
-            response = requests.get(f"{self.server_url}/mcp-config")
+            response = self.client.request("GET", "/mcp-config")
             if response.status_code == 200:
                 config = response.json()
                 print("\n📋 Available MCP Tools:\n")
@@ -39,7 +42,7 @@ class GeminiMCPClient:
             else:
                 print(f"❌ Error: Unable to fetch tools (Status: {response.status_code})")
                 return None
-        except requests.exceptions.ConnectionError:
+        except httpx.TransportError:
             print("❌ Error: Cannot connect to MCP server at", self.server_url)
             print("   Make sure the server is running: ./start_server.sh")
             return None
@@ -47,47 +50,58 @@ class GeminiMCPClient:
     def call_tool(self, tool_name, **params):
         """Call a specific MCP tool"""
         try:
-            # Map tool names to endpoints
-            endpoints = {
-                'hello': '/tools/hello',
-                'add': '/tools/add',
-                'multiply': '/tools/multiply',
-                'temp-convert': '/tools/temp-convert',
-                'analyze-text': '/tools/analyze-text',
-                'sqrt': '/tools/sqrt'
-            }
+            # Tool endpoints come from the server's /mcp-config
+            tools = self.client.tools()
             
-            if tool_name not in endpoints:
+            if tool_name not in tools:
                 print(f"❌ Error: Unknown tool '{tool_name}'")
-                print(f"   Available tools: {', '.join(endpoints.keys())}")
+                print(f"   Available tools: {', '.join(tools.keys())}")
                 return None
             
-            endpoint = endpoints[tool_name]
-            url = f"{self.server_url}{endpoint}"
+            url = f"{self.server_url}{tools[tool_name]['endpoint']}"
             
             print(f"\n🔧 Calling MCP Tool: {tool_name}")
             print(f"   URL: {url}")
             print(f"   Parameters: {params}")
             print()
             
-            response = requests.get(url, params=params)
-            
-            if response.status_code == 200:
-                result = response.json()
-                print("✅ Success! Response:")
-                print("="*60)
-                print(json.dumps(result, indent=2))
-                print("="*60)
-                return result
-            else:
-                print(f"❌ Error: {response.status_code}")
-                print(response.text)
-                return None
+            result = self.client.call(tool_name, **params)
+            print("✅ Success! Response:")
+            print("="*60)
+            print(json.dumps(result, indent=2))
+            print("="*60)
+            return result
                 
-        except requests.exceptions.ConnectionError:
+        except MCPClientError as e:
+            print(f"❌ Error: {e.status_code}")
+            print(e.body)
+            return None
+        except httpx.TransportError:
             print("❌ Error: Cannot connect to MCP server")
             return None
     
+    def call_many(self, calls, concurrency=16):
+        """Call many tools concurrently over pooled connections"""
+        async def run():
+            async with AsyncMCPClient(self.server_url) as client:
+                return await client.call_many(calls, concurrency=concurrency)
+        
+        try:
+            results = asyncio.run(run())
+        except httpx.TransportError:
+            print("❌ Error: Cannot connect to MCP server")
+            return None
+        
+        failures = 0
+        for (tool_name, params), result in zip(calls, results):
+            if isinstance(result, Exception):
+                failures += 1
+                print(json.dumps({"tool": tool_name, "params": params, "error": str(result)}))
+            else:
+                print(json.dumps({"tool": tool_name, "params": params, "result": result}))
+        print(f"\n✅ {len(calls) - failures}/{len(calls)} calls succeeded", file=sys.stderr)
+        return results
+    
     def interactive_mode(self):
         """Interactive mode for testing tools"""
         print("\n" + "="*60)
@@ -163,6 +177,9 @@ def main():
         print("  python3 gemini_cli_setup.py call <tool> [params...]")
         print("      - Call a specific tool")
         print()
+        print("  python3 gemini_cli_setup.py call --file calls.jsonl [--concurrency N]")
+        print("      - Run many calls concurrently, one {\"tool\": ..., \"params\": {...}} per line")
+        print()
         print("  python3 gemini_cli_setup.py interactive")
         print("      - Start interactive mode")
         print()
@@ -170,6 +187,7 @@ def main():
         print("  python3 gemini_cli_setup.py list")
         print("  python3 gemini_cli_setup.py call hello name=Khadija")
         print("  python3 gemini_cli_setup.py call add a=10 b=20")
+        print("  python3 gemini_cli_setup.py call --file calls.jsonl --concurrency 32")
         print("  python3 gemini_cli_setup.py interactive")
         print()
         
@@ -182,6 +200,22 @@ def main():
             print("   Usage: python3 gemini_cli_setup.py call <tool> [params...]")
             return
         
+        if sys.argv[2] == '--file':
+            if len(sys.argv) < 4:
+                print("❌ Error: File name required")
+                return
+            concurrency = 16
+            if '--concurrency' in sys.argv[4:]:
+                concurrency = int(sys.argv[sys.argv.index('--concurrency') + 1])
+            calls = []
+            with open(sys.argv[3]) as f:
+                for line in f:
+                    if line.strip():
+                        entry = json.loads(line)
+                        calls.append((entry['tool'], entry.get('params', {})))
+            client.call_many(calls, concurrency=concurrency)
+            return
+        
         tool_name = sys.argv[2]
         
         # Parse parameters
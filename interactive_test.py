@@ -4,7 +4,8 @@ Interactive MCP Tool Tester
 Allows you to test all MCP tools with interactive prompts
 """
 
-import requests
+from mcp_client import MCPClient
+import httpx
 import json
 from datetime import datetime
 
@@ -22,6 +23,9 @@ class Colors:
 
 SERVER_URL = "http://localhost:8000"
 
+# Shared keep-alive connection pool for every tool call in this session
+client = MCPClient(SERVER_URL, timeout=5.0)
+
 def print_header():
     """Print the welcome header"""
     print(f"\n{Colors.CYAN}{'='*70}")
@@ -42,11 +46,11 @@ def print_menu():
 def check_server():
     """Check if the server is running"""
     try:
-        response = requests.get(f"{SERVER_URL}/", timeout=2)
+        response = client.request("GET", "/", timeout=2)
         if response.status_code == 200:
             print(f"{Colors.GREEN}✓ Server is running at {SERVER_URL}{Colors.END}\n")
             return True
-    except requests.exceptions.RequestException:
+    except httpx.HTTPError:
         print(f"{Colors.RED}✗ Server is not running!{Colors.END}")
         print(f"{Colors.YELLOW}Please start the server with:{Colors.END}")
         print(f"  cd /home/khadijab/fastapi-mcp-demo")
@@ -74,7 +78,7 @@ def tool_hello():
     print(f"\n{Colors.CYAN}Calling tool with name: {name}{Colors.END}")
     
     try:
-        response = requests.get(f"{SERVER_URL}/tools/hello", params={"name": name})
+        response = client.request("GET", "/tools/hello", params={"name": name})
         if response.status_code == 200:
             display_response(response.json(), "Hello Tool")
         else:
@@ -98,7 +102,7 @@ def tool_add():
     print(f"\n{Colors.CYAN}Calculating: {a} + {b}{Colors.END}")
     
     try:
-        response = requests.get(f"{SERVER_URL}/tools/add", params={"a": a, "b": b})
+        response = client.request("GET", "/tools/add", params={"a": a, "b": b})
         if response.status_code == 200:
             display_response(response.json(), "Add Tool")
         else:
@@ -122,7 +126,7 @@ def tool_multiply():
     print(f"\n{Colors.CYAN}Calculating: {a} × {b}{Colors.END}")
     
     try:
-        response = requests.get(f"{SERVER_URL}/tools/multiply", params={"a": a, "b": b})
+        response = client.request("GET", "/tools/multiply", params={"a": a, "b": b})
         if response.status_code == 200:
             display_response(response.json(), "Multiply Tool")
         else:
@@ -145,7 +149,7 @@ def tool_temp_convert():
     print(f"\n{Colors.CYAN}Converting {celsius}°C to Fahrenheit and Kelvin...{Colors.END}")
     
     try:
-        response = requests.get(f"{SERVER_URL}/tools/temp-convert", params={"celsius": celsius})
+        response = client.request("GET", "/tools/temp-convert", params={"celsius": celsius})
         if response.status_code == 200:
             display_response(response.json(), "Temperature Converter")
         else:
@@ -167,7 +171,7 @@ def tool_analyze_text():
     print(f"\n{Colors.CYAN}Analyzing: \"{text}\"{Colors.END}")
     
     try:
-        response = requests.get(f"{SERVER_URL}/tools/analyze-text", params={"text": text})
+        response = client.request("GET", "/tools/analyze-text", params={"text": text})
         if response.status_code == 200:
             display_response(response.json(), "Text Analyzer")
         else:
@@ -193,7 +197,7 @@ def tool_sqrt():
     print(f"\n{Colors.CYAN}Calculating √{number}...{Colors.END}")
     
     try:
-        response = requests.get(f"{SERVER_URL}/tools/sqrt", params={"number": number})
+        response = client.request("GET", "/tools/sqrt", params={"number": number})
         if response.status_code == 200:
             display_response(response.json(), "Square Root")
         else:
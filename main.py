@@ -1,9 +1,23 @@
-from fastapi import FastAPI
-from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
-from datetime import datetime
-import math
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from admission import AdmissionMiddleware, admission
+from assets import StaticAssets
+from calllog import CallLogMiddleware, call_log
+from mcp_server import create_mcp_router
+from metrics import MetricsMiddleware, metrics, scrape
+from profiler import PROFILING, install as install_profiler, router as profiler_router
+from registry import logged_outcome, registry, tool
+from reloader import HOT_RELOAD, router as reload_router, tool_modules
+from result_cache import cache_key
+from ws_channel import channel_stats, router as ws_router
+import array_tools
+import basic_tools
+import documents
+import exact_math
+import expressions
+import json
 import os
+import units
 
 app = FastAPI(
     title="FastAPI MCP Server",
@@ -11,186 +25,351 @@ app = FastAPI(
     version="1.0.0"
 )
 
-# Serve static files (for the web UI)
+# Rate limits and an in-flight cap in front of the tool routes (see admission.py)
+app.add_middleware(AdmissionMiddleware, control=admission)
+
+# One JSONL record per tool call when MCP_CALL_LOG is set (see calllog.py);
+# outside admission control so rejected calls are logged with their status
+if call_log is not None:
+    app.add_middleware(CallLogMiddleware, log=call_log)
+
+# Per-route request metrics, exposed at /metrics; added last so it is the
+# outermost middleware and also counts requests rejected by admission control.
+# With MCP_PROFILING=1 it also answers Server-Timing requests (see profiler.py)
+METRICS_DIR = os.environ.get("MCP_METRICS_DIR")
+app.add_middleware(MetricsMiddleware, router=app.router, metrics=metrics, snapshot_dir=METRICS_DIR,
+                   server_timing=PROFILING)
+
+# Serve static files (for the web UI), preloaded and precompressed at startup
 static_dir = os.path.join(os.path.dirname(__file__), "static")
-if os.path.exists(static_dir):
-    app.mount("/static", StaticFiles(directory=static_dir), name="static")
+static_assets = StaticAssets(static_dir) if os.path.isdir(static_dir) else None
+if static_assets is not None:
+    app.mount("/static", static_assets, name="static")
+index_asset = static_assets.assets.get("/index.html") if static_assets is not None else None
 
-# Tool 1: Greeting Tool
-@app.get("/tools/hello")
-def hello_tool(name: str = "Student"):
-    """
-    MCP Tool: Returns a personalized greeting message.
-    """
-    return {
-        "message": f"Hello, {name}! This is your MCP Server speaking 👋",
-        "timestamp": datetime.now().isoformat()
-    }
-
-# Tool 2: Math Addition Tool
-@app.get("/tools/add")
-def add_tool(a: int, b: int):
-    """
-    MCP Tool: Adds two numbers and returns the result.
-    """
-    return {
-        "operation": "addition",
-        "a": a,
-        "b": b,
-        "result": a + b
-    }
-
-# Tool 3: Math Multiply Tool
-@app.get("/tools/multiply")
-def multiply_tool(a: float, b: float):
-    """
-    MCP Tool: Multiplies two numbers.
-    """
-    return {
-        "operation": "multiplication",
-        "a": a,
-        "b": b,
-        "result": a * b
-    }
-
-# Tool 4: Temperature Converter
-@app.get("/tools/temp-convert")
-def temp_convert_tool(celsius: float):
-    """
-    MCP Tool: Converts Celsius to Fahrenheit and Kelvin.
-    """
-    fahrenheit = (celsius * 9/5) + 32
-    kelvin = celsius + 273.15
-    return {
-        "celsius": celsius,
-        "fahrenheit": round(fahrenheit, 2),
-        "kelvin": round(kelvin, 2)
-    }
-
-# Tool 5: Text Analysis Tool
-@app.get("/tools/analyze-text")
-def analyze_text_tool(text: str):
+# Tools 1-6: greeting, arithmetic, temperature and text analysis (see basic_tools.py)
+tool_modules.mount(app, basic_tools)
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+async def run_batch_call(index, call, seen=None):
+    """Run one `{tool, params}` entry and return its result or error record.
+
+    `seen` maps earlier calls of the same batch to their records, so an
+    identical call to a pure tool is answered without running it again.
     """
-    MCP Tool: Analyzes text and returns statistics.
+    if not isinstance(call, dict):
+        return {"index": index, "error": "Each call must be an object with 'tool' and 'params'"}
+    name = call.get("tool")
+    params = call.get("params") or {}
+    fn = registry.dispatch.get(name) if isinstance(name, str) else None
+    if fn is None:
+        return {"index": index, "tool": name, "error": f"Unknown tool '{name}'"}
+    if not isinstance(params, dict):
+        return {"index": index, "tool": name, "error": "'params' must be an object"}
+    if seen is None or registry.flights is None or not registry.tools[name].pure:
+        return {"index": index, "tool": name, **await logged_outcome("batch", name, fn, params)}
+    key = cache_key(name, params)
+    outcome = seen.get(key)
+    if outcome is None:
+        outcome = seen[key] = await logged_outcome("batch", name, fn, params)
+    else:
+        registry.flights.batch_duplicates += 1
+        if call_log is not None:
+            call_log.record("batch", name, params, 200 if "result" in outcome else 400, 0.0, "duplicate")
+    return {"index": index, "tool": name, **outcome}
+
+
+async def _iter_ndjson(request):
+    """Yield the non-blank lines of an NDJSON request body as bytes, chunk by chunk."""
+    buffer = b""
+    async for chunk in request.stream():
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            if line.strip():
+                yield line
+    if buffer.strip():
+        yield buffer
+
+
+class _NDJSONStreamingResponse(StreamingResponse):
+    """StreamingResponse that leaves `receive` alone while streaming.
+
+    Starlette's default implementation listens for disconnects on `receive`,
+    which would steal body chunks from an NDJSON request still being read.
     """
-    words = text.split()
-    return {
-        "text": text,
-        "character_count": len(text),
-        "word_count": len(words),
-        "uppercase_count": sum(1 for c in text if c.isupper()),
-        "lowercase_count": sum(1 for c in text if c.islower()),
-        "digit_count": sum(1 for c in text if c.isdigit())
-    }
-
-# Tool 6: Square Root Calculator
-@app.get("/tools/sqrt")
-def sqrt_tool(number: float):
+
+    async def __call__(self, scope, receive, send):
+        await self.stream_response(send)
+        if self.background is not None:
+            await self.background()
+
+
+# Tool 7: Batch Tool Invocation
+@app.post("/tools/batch")
+@tool("batch", "Runs many tool calls in one request, optionally streamed as NDJSON", params={
+    "calls": {"type": "array", "description": "List of {tool, params} objects (or one per line as NDJSON)", "required": True},
+    "stream": {"type": "boolean", "description": "Stream results back as NDJSON", "default": False},
+})
+async def batch_tool(request: Request, stream: bool = False):
     """
-    MCP Tool: Calculates the square root of a number.
+    MCP Tool: Runs many tool calls in one request.
+
+    Accepts `{"calls": [{"tool": ..., "params": {...}}, ...]}` as JSON, or one
+    call per line as NDJSON. Results come back in order with per-item errors.
+    With `?stream=true` (or `Accept: application/x-ndjson`) results are
+    written as NDJSON while an NDJSON request body is still being read.
     """
-    if number < 0:
-        return {"error": "Cannot calculate square root of negative number"}
-    return {
-        "number": number,
-        "square_root": round(math.sqrt(number), 4)
-    }
+    content_type = request.headers.get("content-type", "")
+    stream = stream or NDJSON_MEDIA_TYPE in request.headers.get("accept", "")
+
+    if content_type.startswith(NDJSON_MEDIA_TYPE):
+        async def calls():
+            index = 0
+            async for line in _iter_ndjson(request):
+                try:
+                    call = json.loads(line)
+                except ValueError:
+                    call = None
+                yield index, call
+                index += 1
+    else:
+        try:
+            body = await request.json()
+        except ValueError:
+            return JSONResponse({"error": "Request body must be JSON or NDJSON"}, status_code=400)
+        entries = body.get("calls") if isinstance(body, dict) else None
+        if not isinstance(entries, list):
+            return JSONResponse({"error": "Expected an object with a 'calls' list"}, status_code=400)
+
+        async def calls():
+            for index, call in enumerate(entries):
+                yield index, call
+
+    seen = {}
+    if stream:
+        async def lines():
+            async for index, call in calls():
+                yield json.dumps(await run_batch_call(index, call, seen)).encode() + b"\n"
+        return _NDJSONStreamingResponse(lines(), media_type=NDJSON_MEDIA_TYPE)
+
+    results = [await run_batch_call(index, call, seen) async for index, call in calls()]
+    return {"count": len(results), "results": results}
+
+# Array (vectorized) variants of the numeric tools
+tool_modules.mount(app, array_tools)
+
+# Exact (arbitrary-precision) variants of the math tools
+tool_modules.mount(app, exact_math)
+
+# Conversion between any two units of a dimension (see units.py)
+tool_modules.mount(app, units)
+
+# Whole arithmetic pipelines evaluated in one call (see expressions.py)
+tool_modules.mount(app, expressions)
+
+# Document upload for large text files (see documents.py)
+tool_modules.mount(app, documents)
+
+# Native MCP JSON-RPC endpoint (streamable HTTP transport) over the same tools
+app.include_router(create_mcp_router(registry))
+
+# WebSocket channel for many concurrent tool calls over one connection (see ws_channel.py)
+app.include_router(ws_router)
+
+# On-demand sampling profiler at /admin/profile, only with MCP_PROFILING=1 (see profiler.py)
+if PROFILING:
+    install_profiler()
+    app.include_router(profiler_router)
+
+# Tool module reloads at /admin/reload and on SIGHUP, only with MCP_HOT_RELOAD=1 (see reloader.py)
+if HOT_RELOAD:
+    app.include_router(reload_router)
+    app.router.on_startup.append(tool_modules.install)
 
 # Root endpoint - Serve the web UI
 @app.get("/")
-def root():
+def root(request: Request):
     """Serve the sample app web interface."""
-    static_dir = os.path.join(os.path.dirname(__file__), "static")
-    index_file = os.path.join(static_dir, "index.html")
-    
-    if os.path.exists(index_file):
-        return FileResponse(index_file)
+    if index_asset is not None:
+        return index_asset.response(request)
     else:
         # Fallback to JSON if static files don't exist
         return {
             "name": "FastAPI MCP Server",
             "version": "1.0.0",
             "status": "running",
-            "available_tools": [
-                "/tools/hello",
-                "/tools/add",
-                "/tools/multiply",
-                "/tools/temp-convert",
-                "/tools/analyze-text",
-                "/tools/sqrt"
-            ],
+            "available_tools": registry.endpoints,
             "documentation": "/docs",
             "web_ui": "Static files not found. Use /docs for API documentation."
         }
 
 # API info endpoint
 @app.get("/api/info")
-def api_info():
+def api_info(request: Request):
     """Get server information via API."""
-    return {
-        "name": "FastAPI MCP Server",
-        "version": "1.0.0",
-        "status": "running",
-        "available_tools": [
-            "/tools/hello",
-            "/tools/add",
-            "/tools/multiply",
-            "/tools/temp-convert",
-            "/tools/analyze-text",
-            "/tools/sqrt"
-        ],
-        "documentation": "/docs",
-        "mcp_config": "/mcp-config"
-    }
+    return registry.api_info.response(request)
 
 # MCP Configuration endpoint
 @app.get("/mcp-config")
-def get_mcp_config():
+def get_mcp_config(request: Request):
     """Get the MCP configuration for this server."""
-    return {
-        "mcpServers": {
-            "fastapi-mcp": {
-                "url": "http://localhost:8000",
-                "description": "FastAPI MCP Server with multiple utility tools",
-                "tools": [
-                    {
-                        "name": "hello",
-                        "endpoint": "/tools/hello",
-                        "method": "GET",
-                        "description": "Returns a personalized greeting message with timestamp"
-                    },
-                    {
-                        "name": "add",
-                        "endpoint": "/tools/add",
-                        "method": "GET",
-                        "description": "Adds two numbers and returns the result"
-                    },
-                    {
-                        "name": "multiply",
-                        "endpoint": "/tools/multiply",
-                        "method": "GET",
-                        "description": "Multiplies two numbers"
-                    },
-                    {
-                        "name": "temp-convert",
-                        "endpoint": "/tools/temp-convert",
-                        "method": "GET",
-                        "description": "Converts temperature from Celsius to Fahrenheit and Kelvin"
-                    },
-                    {
-                        "name": "analyze-text",
-                        "endpoint": "/tools/analyze-text",
-                        "method": "GET",
-                        "description": "Analyzes text and returns character/word statistics"
-                    },
-                    {
-                        "name": "sqrt",
-                        "endpoint": "/tools/sqrt",
-                        "method": "GET",
-                        "description": "Calculates the square root of a number"
-                    }
-                ]
-            }
-        }
-    }
+    return registry.mcp_config.response(request)
+
+# Health endpoints for process managers and load balancers
+app.state.draining = False
+
+@app.get("/healthz")
+def healthz():
+    """Liveness: the worker process is up and serving."""
+    return {"status": "ok"}
+
+@app.get("/readyz")
+def readyz():
+    """Readiness: 503 while the worker is draining for shutdown."""
+    if app.state.draining or not registry.frozen:
+        return JSONResponse({"status": "draining"}, status_code=503)
+    return {"status": "ready"}
+
+# Result cache statistics
+@app.get("/cache/stats")
+def cache_stats():
+    """Get result cache hit/miss/eviction counters."""
+    if registry.cache is None:
+        return {"backend": "off"}
+    return registry.cache.info()
+
+# Tool execution policies and pool usage
+@app.get("/execution/stats")
+def execution_stats():
+    """Get each tool's execution policy and the thread/process pool counters."""
+    return registry.execution_info()
+
+# Admission control counters and limits
+@app.get("/admission/stats")
+def admission_stats():
+    """Get admitted/queued/rejected request counters and the configured limits."""
+    return admission.info()
+
+# Tool call log counters
+@app.get("/calllog/stats")
+def calllog_stats():
+    """Get the call log's written/sampled-out/dropped counters and rotation count."""
+    if call_log is None:
+        return {"enabled": False}
+    return {"enabled": True, **call_log.info()}
+
+# WebSocket channel counters
+@app.get("/ws/stats")
+def ws_stats():
+    """Get open/total connections, calls and idle closes on the /ws channel."""
+    return channel_stats.info()
+
+def _expression_cache_info():
+    # The running version: the module may have been reloaded
+    return tool_modules.module("expressions").compile_program.cache_info()
+
+# Compiled expression cache counters
+@app.get("/expressions/stats")
+def expressions_stats():
+    """Get hit/miss counters and size of the evaluate tool's compiled-expression LRU."""
+    info = _expression_cache_info()
+    return {"hits": info.hits, "misses": info.misses, "entries": info.currsize, "max_entries": info.maxsize}
+
+# Prometheus metrics endpoint
+@app.get("/metrics", response_class=PlainTextResponse)
+def get_metrics():
+    """Get request metrics in the Prometheus text format."""
+    return PlainTextResponse(scrape(metrics, METRICS_DIR), media_type="text/plain; version=0.0.4")
+
+
+def _cache_metrics():
+    if registry.cache is None:
+        return []
+    info = registry.cache.info()
+    lines = []
+    for name in ("hits", "misses", "evictions", "expirations"):
+        lines.append(f"# TYPE mcp_cache_{name}_total counter")
+        lines.append(f"mcp_cache_{name}_total {info[name]}")
+    lines.append("# TYPE mcp_cache_entries gauge")
+    lines.append(f"mcp_cache_entries {info['entries']}")
+    lines.append("# TYPE mcp_cache_bytes gauge")
+    lines.append(f"mcp_cache_bytes {info['bytes']}")
+    return lines
+
+
+def _pool_metrics():
+    lines = []
+    pools = registry.pools.items()
+    for name, kind in (("pending", "gauge"), ("completed_total", "counter"), ("rejected_total", "counter")):
+        lines.append(f"# TYPE mcp_pool_{name} {kind}")
+        key = name.replace("_total", "")
+        lines.extend(f'mcp_pool_{name}{{pool="{pool}"}} {p.info()[key]}' for pool, p in pools)
+    if registry.flights is not None:
+        flights = registry.flights
+        lines += ["# TYPE mcp_tool_executions_total counter", f"mcp_tool_executions_total {flights.executions}",
+                  "# TYPE mcp_tool_coalesced_total counter", f"mcp_tool_coalesced_total {flights.coalesced}",
+                  "# TYPE mcp_batch_duplicates_total counter",
+                  f"mcp_batch_duplicates_total {flights.batch_duplicates}"]
+    return lines
+
+
+def _admission_metrics():
+    lines = ["# TYPE mcp_admission_in_flight gauge", f"mcp_admission_in_flight {admission.in_flight}",
+             "# TYPE mcp_admission_waiting gauge", f"mcp_admission_waiting {admission.waiting}",
+             "# TYPE mcp_admission_admitted_total counter", f"mcp_admission_admitted_total {admission.admitted}",
+             "# TYPE mcp_admission_rejected_total counter"]
+    lines.extend(f'mcp_admission_rejected_total{{reason="{reason}"}} {count}'
+                 for reason, count in admission.rejected.items())
+    return lines
+
+
+def _calllog_metrics():
+    if call_log is None:
+        return []
+    info = call_log.info()
+    lines = ["# TYPE mcp_calllog_queued gauge", f"mcp_calllog_queued {info['queued']}"]
+    for name in ("written", "sampled_out", "dropped", "rotations", "write_errors"):
+        lines.append(f"# TYPE mcp_calllog_{name}_total counter")
+        lines.append(f"mcp_calllog_{name}_total {info[name]}")
+    return lines
+
+
+def _ws_metrics():
+    return ["# TYPE mcp_ws_connections gauge", f"mcp_ws_connections {channel_stats.connections}",
+            "# TYPE mcp_ws_calls_in_flight gauge", f"mcp_ws_calls_in_flight {channel_stats.in_flight}",
+            "# TYPE mcp_ws_connections_total counter", f"mcp_ws_connections_total {channel_stats.opened}",
+            "# TYPE mcp_ws_calls_total counter", f"mcp_ws_calls_total {channel_stats.calls}",
+            "# TYPE mcp_ws_idle_closed_total counter", f"mcp_ws_idle_closed_total {channel_stats.idle_closed}"]
+
+
+def _expression_metrics():
+    info = _expression_cache_info()
+    return ["# TYPE mcp_expression_cache_hits_total counter", f"mcp_expression_cache_hits_total {info.hits}",
+            "# TYPE mcp_expression_cache_misses_total counter", f"mcp_expression_cache_misses_total {info.misses}",
+            "# TYPE mcp_expression_cache_entries gauge", f"mcp_expression_cache_entries {info.currsize}"]
+
+
+metrics.collectors.append(_cache_metrics)
+metrics.collectors.append(_pool_metrics)
+metrics.collectors.append(_admission_metrics)
+metrics.collectors.append(_calllog_metrics)
+metrics.collectors.append(_ws_metrics)
+metrics.collectors.append(_expression_metrics)
+
+# Stop the tool pools' threads and worker processes on shutdown
+app.router.on_shutdown.append(registry.shutdown)
+if call_log is not None:
+    # Write out queued call records before exiting
+    app.router.on_shutdown.append(call_log.close)
 
+# Collect every registered tool's endpoint and schema and pre-serialize the
+# discovery documents; this must run after all routes are defined.
+registry.freeze(app)
+admission.bind(registry)
+tool_modules.on_reload.append(admission.bind)
+if call_log is not None:
+    call_log.bind(registry)
+    tool_modules.on_reload.append(call_log.bind)
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Prebuilt tool manifest for fast cold starts of the stdio MCP server.
+
+Agent clients spawn `python3 mcp_server.py` over and over, and most of its
+startup used to be importing FastAPI and the tool modules (about a second)
+before the first `tools/list` could be answered. tool_manifest.json holds
+everything the server needs until a tool is actually called:
+
+  tools_list    the prebuilt MCP tools/list result
+  modules       the module each tool is defined in
+  fingerprint   a hash of every project source file the tools were built
+                from, so a stale manifest is detected and ignored
+
+With a fresh manifest, mcp_server.py answers initialize, ping and
+tools/list from it, and imports the tools (main.py and its routes) in the
+background once the client has the list, or on the first tools/call.
+Set MCP_LAZY_TOOLS=0 to always import them up front.
+
+Rebuild after adding or changing a tool (this also rewrites the static
+mcp_config.json, like `python3 registry.py > mcp_config.json`):
+
+  python3 manifest.py
+"""
+
+import hashlib
+import json
+import os
+import sys
+import threading
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+MANIFEST_PATH = os.path.join(ROOT, "tool_manifest.json")
+CONFIG_PATH = os.path.join(ROOT, "mcp_config.json")
+LAZY_TOOLS = os.environ.get("MCP_LAZY_TOOLS", "1").lower() not in ("0", "false", "off", "no")
+
+
+def fingerprint(files):
+    """{path relative to the project: sha1 of its contents}."""
+    digests = {}
+    for name in files:
+        with open(os.path.join(ROOT, name), "rb") as f:
+            digests[name] = hashlib.sha1(f.read()).hexdigest()
+    return digests
+
+
+def project_sources():
+    """The project's source files among the modules imported so far."""
+    files = set()
+    for name, module in list(sys.modules.items()):
+        path = getattr(module, "__file__", None)
+        if name != "__main__" and path and os.path.dirname(os.path.abspath(path)) == ROOT:
+            files.add(os.path.basename(path))
+    return sorted(files)
+
+
+def build(registry):
+    return {
+        "fingerprint": fingerprint(project_sources()),
+        "modules": {s.name: s.fn.__module__ for s in registry.specs if s.callable},
+        "tools_list": registry.tools_list.data,
+    }
+
+
+def load(path=MANIFEST_PATH):
+    """The manifest, or None when it is missing, unreadable or out of date."""
+    try:
+        with open(path, encoding="utf-8") as f:
+            manifest = json.load(f)
+        if fingerprint(manifest["fingerprint"]) != manifest["fingerprint"]:
+            return None
+    except (OSError, ValueError, KeyError):
+        return None
+    return manifest
+
+
+class Document:
+    """A prebuilt JSON document, shaped like the registry's Blob."""
+
+    def __init__(self, data):
+        self.data = data
+        self.body = json.dumps(data, ensure_ascii=False).encode("utf-8")
+
+
+class LazyDispatch:
+    """registry.dispatch stand-in that imports the tools on first use."""
+
+    def __init__(self, lazy, names):
+        self.lazy = lazy
+        self.names = names
+
+    def get(self, name):
+        if name not in self.names:
+            return None
+        return self.lazy.load().dispatch.get(name)
+
+
+class LazyRegistry:
+    """What MCPServer needs from the tool registry, served from the manifest.
+
+    The real registry is imported by load(), at most once, either from a
+    background thread started by prefetch() or by the first tools/call.
+    """
+
+    def __init__(self, manifest):
+        self._tools_list = Document(manifest["tools_list"])
+        self.dispatch = LazyDispatch(self, set(manifest["modules"]))
+        # Set once the client has asked for tools/list
+        self.listed = False
+        self._registry = None
+        self._lock = threading.Lock()
+        self._prefetch = None
+
+    @property
+    def tools_list(self):
+        self.listed = True
+        return self._tools_list
+
+    def load(self):
+        if self._registry is None:
+            with self._lock:
+                if self._registry is None:
+                    # Importing main registers every tool and freezes its registry
+                    from main import registry
+                    self._registry = registry
+        return self._registry
+
+    def prefetch(self):
+        if self._prefetch is None:
+            self._prefetch = threading.Thread(target=self.load, name="mcp-tool-import", daemon=True)
+            self._prefetch.start()
+
+
+def stdio_registry():
+    """A LazyRegistry over a fresh manifest, else the fully imported registry."""
+    manifest = load() if LAZY_TOOLS else None
+    if manifest is not None:
+        return LazyRegistry(manifest)
+    if LAZY_TOOLS:
+        print("tool_manifest.json is missing or stale, importing all tools; "
+              "run `python3 manifest.py` to rebuild it", file=sys.stderr)
+    from main import registry
+    return registry
+
+
+def write_json(path, data):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+        f.write("\n")
+    print(f"Wrote {path}")
+
+
+if __name__ == "__main__":
+    from main import registry as app_registry
+    write_json(MANIFEST_PATH, build(app_registry))
+    write_json(CONFIG_PATH, app_registry.mcp_config_data())
@@ -0,0 +1,218 @@
+"""
+Reusable HTTP client for the FastAPI MCP Server, built on httpx.
+
+  MCPClient       synchronous API
+  AsyncMCPClient  asyncio API
+
+Both keep a pooled keep-alive connection per host and use HTTP/2 when the
+`h2` package is installed. They retry connection errors and 429/502/503/504
+responses with exponential backoff (honouring Retry-After) and apply a
+per-request timeout. Tool endpoints and methods come from /mcp-config, so
+new server tools work without client changes. `call_many` fans a list of
+calls out with bounded concurrency.
+
+    with MCPClient("http://localhost:8000") as client:
+        client.call("add", a=1, b=2)
+        client.call_many([("sqrt", {"number": 9}), ("add", {"a": 1, "b": 2})])
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import importlib.util
+import random
+import time
+
+import httpx
+
+SERVER_URL = "http://localhost:8000"
+RETRY_STATUSES = {429, 502, 503, 504}
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+
+class MCPClientError(Exception):
+    """A tool call failed after all retries."""
+
+    def __init__(self, message, status_code=None, body=None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.body = body
+
+
+class _ClientBase:
+    def __init__(self, server_url=SERVER_URL, timeout=10.0, retries=3, backoff=0.1,
+                 max_connections=100, http2=None):
+        self.server_url = server_url.rstrip("/")
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.limits = httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections)
+        self.http2 = HTTP2_AVAILABLE if http2 is None else http2
+        self._tools = None
+        self._config_etag = None
+
+    def _retry_delay(self, attempt, response=None):
+        if response is not None:
+            retry_after = response.headers.get("retry-after")
+            if retry_after:
+                try:
+                    return float(retry_after)
+                except ValueError:
+                    pass
+        # Exponential backoff with full jitter
+        return random.uniform(0, self.backoff * (2 ** attempt))
+
+    def _should_retry(self, attempt, response=None):
+        if attempt >= self.retries:
+            return False
+        return response is None or response.status_code in RETRY_STATUSES
+
+    def _store_config(self, response):
+        if response.status_code == 304 and self._tools is not None:
+            return self._tools
+        config = response.json()
+        self._tools = {t["name"]: t for t in config["mcpServers"]["fastapi-mcp"]["tools"]}
+        self._config_etag = response.headers.get("etag")
+        return self._tools
+
+    def _config_headers(self):
+        return {"If-None-Match": self._config_etag} if self._config_etag and self._tools else {}
+
+    def _request_args(self, tool, params):
+        spec = self._tools.get(tool)
+        if spec is None:
+            raise MCPClientError(f"Unknown tool '{tool}'. Available tools: {', '.join(self._tools)}")
+        if spec["method"] == "GET":
+            return spec["method"], spec["endpoint"], {"params": params}
+        return spec["method"], spec["endpoint"], {"json": params}
+
+    @staticmethod
+    def _result(tool, response):
+        if response.status_code >= 400:
+            raise MCPClientError(f"{tool} failed with HTTP {response.status_code}",
+                                 status_code=response.status_code, body=response.text)
+        return response.json()
+
+
+class MCPClient(_ClientBase):
+    """Synchronous, connection-pooled MCP server client."""
+
+    def __init__(self, server_url=SERVER_URL, **options):
+        super().__init__(server_url, **options)
+        self.http = httpx.Client(base_url=self.server_url, timeout=self.timeout,
+                                 limits=self.limits, http2=self.http2)
+
+    def request(self, method, url, **kwargs):
+        """Send one request with retries; returns the final httpx.Response."""
+        attempt = 0
+        while True:
+            try:
+                response = self.http.request(method, url, **kwargs)
+            except httpx.TransportError:
+                if not self._should_retry(attempt):
+                    raise
+                time.sleep(self._retry_delay(attempt))
+            else:
+                if not self._should_retry(attempt, response):
+                    return response
+                time.sleep(self._retry_delay(attempt, response))
+            attempt += 1
+
+    def tools(self, refresh=False):
+        """Tool name -> config entry, revalidated with the server's ETag on refresh."""
+        if self._tools is None or refresh:
+            self._store_config(self.request("GET", "/mcp-config", headers=self._config_headers()))
+        return self._tools
+
+    def call(self, tool, **params):
+        self.tools()
+        method, endpoint, kwargs = self._request_args(tool, params)
+        return self._result(tool, self.request(method, endpoint, **kwargs))
+
+    def call_many(self, calls, concurrency=16, return_exceptions=True):
+        """Run (tool, params) pairs concurrently on a bounded thread pool.
+
+        Results are returned in input order. Failed calls appear as their
+        exception when `return_exceptions` is true, otherwise the first
+        failure is raised.
+        """
+        self.tools()
+
+        def run(call):
+            tool, params = call
+            try:
+                return self.call(tool, **params)
+            except (MCPClientError, httpx.HTTPError) as e:
+                if not return_exceptions:
+                    raise
+                return e
+
+        with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+            return list(pool.map(run, calls))
+
+    def close(self):
+        self.http.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class AsyncMCPClient(_ClientBase):
+    """asyncio, connection-pooled MCP server client."""
+
+    def __init__(self, server_url=SERVER_URL, **options):
+        super().__init__(server_url, **options)
+        self.http = httpx.AsyncClient(base_url=self.server_url, timeout=self.timeout,
+                                      limits=self.limits, http2=self.http2)
+
+    async def request(self, method, url, **kwargs):
+        """Send one request with retries; returns the final httpx.Response."""
+        attempt = 0
+        while True:
+            try:
+                response = await self.http.request(method, url, **kwargs)
+            except httpx.TransportError:
+                if not self._should_retry(attempt):
+                    raise
+                await asyncio.sleep(self._retry_delay(attempt))
+            else:
+                if not self._should_retry(attempt, response):
+                    return response
+                await asyncio.sleep(self._retry_delay(attempt, response))
+            attempt += 1
+
+    async def tools(self, refresh=False):
+        if self._tools is None or refresh:
+            self._store_config(await self.request("GET", "/mcp-config", headers=self._config_headers()))
+        return self._tools
+
+    async def call(self, tool, **params):
+        await self.tools()
+        method, endpoint, kwargs = self._request_args(tool, params)
+        return self._result(tool, await self.request(method, endpoint, **kwargs))
+
+    async def call_many(self, calls, concurrency=16, return_exceptions=True):
+        """Run (tool, params) pairs with at most `concurrency` in flight.
+
+        Results are returned in input order; see MCPClient.call_many.
+        """
+        await self.tools()
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+
+        async def run(tool, params):
+            async with semaphore:
+                return await self.call(tool, **params)
+
+        return await asyncio.gather(*(run(tool, params) for tool, params in calls),
+                                    return_exceptions=return_exceptions)
+
+    async def aclose(self):
+        await self.http.aclose()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.aclose()
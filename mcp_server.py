@@ -0,0 +1,308 @@
+#!/usr/bin/env python3
+"""
+Native MCP (Model Context Protocol) JSON-RPC layer over the tools in main.py.
+
+Two transports share one MCPServer:
+  - stdio:            python3 mcp_server.py   (one JSON-RPC message per line)
+  - streamable HTTP:  POST /mcp on the FastAPI app, with an Mcp-Session-Id
+                      header so one long-lived connection can pipeline calls
+
+Supported methods: initialize, ping, tools/list, tools/call (plus the
+notifications/initialized notification). JSON-RPC batches are accepted on
+both transports.
+
+HTTP session ids are signed (HMAC-SHA256) rather than stored, so any worker
+can verify a session another worker created and no per-session memory is
+kept. They expire MCP_SESSION_TTL seconds after initialize; the client then
+gets 404 and initializes again. Every process serving one endpoint must share
+MCP_SESSION_KEY: serve.py generates one for its workers when it is unset, a
+single process uses a random key of its own.
+
+Environment variables:
+  MCP_SESSION_KEY  secret for signing session ids (any string)
+  MCP_SESSION_TTL  session lifetime in seconds, default 86400
+"""
+
+# FastAPI and pydantic are imported where they are used, so the stdio server
+# can answer tools/list from the prebuilt manifest without loading them
+from calllog import call_log
+from manifest import LazyRegistry, stdio_registry
+from collections import OrderedDict
+import asyncio
+import hashlib
+import hmac
+import json
+import os
+import sys
+import time
+import traceback
+import uuid
+
+SUPPORTED_PROTOCOL_VERSIONS = ["2025-03-26", "2024-11-05"]
+SERVER_INFO = {"name": "fastapi-mcp", "version": "1.0.0"}
+
+# JSON-RPC error codes
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+INTERNAL_ERROR = -32603
+
+SESSION_TTL = float(os.environ.get("MCP_SESSION_TTL", 86400))
+
+
+class JSONRPCError(Exception):
+    def __init__(self, code, message):
+        super().__init__(message)
+        self.code = code
+        self.message = message
+
+
+class MCPServer:
+    """Transport-independent MCP request handler over a frozen ToolRegistry."""
+
+    def __init__(self, registry):
+        self.registry = registry
+
+    async def handle(self, message):
+        """Handle one decoded JSON-RPC message or batch.
+
+        Returns the response object (or list for batches), or None when
+        nothing should be sent back (notifications).
+        """
+        if isinstance(message, list):
+            if not message:
+                return _error(None, INVALID_REQUEST, "Empty batch")
+            responses = [r for r in [await self._handle_one(m) for m in message] if r is not None]
+            return responses or None
+        return await self._handle_one(message)
+
+    async def handle_line(self, line):
+        """Handle one raw JSON-RPC line; returns the encoded reply or None."""
+        try:
+            message = json.loads(line)
+        except ValueError:
+            return json.dumps(_error(None, PARSE_ERROR, "Parse error"))
+        try:
+            fast = self.fast_reply(message)
+            if fast is not None:
+                return fast.decode("utf-8")
+            response = await self.handle(message)
+            return None if response is None else json.dumps(response)
+        except Exception:
+            # One bad message must not end the stdio session
+            traceback.print_exc(file=sys.stderr)
+            msg_id = message.get("id") if isinstance(message, dict) else None
+            return json.dumps(_error(msg_id, INTERNAL_ERROR, "Internal error"))
+
+    def fast_reply(self, message):
+        """Encoded reply for a lone tools/list request, spliced from the
+        registry's pre-serialized blob; None for anything else."""
+        if (isinstance(message, dict) and message.get("method") == "tools/list"
+                and message.get("jsonrpc") == "2.0" and "id" in message):
+            msg_id = json.dumps(message["id"]).encode()
+            return b'{"jsonrpc":"2.0","id":' + msg_id + b',"result":' + self.registry.tools_list.body + b"}"
+        return None
+
+    async def _handle_one(self, message):
+        if not isinstance(message, dict) or message.get("jsonrpc") != "2.0" or "method" not in message:
+            return _error(message.get("id") if isinstance(message, dict) else None,
+                          INVALID_REQUEST, "Invalid Request")
+        is_notification = "id" not in message
+        msg_id = message.get("id")
+        method, params = message["method"], message.get("params")
+        if not isinstance(method, str):
+            return _error(msg_id, INVALID_REQUEST, "Invalid Request: 'method' must be a string")
+        if params is None:
+            params = {}
+        elif not isinstance(params, dict):
+            return None if is_notification else _error(msg_id, INVALID_PARAMS, "'params' must be an object")
+        try:
+            result = await self.dispatch(method, params)
+        except JSONRPCError as e:
+            return None if is_notification else _error(msg_id, e.code, e.message)
+        except Exception:
+            traceback.print_exc(file=sys.stderr)
+            return None if is_notification else _error(msg_id, INTERNAL_ERROR, "Internal error")
+        return None if is_notification else {"jsonrpc": "2.0", "id": msg_id, "result": result}
+
+    async def dispatch(self, method, params):
+        if method == "initialize":
+            requested = params.get("protocolVersion")
+            version = requested if requested in SUPPORTED_PROTOCOL_VERSIONS else SUPPORTED_PROTOCOL_VERSIONS[0]
+            return {
+                "protocolVersion": version,
+                "capabilities": {"tools": {"listChanged": False}},
+                "serverInfo": SERVER_INFO,
+            }
+        if method == "ping" or method.startswith("notifications/"):
+            return {}
+        if method == "tools/list":
+            return self.registry.tools_list.data
+        if method == "tools/call":
+            return await self.call_tool(params.get("name"), params.get("arguments") or {})
+        raise JSONRPCError(METHOD_NOT_FOUND, f"Method not found: {method}")
+
+    async def call_tool(self, name, arguments):
+        fn = self.registry.dispatch.get(name) if isinstance(name, str) else None
+        if fn is None:
+            raise JSONRPCError(INVALID_PARAMS, f"Unknown tool '{name}'")
+        if not isinstance(arguments, dict):
+            raise JSONRPCError(INVALID_PARAMS, "'arguments' must be an object")
+        from registry import logged_outcome
+        outcome = await logged_outcome("mcp", name, fn, arguments)
+        if "result" in outcome:
+            return _tool_result(outcome["result"])
+        return _tool_result(outcome, is_error=True)
+
+
+def _tool_result(data, is_error=False):
+    return {
+        "content": [{"type": "text", "text": json.dumps(data)}],
+        "structuredContent": data,
+        "isError": is_error,
+    }
+
+
+def _error(msg_id, code, message):
+    return {"jsonrpc": "2.0", "id": msg_id, "error": {"code": code, "message": message}}
+
+
+# ----- Streamable HTTP transport -----
+
+class SessionIds:
+    """Session ids any process holding the key can verify: "<issued>.<nonce>.<signature>".
+
+    DELETE /mcp ends a session for the worker that receives it; with several
+    workers the others accept the id until it expires, so ended ids are only
+    remembered (boundedly) as a courtesy, not relied on.
+    """
+
+    def __init__(self, key, ttl=SESSION_TTL, max_ended=10000):
+        self.key = key
+        self.ttl = ttl
+        self.max_ended = max_ended
+        self.ended = OrderedDict()
+
+    @classmethod
+    def from_env(cls):
+        key = os.environ.get("MCP_SESSION_KEY")
+        return cls(key.encode() if key else os.urandom(32))
+
+    def _sign(self, payload):
+        return hmac.new(self.key, payload.encode(), hashlib.sha256).hexdigest()[:32]
+
+    def new(self):
+        payload = f"{int(time.time()):x}.{uuid.uuid4().hex}"
+        return f"{payload}.{self._sign(payload)}"
+
+    def valid(self, session_id):
+        payload, _, signature = session_id.rpartition(".")
+        if not hmac.compare_digest(signature.encode(), self._sign(payload).encode()):
+            return False
+        try:
+            issued = int(payload.partition(".")[0], 16)
+        except ValueError:
+            return False
+        if self.ttl and time.time() - issued > self.ttl:
+            return False
+        return session_id not in self.ended
+
+    def end(self, session_id):
+        if self.valid(session_id):
+            self.ended[session_id] = None
+            if len(self.ended) > self.max_ended:
+                self.ended.popitem(last=False)
+
+def create_mcp_router(registry):
+    """Build the /mcp router for the streamable-HTTP transport."""
+    from fastapi import APIRouter, Request
+    from fastapi.responses import JSONResponse, Response
+
+    server = MCPServer(registry)
+    sessions = SessionIds.from_env()
+    router = APIRouter()
+
+    @router.post("/mcp")
+    async def mcp_post(request: Request):
+        """MCP JSON-RPC endpoint (streamable HTTP transport)."""
+        try:
+            message = json.loads(await request.body())
+        except ValueError:
+            return JSONResponse(_error(None, PARSE_ERROR, "Parse error"), status_code=400)
+
+        messages = message if isinstance(message, list) else [message]
+        initializing = any(isinstance(m, dict) and m.get("method") == "initialize" for m in messages)
+        session_id = request.headers.get("mcp-session-id")
+        headers = {}
+        if initializing:
+            headers["Mcp-Session-Id"] = sessions.new()
+        elif session_id is not None and not sessions.valid(session_id):
+            return JSONResponse(_error(None, INVALID_REQUEST, "Unknown session"), status_code=404)
+
+        accept = request.headers.get("accept", "")
+        sse = "text/event-stream" in accept and "application/json" not in accept
+
+        fast = server.fast_reply(message)
+        if fast is not None and not sse:
+            return Response(fast, media_type="application/json", headers=headers)
+
+        response = await server.handle(message)
+        if response is None:
+            return Response(status_code=202, headers=headers)
+
+        if sse:
+            body = f"event: message\ndata: {json.dumps(response)}\n\n"
+            return Response(body, media_type="text/event-stream", headers=headers)
+        return JSONResponse(response, headers=headers)
+
+    @router.get("/mcp")
+    async def mcp_get():
+        """This server never initiates messages, so there is no SSE stream to open."""
+        return Response(status_code=405, headers={"Allow": "POST, DELETE"})
+
+    @router.delete("/mcp")
+    async def mcp_delete(request: Request):
+        """End an MCP session."""
+        session_id = request.headers.get("mcp-session-id")
+        if session_id is not None:
+            sessions.end(session_id)
+        return Response(status_code=204)
+
+    router.mcp_server = server
+    router.mcp_sessions = sessions
+    return router
+
+
+# ----- stdio transport -----
+
+def serve_stdio(server, stdin=sys.stdin, stdout=sys.stdout):
+    """Read newline-delimited JSON-RPC from stdin and answer on stdout."""
+    asyncio.run(_serve_stdio(server, stdin, stdout))
+
+
+async def _serve_stdio(server, stdin, stdout):
+    lazy = server.registry if isinstance(server.registry, LazyRegistry) else None
+    for line in stdin:
+        if not line.strip():
+            continue
+        reply = await server.handle_line(line)
+        if reply is not None:
+            stdout.write(reply + "\n")
+            stdout.flush()
+        if lazy is not None and lazy.listed:
+            # The client has the tool list; import the tools before its first call
+            lazy.prefetch()
+
+
+def main():
+    # Tools come from tool_manifest.json and are imported lazily when it is
+    # up to date (see manifest.py); otherwise main is imported right away
+    registry = stdio_registry()
+    serve_stdio(MCPServer(registry))
+    if call_log is not None:
+        call_log.close()
+
+
+if __name__ == "__main__":
+    main()
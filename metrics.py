@@ -0,0 +1,325 @@
+"""
+Prometheus-style metrics for the MCP server.
+
+MetricsMiddleware records, per route: request counts by status, error
+counts, in-flight gauges and latency histograms. Tool routes wrapped by the
+registry also report phase timings (validation, cache lookup, tool body,
+serialization) through the `request_phases` context variable. With
+`server_timing` on, a request can ask for its own phases back in a
+Server-Timing response header (see profiler.py).
+
+Recording happens on the event loop thread with plain dict/list updates, so
+no locks are taken per request. Each worker keeps its own counters; when
+MCP_METRICS_DIR is set, workers also write a snapshot there at most once a
+second and GET /metrics merges every worker's snapshot on scrape. Snapshots
+of processes that no longer exist are skipped and deleted; serve.py's master
+also deletes a worker's snapshot when it reaps the worker.
+"""
+
+from bisect import bisect_left
+from contextvars import ContextVar
+from starlette.routing import Match
+import glob
+import json
+import os
+import time
+
+# Upper bounds (seconds) of the latency histogram buckets
+BUCKETS = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01,
+    0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+SNAPSHOT_INTERVAL = 1.0
+
+# Per-request phase timer, set by the middleware and read by tool wrappers
+request_phases = ContextVar("request_phases", default=None)
+
+
+class RequestPhases:
+    """Splits one request's wall time into named consecutive phases."""
+
+    __slots__ = ("last", "durations")
+
+    def __init__(self, start):
+        self.last = start
+        self.durations = []
+
+    def mark(self, phase):
+        now = time.perf_counter()
+        self.durations.append((phase, now - self.last))
+        self.last = now
+
+
+def wants_server_timing(scope):
+    """Whether a request asked for Server-Timing: an X-Server-Timing header or ?server_timing=1."""
+    query = scope["query_string"]
+    if b"server_timing" in query and b"server_timing=1" in query.split(b"&"):
+        return True
+    return any(name == b"x-server-timing" for name, _ in scope["headers"])
+
+
+def server_timing_header(phases, elapsed):
+    """Server-Timing value for a request's phases so far, in milliseconds, plus the total."""
+    entries = [f"{phase};dur={seconds * 1000:.3f}" for phase, seconds in phases.durations]
+    entries.append(f"total;dur={elapsed * 1000:.3f}")
+    return ", ".join(entries).encode("latin-1")
+
+
+def _new_histogram():
+    # [per-bucket counts..., +Inf count, sum]
+    return [0] * (len(BUCKETS) + 1) + [0.0]
+
+
+class RouteStats:
+    """All counters for one (route, method) pair, so a request touches one object."""
+
+    __slots__ = ("statuses", "errors", "in_flight", "latency", "phases")
+
+    def __init__(self):
+        self.statuses = {}      # status -> count
+        self.errors = 0
+        self.in_flight = 0
+        self.latency = _new_histogram()
+        self.phases = {}        # phase -> histogram
+
+
+class Metrics:
+    """Counters for one worker process."""
+
+    def __init__(self):
+        self.routes = {}        # (route, method) -> RouteStats
+        self.collectors = []    # callables returning extra exposition lines
+
+    def route_stats(self, key):
+        stats = self.routes.get(key)
+        if stats is None:
+            stats = self.routes[key] = RouteStats()
+        return stats
+
+    def snapshot(self):
+        snap = {"requests": [], "errors": [], "in_flight": [], "latency": [], "phases": []}
+        for (route, method), stats in list(self.routes.items()):
+            for status, count in list(stats.statuses.items()):
+                snap["requests"].append([[route, method, status], count])
+            snap["errors"].append([[route, method], stats.errors])
+            snap["in_flight"].append([[route, method], stats.in_flight])
+            snap["latency"].append([[route, method], stats.latency])
+            for phase, histogram in list(stats.phases.items()):
+                snap["phases"].append([[route, method, phase], histogram])
+        return snap
+
+
+def merge_snapshots(snapshots):
+    """Sum several workers' snapshots into one."""
+    merged = {}
+    for snap in snapshots:
+        for family, series in snap.items():
+            target = merged.setdefault(family, {})
+            for labels, value in series:
+                key = tuple(labels)
+                if isinstance(value, list):
+                    current = target.get(key)
+                    target[key] = value[:] if current is None else [a + b for a, b in zip(current, value)]
+                else:
+                    target[key] = target.get(key, 0) + value
+    return merged
+
+
+def _labels(names, values, extra=""):
+    parts = [f'{n}="{v}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}"
+
+
+def _histogram_lines(name, label_names, series):
+    lines = []
+    for key, histogram in sorted(series.items()):
+        cumulative = 0
+        for bound, count in zip(BUCKETS, histogram):
+            cumulative += count
+            le = 'le="%s"' % bound
+            lines.append(f"{name}_bucket{_labels(label_names, key, le)} {cumulative}")
+        cumulative += histogram[len(BUCKETS)]
+        le = 'le="+Inf"'
+        lines.append(f"{name}_bucket{_labels(label_names, key, le)} {cumulative}")
+        lines.append(f"{name}_sum{_labels(label_names, key)} {histogram[-1]:.9f}")
+        lines.append(f"{name}_count{_labels(label_names, key)} {cumulative}")
+    return lines
+
+
+def render(merged, extra_lines=()):
+    """Render merged counters in the Prometheus text exposition format."""
+    out = []
+
+    def family(name, kind, help_text, label_names, series):
+        out.append(f"# HELP {name} {help_text}")
+        out.append(f"# TYPE {name} {kind}")
+        if kind == "histogram":
+            out.extend(_histogram_lines(name, label_names, series))
+        else:
+            for key, value in sorted(series.items()):
+                out.append(f"{name}{_labels(label_names, key)} {value}")
+
+    family("mcp_requests_total", "counter", "HTTP requests by route, method and status.",
+           ("route", "method", "status"), merged.get("requests", {}))
+    family("mcp_request_errors_total", "counter", "Requests that failed with a 5xx or an exception.",
+           ("route", "method"), merged.get("errors", {}))
+    family("mcp_requests_in_flight", "gauge", "Requests currently being handled.",
+           ("route", "method"), merged.get("in_flight", {}))
+    family("mcp_request_duration_seconds", "histogram", "End-to-end request latency.",
+           ("route", "method"), merged.get("latency", {}))
+    family("mcp_request_phase_seconds", "histogram",
+           "Time spent in each phase (validation, cache, tool, serialization, response) of tool requests.",
+           ("route", "method", "phase"), merged.get("phases", {}))
+    out.extend(extra_lines)
+    return "\n".join(out) + "\n"
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware that records request metrics for one worker."""
+
+    # Cap on distinct paths remembered by the route-label cache
+    MAX_CACHED_PATHS = 1024
+
+    def __init__(self, app, router, metrics, snapshot_dir=None, server_timing=False):
+        self.app = app
+        self.router = router
+        self.metrics = metrics
+        self.snapshot_dir = snapshot_dir
+        self.server_timing = server_timing
+        self._labels = {}
+        self._next_snapshot = 0.0
+
+    def route_label(self, scope):
+        """Map a request path to its route template, e.g. '/tools/add'."""
+        path = scope["path"]
+        label = self._labels.get(path)
+        if label is None:
+            label = "unmatched"
+            for route in self.router.routes:
+                match, _ = route.matches(scope)
+                if match == Match.FULL:
+                    label = route.path
+                    break
+            # Only remember paths that are static routes, so arbitrary URLs can't grow the cache
+            if label == path and len(self._labels) < self.MAX_CACHED_PATHS:
+                self._labels[path] = label
+        return label
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        key = (self.route_label(scope), scope["method"])
+        stats = self.metrics.routes.get(key) or self.metrics.route_stats(key)
+        phases = RequestPhases(start)
+        token = request_phases.set(phases)
+        status = 500
+        stats.in_flight += 1
+        timed = self.server_timing and wants_server_timing(scope)
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if phases.durations:
+                    phases.mark("response")
+                if timed:
+                    # A new message: preloaded responses share their header lists
+                    header = server_timing_header(phases, time.perf_counter() - start)
+                    message = {**message, "headers": [*message.get("headers", ()), (b"server-timing", header)]}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            request_phases.reset(token)
+            stats.in_flight -= 1
+            statuses = stats.statuses
+            statuses[status] = statuses.get(status, 0) + 1
+            if status >= 500:
+                stats.errors += 1
+            histogram = stats.latency
+            histogram[bisect_left(BUCKETS, elapsed)] += 1
+            histogram[-1] += elapsed
+            if phases.durations:
+                phase_histograms = stats.phases
+                for phase, seconds in phases.durations:
+                    histogram = phase_histograms.get(phase)
+                    if histogram is None:
+                        histogram = phase_histograms[phase] = _new_histogram()
+                    histogram[bisect_left(BUCKETS, seconds)] += 1
+                    histogram[-1] += seconds
+            if self.snapshot_dir is not None and start >= self._next_snapshot:
+                self._next_snapshot = start + SNAPSHOT_INTERVAL
+                write_snapshot(self.snapshot_dir, self.metrics)
+
+
+def snapshot_path(directory, pid):
+    return os.path.join(directory, f"metrics-{pid}.json")
+
+
+def write_snapshot(directory, metrics):
+    """Atomically write this worker's counters for other workers to merge."""
+    path = snapshot_path(directory, os.getpid())
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(metrics.snapshot(), f)
+    os.replace(tmp, path)
+
+
+def remove_snapshot(directory, pid):
+    """Delete the snapshot of a worker that has exited."""
+    try:
+        os.remove(snapshot_path(directory, pid))
+    except FileNotFoundError:
+        pass
+
+
+def _alive(pid):
+    if os.name == "nt":
+        # os.kill would terminate the process there
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def scrape(metrics, snapshot_dir=None):
+    """Merge this worker's live counters with other live workers' snapshots."""
+    snapshots = [metrics.snapshot()]
+    if snapshot_dir is not None:
+        own = os.getpid()
+        for path in glob.glob(snapshot_path(snapshot_dir, "*")):
+            try:
+                pid = int(os.path.basename(path)[len("metrics-"):-len(".json")])
+            except ValueError:
+                continue
+            if pid == own:
+                continue
+            # A dead worker's counters would be counted again by its replacement's
+            if not _alive(pid):
+                remove_snapshot(snapshot_dir, pid)
+                continue
+            try:
+                with open(path) as f:
+                    snapshots.append(json.load(f))
+            except (OSError, ValueError):
+                continue
+    extra = []
+    for collector in metrics.collectors:
+        extra.extend(collector())
+    return render(merge_snapshots(snapshots), extra)
+
+
+# The metrics shared by the app and the tool registry in this worker
+metrics = Metrics()
@@ -0,0 +1,263 @@
+"""
+On-demand profiling: per-request phase timings and a sampling profiler.
+
+Both are off unless MCP_PROFILING=1, and cost nothing then: no route, no
+signal handler and no per-request work is added.
+
+Server-Timing: a request with an X-Server-Timing header (any value) or the
+query flag ?server_timing=1 gets the phases the metrics middleware already
+times back in a Server-Timing header, in milliseconds:
+
+  Server-Timing: validation;dur=0.094, cache;dur=0.006, tool;dur=0.412, serialization;dur=0.011, response;dur=0.009, total;dur=0.560
+
+`validation` is everything before the tool wrapper runs: the middleware,
+routing and parameter validation. Routes without phases report only the
+total.
+
+Sampling profiler: GET /admin/profile?seconds=10&hz=100 samples the stack
+of every thread in every server process (all serve.py workers and their
+process pools) `hz` times a second and returns collapsed stacks, one line
+per distinct stack with its sample count, for flamegraph.pl or speedscope:
+
+  MainThread;<module> (serve.py:175);...;analyze_text (text_stream.py:402) 37
+
+The worker that gets the request writes it to MCP_PROFILE_DIR and sends
+SIGUSR2 to serve.py's master, which forwards it to every worker; each
+worker forwards it to its process pool's children. Every process samples
+itself on a plain background thread until the common end time, writes its
+stacks next to the request, and the first worker merges them. One profile
+runs at a time.
+
+Environment variables:
+  MCP_PROFILING    1 enables Server-Timing and /admin/profile, default 0
+  MCP_PROFILE_DIR  directory for profile requests and results, default a
+                   temp directory named after the process that imports
+                   this module first (serve.py's master)
+"""
+
+import _thread
+import asyncio
+import json
+import multiprocessing
+import os
+import signal
+import sys
+import tempfile
+import threading
+import time
+import uuid
+
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse, PlainTextResponse
+
+router = APIRouter()
+
+PROFILING = os.environ.get("MCP_PROFILING", "0") == "1"
+# Computed once at import, so processes forked afterwards (serve.py's
+# workers, the process pool) all use the same directory
+PROFILE_DIR = os.environ.get("MCP_PROFILE_DIR") or os.path.join(tempfile.gettempdir(), f"mcp-profile-{os.getpid()}")
+PROFILE_SIGNAL = signal.SIGUSR2
+MAX_SECONDS = 300
+MAX_HZ = 1000
+# Seconds past the end of a profile to wait for other processes' stacks
+COLLECT_TIMEOUT = 2.0
+# A request older than this when its signal arrives is ignored
+REQUEST_TTL = 5.0
+
+# Sampling state of this process; set from the signal handler
+_started = None
+_sampling = False
+
+
+# ----- Sampling -----
+
+def _path_prefixes():
+    return sorted({os.path.join(os.path.abspath(p), "") for p in sys.path if p}, key=len, reverse=True)
+
+
+def _frame_label(code, prefixes, labels):
+    label = labels.get(code)
+    if label is None:
+        path = code.co_filename
+        for prefix in prefixes:
+            if path.startswith(prefix):
+                path = path[len(prefix):]
+                break
+        name = getattr(code, "co_qualname", code.co_name)
+        label = labels[code] = f"{name} ({path}:{code.co_firstlineno})".replace(";", ":")
+    return label
+
+
+def sample_stacks(until, hz):
+    """{(thread id, code objects outermost first): samples} for every other thread until `until` (time.time())."""
+    own = _thread.get_ident()
+    interval = 1.0 / hz
+    end = time.monotonic() + (until - time.time())
+    counts = {}
+    next_sample = time.monotonic()
+    while next_sample < end:
+        for ident, frame in sys._current_frames().items():
+            if ident == own:
+                continue
+            codes = []
+            while frame is not None:
+                codes.append(frame.f_code)
+                frame = frame.f_back
+            key = ident, tuple(reversed(codes))
+            counts[key] = counts.get(key, 0) + 1
+        next_sample += interval
+        delay = next_sample - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+        else:
+            # Fell behind (a long GIL hold); skip the missed samples rather than burst
+            next_sample = time.monotonic()
+    return counts
+
+
+def collapse(counts):
+    """Collapsed-stack lines ("thread;frame;...;frame count") for sample_stacks() output."""
+    threads = {thread.ident: thread.name for thread in threading.enumerate()}
+    prefixes = _path_prefixes()
+    labels = {}
+    stacks = {}
+    for (ident, codes), count in counts.items():
+        stack = ";".join([threads.get(ident, f"thread-{ident}")] + [_frame_label(c, prefixes, labels) for c in codes])
+        stacks[stack] = stacks.get(stack, 0) + count
+    return stacks
+
+
+def _result_path(profile_id, suffix):
+    return os.path.join(PROFILE_DIR, f"{profile_id}.{os.getpid()}.{suffix}")
+
+
+def _profile(request):
+    """Body of this process's sampling thread: sample, then write the stacks for the collector."""
+    global _sampling
+    try:
+        open(_result_path(request["id"], "started"), "w").close()
+        stacks = collapse(sample_stacks(request["until"], request["hz"]))
+        path = _result_path(request["id"], "txt")
+        with open(path + ".tmp", "w") as f:
+            f.writelines(f"{stack} {count}\n" for stack, count in stacks.items())
+        os.replace(path + ".tmp", path)
+    except OSError:
+        pass
+    finally:
+        _sampling = False
+
+
+def _read_request():
+    try:
+        with open(os.path.join(PROFILE_DIR, "request.json")) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _on_signal(signum=None, frame=None):
+    """Start sampling for the current request and pass the signal on to child processes."""
+    global _started, _sampling
+    request = _read_request()
+    if request is None or request["id"] == _started or time.time() > request["created"] + REQUEST_TTL:
+        return
+    _started = request["id"]
+    # Pool children have this handler only when forked from this process
+    if multiprocessing.get_start_method() == "fork":
+        for child in multiprocessing.active_children():
+            try:
+                os.kill(child.pid, PROFILE_SIGNAL)
+            except ProcessLookupError:
+                pass
+    if not _sampling:
+        _sampling = True
+        # A raw thread: threading.Thread.start() takes locks the interrupted
+        # main thread may be holding
+        _thread.start_new_thread(_profile, (request,))
+
+
+def install():
+    """Handle profile signals in this process (and the processes it forks)."""
+    if threading.current_thread() is threading.main_thread():
+        signal.signal(PROFILE_SIGNAL, _on_signal)
+
+
+def _master_pid():
+    master = int(os.environ.get("MCP_PROFILE_MASTER", 0))
+    return master if master and master == os.getppid() else None
+
+
+def _collect(profile_id, by_process):
+    """(merged stacks, processes, samples, still running) from the result files of a profile."""
+    stacks = {}
+    processes = samples = 0
+    names = os.listdir(PROFILE_DIR)
+    started = {name.rsplit(".", 2)[1] for name in names if name.startswith(profile_id) and name.endswith(".started")}
+    done = {name.rsplit(".", 2)[1] for name in names if name.startswith(profile_id) and name.endswith(".txt")}
+    for pid in done:
+        processes += 1
+        with open(os.path.join(PROFILE_DIR, f"{profile_id}.{pid}.txt")) as f:
+            for line in f:
+                stack, _, count = line.rstrip("\n").rpartition(" ")
+                if by_process:
+                    stack = f"pid {pid};{stack}"
+                stacks[stack] = stacks.get(stack, 0) + int(count)
+                samples += int(count)
+    return stacks, processes, samples, started - done
+
+
+def _remove(profile_id):
+    for name in os.listdir(PROFILE_DIR):
+        if name.startswith(profile_id):
+            try:
+                os.remove(os.path.join(PROFILE_DIR, name))
+            except OSError:
+                pass
+
+
+def remove_profile_dir():
+    """Delete the profile files and, when nothing else is in it, the directory."""
+    try:
+        for name in os.listdir(PROFILE_DIR):
+            if name.startswith("request.json") or name.endswith((".started", ".txt", ".tmp")):
+                os.remove(os.path.join(PROFILE_DIR, name))
+        os.rmdir(PROFILE_DIR)
+    except OSError:
+        pass
+
+
+# ----- Admin endpoint -----
+
+@router.get("/admin/profile", response_class=PlainTextResponse)
+async def profile(seconds: float = 10.0, hz: int = 100, by_process: bool = False):
+    """Sample every server process for `seconds` and return collapsed stacks."""
+    if not 0 < seconds <= MAX_SECONDS or not 1 <= hz <= MAX_HZ:
+        return JSONResponse({"error": f"seconds must be in (0, {MAX_SECONDS}] and hz in [1, {MAX_HZ}]"},
+                            status_code=422)
+    if _sampling:
+        return JSONResponse({"error": "A profile is already running"}, status_code=409)
+    profile_id = uuid.uuid4().hex
+    until = time.time() + seconds
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    path = os.path.join(PROFILE_DIR, "request.json")
+    with open(path + ".tmp", "w") as f:
+        json.dump({"id": profile_id, "created": time.time(), "until": until, "hz": hz}, f)
+    os.replace(path + ".tmp", path)
+
+    master = _master_pid()
+    if master is not None:
+        os.kill(master, PROFILE_SIGNAL)
+    else:
+        _on_signal()
+
+    await asyncio.sleep(max(0.0, until - time.time()))
+    deadline = time.monotonic() + COLLECT_TIMEOUT
+    while True:
+        stacks, processes, samples, running = _collect(profile_id, by_process)
+        if not running or time.monotonic() >= deadline:
+            break
+        await asyncio.sleep(0.05)
+    _remove(profile_id)
+    body = "".join(f"{stack} {count}\n" for stack, count in sorted(stacks.items()))
+    return PlainTextResponse(body, headers={"X-Profile-Processes": str(processes), "X-Profile-Samples": str(samples),
+                                            "X-Profile-Incomplete": str(len(running))})
@@ -0,0 +1,474 @@
+#!/usr/bin/env python3
+"""
+Tool registry for the MCP server.
+
+Tools register themselves with the @tool decorator (stacked under the FastAPI
+route decorator). Once all routes exist, freeze(app) reads each tool's
+endpoint and method from the app's routes and its parameter schema from the
+type hints, then pre-serializes every discovery document (/mcp-config,
+/api/info and MCP tools/list) into bytes with an ETag. Discovery requests
+just return those bytes, or 304 when the client's copy is current.
+
+Tools may declare a typed response model (see response_models.py). Their
+results are then serialized by the model's precompiled pydantic-core
+serializer instead of stdlib json. Set MCP_FAST_JSON=0 to force the standard
+path for every tool, e.g. to compare the two.
+
+Each typed tool also has an execution policy (inline, thread or process; see
+execution.py) that decides where its body runs, for routes and for batch/MCP
+dispatch alike. Identical concurrent calls to a pure tool that runs off the
+event loop share one execution.
+
+Tool modules can be reloaded while the server runs (see reloader.py): the
+tools of the new version are staged, then swapped in with replace(), which
+refreezes the registry.
+
+Run `python3 registry.py > mcp_config.json` to regenerate the static config.
+"""
+
+from fastapi.responses import JSONResponse, Response
+from fastapi.routing import APIRoute
+from pydantic import TypeAdapter, ValidationError, validate_call
+from assets import Asset
+from calllog import call_log, current_call
+from execution import POLICIES, PoolFullError, SingleFlight, overrides_from_env, pools_from_env
+from metrics import request_phases
+from result_cache import cache_from_env, cache_key, render_json
+import asyncio
+import functools
+import importlib
+import inspect
+import json
+import os
+import time
+from typing import Annotated, Union, get_args, get_origin
+
+SERVER_NAME = "FastAPI MCP Server"
+SERVER_VERSION = "1.0.0"
+SERVER_URL = "http://localhost:8000"
+SERVER_DESCRIPTION = "FastAPI MCP Server with multiple utility tools"
+
+_JSON_TYPES = {int: "integer", float: "number", str: "string", bool: "boolean", dict: "object", list: "array"}
+
+def _env_flag(name):
+    return os.environ.get(name, "1").lower() not in ("0", "false", "off", "no")
+
+
+FAST_JSON = _env_flag("MCP_FAST_JSON")
+
+
+class ToolSpec:
+    """Everything the server advertises about one tool."""
+
+    def __init__(self, name, fn, description, parameters, callable_):
+        self.name = name
+        self.fn = fn
+        # The function actually mounted on the route (fn, or its caching wrapper)
+        self.route_fn = fn
+        # Pure tools depend only on their params: cacheable and coalescable
+        self.pure = False
+        self.cached = False
+        self.description = description
+        self.parameters = parameters
+        # Whether the tool can be dispatched with keyword arguments (batch, MCP)
+        self.callable = callable_
+        self.endpoint = None
+        self.method = None
+        self.position = None
+        # Typed response model and the encoder that turns a result into bytes
+        self.response = None
+        self.output_schema = None
+        self.encode = render_json
+        # Where the tool body runs, and the validator used for batch/MCP calls
+        self.execution = None
+        self.validate = None
+        # Calls whose string arguments total fewer characters run inline
+        self.inline_below = 0
+
+    def config_entry(self):
+        entry = {
+            "name": self.name,
+            "endpoint": self.endpoint,
+            "method": self.method,
+            "description": self.description,
+        }
+        if self.parameters:
+            entry["parameters"] = self.parameters
+        if self.execution:
+            entry["execution"] = self.execution
+        if self.inline_below:
+            entry["inline_below"] = self.inline_below
+        return entry
+
+    def input_schema(self):
+        properties = {}
+        required = []
+        for name, param in self.parameters.items():
+            properties[name] = {k: v for k, v in param.items() if k != "required"}
+            if param.get("required"):
+                required.append(name)
+        return {"type": "object", "properties": properties, "required": required}
+
+    def tools_list_entry(self):
+        entry = {"name": self.name, "description": self.description, "inputSchema": self.input_schema()}
+        if self.output_schema is not None:
+            entry["outputSchema"] = self.output_schema
+        return entry
+
+
+class Blob(Asset):
+    """A pre-serialized JSON document, precompressed, with strong ETags."""
+
+    def __init__(self, data):
+        self.data = data
+        super().__init__(json.dumps(data, ensure_ascii=False).encode("utf-8"), "application/json")
+
+
+def _json_type(annotation):
+    """JSON Schema type for a parameter annotation, looking through Annotated and Optional."""
+    if get_origin(annotation) is Annotated:
+        annotation = get_args(annotation)[0]
+    if get_origin(annotation) is Union:
+        annotation = next(arg for arg in get_args(annotation) if arg is not type(None))
+    return _JSON_TYPES.get(get_origin(annotation) or annotation, "string")
+
+
+def _parameters_from_hints(fn, docs):
+    """Build the parameter schema for a tool from its signature and type hints."""
+    parameters = {}
+    for name, param in inspect.signature(fn).parameters.items():
+        entry = {"type": _json_type(param.annotation)}
+        if name in docs:
+            entry["description"] = docs[name]
+        if param.default is inspect.Parameter.empty:
+            entry["required"] = True
+        else:
+            entry["default"] = param.default
+        parameters[name] = entry
+    return parameters
+
+
+def _validator(fn):
+    """validate_call over fn's signature that returns the normalized kwargs
+    (defaults filled in) instead of calling fn."""
+    def bind(**kwargs):
+        return kwargs
+    bind.__signature__ = inspect.signature(fn)
+    bind.__annotations__ = dict(fn.__annotations__)
+    bind.__name__ = fn.__name__
+    return validate_call(bind)
+
+
+def _text_size(kwargs):
+    """Total length of a call's string arguments, the size that inline_below bounds."""
+    return sum(len(value) for value in kwargs.values() if isinstance(value, str))
+
+
+def _run_in_process(module, name, kwargs):
+    """Process-pool entry point: find the tool by name in the worker process."""
+    importlib.import_module(module)
+    return registry.tools[name].fn(**kwargs)
+
+
+async def call_outcome(fn, params):
+    """Run a dispatch callable; returns (the equivalent HTTP status, result or error record).
+
+    The record is {"result": ...} or {"error": ...}, the shape batch and
+    WebSocket replies carry and MCP tools/call wraps.
+    """
+    try:
+        result = await fn(**params)
+    except PoolFullError as e:
+        return 503, {"error": f"{e}, retry later"}
+    except ValidationError as e:
+        return 422, {
+            "error": "Invalid parameters",
+            "details": [
+                {"loc": list(err["loc"]), "msg": err["msg"], "type": err["type"]}
+                for err in e.errors()
+            ],
+        }
+    if "error" in result:
+        return 200, {"error": result["error"]}
+    return 200, {"result": result}
+
+
+async def logged_outcome(transport, name, fn, params):
+    """call_outcome, reported to the call log under `transport` when it is enabled;
+    returns the record. Calls turned away by registry.admit are not run."""
+    rejected = registry.admit(name) if registry.admit is not None else None
+    if rejected is not None:
+        status, outcome = rejected
+        if call_log is not None:
+            call_log.record(transport, name, params, status, 0.0)
+        return outcome
+    if call_log is None:
+        return (await call_outcome(fn, params))[1]
+    start = time.perf_counter()
+    call = {}
+    token = current_call.set(call)
+    try:
+        status, outcome = await call_outcome(fn, params)
+    finally:
+        current_call.reset(token)
+    call_log.record(transport, name, call.get("params", params), status, time.perf_counter() - start,
+                    call.get("cache"))
+    return outcome
+
+
+def overloaded_response(error):
+    return JSONResponse({"error": f"{error}, retry later"}, status_code=503, headers={"Retry-After": "1"})
+
+
+def _takes_request(fn):
+    return any(
+        getattr(p.annotation, "__name__", None) == "Request"
+        for p in inspect.signature(fn).parameters.values()
+    )
+
+
+class ToolRegistry:
+    def __init__(self, cache=None, pools=None, execution_overrides=None, coalesce=True):
+        self.specs = []
+        self.tools = {}
+        self.dispatch = {}
+        self.cache = cache
+        self.pools = pools if pools is not None else {}
+        self.execution_overrides = execution_overrides or {}
+        self.flights = SingleFlight() if coalesce else None
+        self.frozen = False
+        # Set by reloader.py while a new version of a tool module is imported
+        self.staging = None
+        # Per-tool admission for calls by name (batch, MCP, WebSocket): called
+        # with the tool name, returns (status, error record) to turn the call
+        # away; set by AdmissionControl.bind()
+        self.admit = None
+
+    def tool(self, name, description, params=None, cache=True, response=None, execution="inline",
+             inline_below=0):
+        """Register a route function as an MCP tool.
+
+        `params` maps parameter names to a description for typed tools, or to
+        a full schema dict for tools that read the raw Request body. Typed
+        tools are pure functions of their inputs; their results go through
+        the result cache and identical concurrent calls are coalesced, unless
+        `cache=False`. `response` is an optional
+        TypedDict describing the result, which enables the fast serializer.
+        `execution` is the tool's default policy: "inline", "thread" or
+        "process" (MCP_EXECUTION can override it). With `inline_below`, calls
+        whose string arguments total fewer characters run inline anyway,
+        since for them the hop to a pool costs more than the body.
+        """
+        params = params or {}
+        execution = self.execution_overrides.get(name, execution)
+        if execution not in POLICIES:
+            raise ValueError(f"Tool '{name}': unknown execution policy '{execution}'")
+
+        def decorator(fn):
+            if _takes_request(fn):
+                spec = ToolSpec(name, fn, description, params, callable_=False)
+            else:
+                spec = ToolSpec(name, fn, description, _parameters_from_hints(fn, params), callable_=True)
+                spec.pure = cache
+                spec.cached = cache and self.cache is not None
+                if response is not None:
+                    adapter = TypeAdapter(response)
+                    spec.response = response
+                    spec.output_schema = adapter.json_schema()
+                    if FAST_JSON:
+                        spec.encode = adapter.dump_json
+                spec.execution = execution
+                spec.inline_below = inline_below
+                spec.validate = _validator(fn)
+                spec.route_fn = self._route(spec)
+            if self.staging is not None:
+                self.staging.append(spec)
+            else:
+                self.specs.append(spec)
+                self.tools[name] = spec
+            return spec.route_fn
+        return decorator
+
+    async def cache_get(self, key):
+        """Look up a cached body, on a thread when the backend blocks on I/O."""
+        if self.cache.blocking:
+            return await asyncio.to_thread(self.cache.get, key)
+        return self.cache.get(key)
+
+    async def cache_put(self, key, body):
+        if self.cache.blocking:
+            await asyncio.to_thread(self.cache.put, key, body)
+        else:
+            self.cache.put(key, body)
+
+    async def execute(self, spec, kwargs, key=None):
+        """Run a tool body under its execution policy.
+
+        Inline calls (and small ones, see inline_below) finish without
+        yielding, so they never overlap; calls to a pure tool on a pool join
+        an identical call already running.
+        """
+        if spec.execution == "inline" or (spec.inline_below and _text_size(kwargs) < spec.inline_below):
+            return spec.fn(**kwargs)
+        if spec.pure and self.flights is not None:
+            key = key or cache_key(spec.name, kwargs)
+            return await self.flights.run(key, lambda: self._offload(spec, kwargs))
+        return await self._offload(spec, kwargs)
+
+    async def _offload(self, spec, kwargs):
+        if spec.execution == "thread":
+            return await self.pools["thread"].run(functools.partial(spec.fn, **kwargs))
+        return await self.pools["process"].run(_run_in_process, spec.fn.__module__, spec.name, kwargs)
+
+    def _route(self, spec):
+        """Wrap a typed tool for its route.
+
+        FastAPI still validates the query params against fn's signature and,
+        since the wrapper is async, calls it on the event loop. The wrapper
+        serves cache hits as stored bytes, runs misses under the tool's
+        execution policy, serializes them itself with spec.encode and reports
+        each phase to the metrics middleware and the call to the call log.
+        """
+        name, cached = spec.name, spec.cached
+
+        @functools.wraps(spec.fn)
+        async def route(**kwargs):
+            phases = request_phases.get()
+            if phases is not None:
+                phases.mark("validation")
+            call = current_call.get()
+            if call is not None:
+                call["params"] = kwargs
+            if cached:
+                key = cache_key(name, kwargs)
+                body = await self.cache_get(key)
+                if phases is not None:
+                    phases.mark("cache")
+                if call is not None:
+                    call["cache"] = "miss" if body is None else "hit"
+                if body is not None:
+                    return Response(body, media_type="application/json")
+            try:
+                result = await self.execute(spec, kwargs, key if cached else None)
+            except PoolFullError as e:
+                return overloaded_response(e)
+            if phases is not None:
+                phases.mark("tool")
+            body = spec.encode(result)
+            if phases is not None:
+                phases.mark("serialization")
+            # A call that outlived a reload of its tool must not cache the old version's result
+            if cached and self.tools.get(name) is spec:
+                await self.cache_put(key, body)
+            return Response(body, media_type="application/json")
+        return route
+
+    def _dispatcher(self, spec):
+        """Async callable for batch/MCP dispatch: validates the raw params,
+        then shares the route's cache and execution policy. Raises
+        ValidationError for bad params and PoolFullError when overloaded."""
+        async def call(**params):
+            kwargs = spec.validate(**params)
+            logged = current_call.get()
+            if logged is not None:
+                logged["params"] = kwargs
+            if not spec.cached:
+                return await self.execute(spec, kwargs)
+            key = cache_key(spec.name, kwargs)
+            body = await self.cache_get(key)
+            if logged is not None:
+                logged["cache"] = "miss" if body is None else "hit"
+            if body is None:
+                body = spec.encode(await self.execute(spec, kwargs, key))
+                if self.tools.get(spec.name) is spec:
+                    await self.cache_put(key, body)
+            return json.loads(body)
+        return call
+
+    def replace(self, app, old, new):
+        """Swap the tool specs `old` for `new` (a reloaded module's) and refreeze.
+
+        The routes of `new` must already be mounted on `app`. Cached results
+        and running coalesced calls of the tools involved are dropped, and the
+        process pool is restarted when one of them runs there, so its next
+        workers are forked with the new code; calls already running finish
+        on the old version.
+        """
+        names = {s.name for s in old} | {s.name for s in new}
+        self.specs = [s for s in self.specs if s not in old] + list(new)
+        self.tools = {s.name: s for s in self.specs}
+        self.freeze(app)
+        if self.cache is not None:
+            self.cache.invalidate(names)
+        if self.flights is not None:
+            self.flights.forget(names)
+        if "process" in self.pools and any(s.execution == "process" for s in (*old, *new)):
+            self.pools["process"].recycle()
+
+    def shutdown(self):
+        """Stop the pools' threads and worker processes."""
+        for pool in self.pools.values():
+            pool.shutdown()
+
+    def execution_info(self):
+        """Each tool's execution policy and the state of every pool."""
+        return {
+            "tools": {s.name: s.execution for s in self.specs if s.callable},
+            "pools": {kind: pool.info() for kind, pool in self.pools.items()},
+            "coalescing": self.flights.info() if self.flights is not None else {"enabled": False},
+        }
+
+    def freeze(self, app):
+        """Resolve endpoints from the app's routes and pre-serialize all documents."""
+        routes = {
+            route.endpoint: (position, route)
+            for position, route in enumerate(app.routes)
+            if isinstance(route, APIRoute)
+        }
+        for spec in self.specs:
+            if spec.route_fn not in routes:
+                raise RuntimeError(f"Tool '{spec.name}' is not mounted on any route")
+            position, route = routes[spec.route_fn]
+            spec.position = position
+            spec.endpoint = route.path
+            spec.method = sorted(route.methods)[0]
+        # List tools in route order, not import order
+        self.specs.sort(key=lambda s: s.position)
+
+        self.dispatch = {s.name: self._dispatcher(s) for s in self.specs if s.callable}
+        self.endpoints = list(dict.fromkeys(s.endpoint for s in self.specs))
+        self.mcp_config = Blob(self.mcp_config_data())
+        self.api_info = Blob({
+            "name": SERVER_NAME,
+            "version": SERVER_VERSION,
+            "status": "running",
+            "available_tools": self.endpoints,
+            "documentation": "/docs",
+            "mcp_config": "/mcp-config",
+            "mcp_endpoint": "/mcp",
+        })
+        self.tools_list = Blob({"tools": [s.tools_list_entry() for s in self.specs if s.callable]})
+        self.frozen = True
+
+    def mcp_config_data(self):
+        return {
+            "mcpServers": {
+                "fastapi-mcp": {
+                    "url": SERVER_URL,
+                    "description": SERVER_DESCRIPTION,
+                    "tools": [s.config_entry() for s in self.specs],
+                }
+            }
+        }
+
+
+# The registry shared by every tool module
+registry = ToolRegistry(cache=cache_from_env(), pools=pools_from_env(),
+                        execution_overrides=overrides_from_env(), coalesce=_env_flag("MCP_COALESCE"))
+tool = registry.tool
+
+
+if __name__ == "__main__":
+    # Importing main registers every tool and freezes its registry
+    from main import registry as app_registry
+    print(json.dumps(app_registry.mcp_config_data(), indent=2, ensure_ascii=False))
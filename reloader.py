@@ -0,0 +1,326 @@
+"""
+Zero-downtime reload of tool modules.
+
+main.py mounts every tool module (basic_tools, array_tools, units, ...) with
+tool_modules.mount(). With MCP_HOT_RELOAD=1, POST /admin/reload or a SIGHUP
+reloads the tool modules whose source changed since they were loaded:
+
+  1. each changed module, and every mounted module that imports it, is
+     imported again from disk as a new module object, with its tools staged
+     instead of registered
+  2. once all of them imported cleanly, their routes replace the old ones
+     in place and the registry is refrozen, in one step on the event loop
+
+The imports run on a thread, so requests are served meanwhile; the event
+loop only pauses for the swap (a few milliseconds).
+
+Requests already routed keep the old route, and old functions keep the old
+module's globals, so calls in flight finish on the old version; everything
+routed after the swap uses the new one. A module that fails to import
+changes nothing. Only the reloaded tools lose warm state: their cached
+results and coalesced calls are dropped, and the process pool is restarted
+(its old workers finish their calls first) when one of them runs there.
+
+Shared modules (registry, response_models, text_stream, ...) are not
+reloaded; changing them still needs a restart.
+
+With serve.py, SIGHUP to the master is forwarded to every worker, and
+/admin/reload reloads the worker that serves it, then signals the master so
+the others follow.
+
+Environment variables:
+  MCP_HOT_RELOAD  1 enables /admin/reload and SIGHUP, default 0
+"""
+
+import ast
+import asyncio
+import copy
+import hashlib
+import importlib.util
+import os
+import signal
+import sys
+import time
+import traceback
+from typing import List, Optional
+
+from fastapi import APIRouter, Query
+from fastapi.responses import JSONResponse
+
+from registry import registry
+
+router = APIRouter()
+
+HOT_RELOAD = os.environ.get("MCP_HOT_RELOAD", "0") == "1"
+RELOAD_SIGNAL = signal.SIGHUP
+
+
+class ReloadError(Exception):
+    """A tool module could not be reloaded; the running version is kept."""
+
+
+class ToolModule:
+    """A mounted tool module, its routes on the app and the source it was loaded from."""
+
+    def __init__(self, module, routes, source, tree=None):
+        self.name = module.__name__
+        self.path = module.__file__
+        self.module = module
+        self.routes = routes
+        self.source = source
+        self.digest = hashlib.sha1(source).hexdigest()
+        self._imports = None if tree is None else _imports(tree)
+        self.generation = 1
+        self.loaded = time.time()
+
+    @property
+    def imports(self):
+        # Parsed on first use, so mounting at startup stays cheap
+        if self._imports is None:
+            self._imports = _imports(ast.parse(self.source))
+        return self._imports
+
+    def changed(self):
+        try:
+            with open(self.path, "rb") as f:
+                return hashlib.sha1(f.read()).hexdigest() != self.digest
+        except OSError:
+            return False
+
+    def info(self):
+        return {
+            "file": os.path.basename(self.path),
+            "digest": self.digest,
+            "generation": self.generation,
+            "loaded": self.loaded,
+            "changed": self.changed(),
+            "tools": [s.name for s in registry.specs if s.fn.__module__ == self.name],
+        }
+
+
+def _imports(tree):
+    """Top-level module names a module's syntax tree imports."""
+    names = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            names.update(alias.name.split(".")[0] for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+            names.add(node.module.split(".")[0])
+    return names
+
+
+def _read(path):
+    with open(path, "rb") as f:
+        return f.read()
+
+
+class ToolModules:
+    """The app's tool modules, and the reloads that swap them."""
+
+    def __init__(self):
+        self.app = None
+        self.modules = {}
+        # Called with the registry after each reload (admission and call log bindings)
+        self.on_reload = []
+        self.reloads = 0
+        self.failures = 0
+        self.last_error = None
+        self._lock = asyncio.Lock()
+        self._signalled = None
+
+    def mount(self, app, module):
+        """Include a tool module's router in the app and remember its routes."""
+        self.app = app
+        routes = app.router.routes
+        start = len(routes)
+        app.include_router(module.router)
+        self.modules[module.__name__] = ToolModule(module, routes[start:], _read(module.__file__))
+
+    def module(self, name):
+        """The running version of a tool module."""
+        return self.modules[name].module
+
+    def plan(self, names=None, force=False):
+        """The modules to reload, each after the mounted modules it imports."""
+        if names is None:
+            names = [name for name, m in self.modules.items() if force or m.changed()]
+        unknown = [name for name in names if name not in self.modules]
+        if unknown:
+            raise ReloadError(f"Unknown tool module(s) {', '.join(unknown)}; reloadable: {', '.join(self.modules)}")
+        selected = set(names)
+        # Modules importing a reloaded one would keep the old version's objects
+        growing = True
+        while growing:
+            dependents = {name for name, m in self.modules.items() if m.imports & selected} - selected
+            selected |= dependents
+            growing = bool(dependents)
+        ordered = []
+
+        def visit(name):
+            if name not in ordered:
+                for dependency in sorted(self.modules[name].imports & selected - {name}):
+                    visit(dependency)
+                ordered.append(name)
+        for name in self.modules:
+            if name in selected:
+                visit(name)
+        return ordered
+
+    async def reload(self, names=None, force=False):
+        """Reload changed (or the named) tool modules; returns a report. Raises ReloadError."""
+        async with self._lock:
+            start = time.perf_counter()
+            try:
+                plan = self.plan(names, force)
+                if not plan:
+                    return {"reloaded": [], "tools": [], "seconds": 0.0, "swap_seconds": 0.0}
+                loaded = await asyncio.to_thread(self._load_all, plan)
+            except ReloadError as e:
+                self.failures += 1
+                self.last_error = str(e)
+                raise
+            swap = time.perf_counter()
+            self._swap(loaded)
+            self.reloads += 1
+            end = time.perf_counter()
+            return {
+                "reloaded": plan,
+                "tools": sorted(s.name for _, specs, _ in loaded for s in specs),
+                "seconds": round(end - start, 6),
+                "swap_seconds": round(end - swap, 6),
+            }
+
+    def _load_all(self, plan):
+        """Import the new versions of the planned modules, all or none (runs on a thread)."""
+        saved = {name: sys.modules.get(name) for name in plan}
+        try:
+            return [self._load(self.modules[name]) for name in plan]
+        except Exception as e:
+            # Keep every module at its running version
+            sys.modules.update(saved)
+            error = "".join(traceback.format_exception_only(type(e), e)).strip()
+            raise ReloadError(f"Reloading {', '.join(plan)} failed, nothing was changed: {error}") from e
+
+    def _load(self, current):
+        """Import a new version of a module: (its new record, staged specs, the record it replaces)."""
+        source = _read(current.path)
+        tree = ast.parse(source, current.path)
+        spec = importlib.util.spec_from_file_location(current.name, current.path)
+        module = importlib.util.module_from_spec(spec)
+        # Later modules of the same reload import this version
+        sys.modules[current.name] = module
+        registry.staging = []
+        try:
+            exec(compile(tree, current.path, "exec"), module.__dict__)
+        finally:
+            specs, registry.staging = registry.staging, None
+
+        # Built on a copy of the app's router, so the routes get its settings
+        # while the app's own route list is only changed by the swap
+        scratch = copy.copy(self.app.router)
+        scratch.routes, scratch.on_startup, scratch.on_shutdown = [], [], []
+        scratch.include_router(module.router)
+        new_routes = scratch.routes
+        endpoints = {getattr(route, "endpoint", None) for route in new_routes}
+        for s in specs:
+            if s.route_fn not in endpoints:
+                raise ReloadError(f"Tool '{s.name}' is not mounted on the module's router")
+            owner = registry.tools.get(s.name)
+            if owner is not None and owner.fn.__module__ != current.name:
+                raise ReloadError(f"Tool '{s.name}' is already defined in {owner.fn.__module__}")
+        record = ToolModule(module, new_routes, source, tree)
+        record.generation = current.generation + 1
+        return record, specs, current
+
+    def _swap(self, loaded):
+        """Put reloaded modules' routes and tools in place of the old ones, without yielding."""
+        # New routes go where the module's first old route was; a module
+        # that had none adds its routes at the end
+        first = {id(current.routes[0]): record for record, _, current in loaded if current.routes}
+        added = [record for record, _, current in loaded if not current.routes]
+        old_routes = {id(route) for _, _, current in loaded for route in current.routes}
+        routes = []
+        for route in self.app.router.routes:
+            record = first.get(id(route))
+            if record is not None:
+                routes.extend(record.routes)
+            if id(route) not in old_routes:
+                routes.append(route)
+        for record in added:
+            routes.extend(record.routes)
+        self.app.router.routes[:] = routes
+        self.app.openapi_schema = None
+
+        names = {current.name for _, _, current in loaded}
+        old = [s for s in registry.specs if s.fn.__module__ in names]
+        registry.replace(self.app, old, [s for _, specs, _ in loaded for s in specs])
+        for record, _, _ in loaded:
+            self.modules[record.name] = record
+        for hook in self.on_reload:
+            hook(registry)
+
+    def install(self):
+        """Reload changed modules on SIGHUP (a startup handler: needs the running loop)."""
+        try:
+            asyncio.get_running_loop().add_signal_handler(RELOAD_SIGNAL, self._on_signal)
+        except (NotImplementedError, RuntimeError, ValueError):
+            # No signals on this platform, or not the main thread
+            pass
+
+    def _on_signal(self):
+        self._signalled = asyncio.ensure_future(self._reload_on_signal())
+
+    async def _reload_on_signal(self):
+        try:
+            report = await self.reload()
+        except ReloadError as e:
+            print(f"[pid {os.getpid()}] {e}", file=sys.stderr)
+            return
+        if report["reloaded"]:
+            print(f"[pid {os.getpid()}] Reloaded {', '.join(report['reloaded'])} "
+                  f"in {report['seconds'] * 1000:.1f} ms", file=sys.stderr)
+
+    def info(self):
+        return {
+            "enabled": HOT_RELOAD,
+            "reloads": self.reloads,
+            "failures": self.failures,
+            "last_error": self.last_error,
+            "modules": {name: m.info() for name, m in self.modules.items()},
+        }
+
+
+# The app's tool modules
+tool_modules = ToolModules()
+
+
+def _master_pid():
+    master = int(os.environ.get("MCP_RELOAD_MASTER", 0))
+    return master if master and master == os.getppid() else None
+
+
+# ----- Admin endpoints -----
+
+@router.get("/admin/reload")
+def reload_status():
+    """Get each tool module's loaded version, whether its file changed, and reload counters."""
+    return tool_modules.info()
+
+
+@router.post("/admin/reload")
+async def reload_modules(module: Optional[List[str]] = Query(None), force: bool = False):
+    """Reload the tool modules whose source changed, in every worker; or reload the named
+    modules (or all of them, with force) in this worker only."""
+    unknown = [name for name in module or () if name not in tool_modules.modules]
+    if unknown:
+        return JSONResponse({"error": f"Unknown tool module(s) {', '.join(unknown)}",
+                             "modules": list(tool_modules.modules)}, status_code=404)
+    try:
+        report = await tool_modules.reload(module, force)
+    except ReloadError as e:
+        return JSONResponse({"error": str(e)}, status_code=500)
+    master = _master_pid() if not (module or force) else None
+    if master is not None:
+        # The other workers reload the same changed files
+        os.kill(master, RELOAD_SIGNAL)
+    return {**report, "pid": os.getpid(), "workers_signalled": master is not None}
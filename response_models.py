@@ -0,0 +1,146 @@
+"""
+Typed response models for the MCP tools.
+
+A tool that declares one of these with @tool(..., response=Model) is
+serialized straight to bytes by the model's precompiled pydantic-core
+serializer instead of the generic stdlib json walk, and advertises the model
+as its MCP `outputSchema`. Keys are emitted in declaration order, so keep the
+fields in the same order as the dict the tool returns. Keys not declared here
+are dropped from the response.
+"""
+
+from typing import Dict, List, Optional
+
+from typing_extensions import TypedDict
+
+
+class HelloResult(TypedDict):
+    message: str
+    timestamp: str
+
+
+class AddResult(TypedDict):
+    operation: str
+    a: int
+    b: int
+    result: int
+
+
+class MultiplyResult(TypedDict):
+    operation: str
+    a: float
+    b: float
+    result: float
+
+
+class TempConvertResult(TypedDict):
+    celsius: float
+    fahrenheit: float
+    kelvin: float
+
+
+class TextAnalysisResult(TypedDict):
+    text: str
+    character_count: int
+    word_count: int
+    uppercase_count: int
+    lowercase_count: int
+    digit_count: int
+
+
+class TermCount(TypedDict):
+    term: str
+    count: int
+
+
+class CharacterClasses(TypedDict):
+    letter: int
+    number: int
+    whitespace: int
+    punctuation: int
+    symbol: int
+    mark: int
+    other: int
+
+
+class ExtendedTextAnalysisResult(TypedDict, total=False):
+    text: str
+    # The TextAnalysisResult counts, unchanged
+    character_count: int
+    word_count: int
+    uppercase_count: int
+    lowercase_count: int
+    digit_count: int
+    line_count: int
+    sentence_count: int
+    unique_word_count: int
+    top_terms: List[TermCount]
+    character_classes: CharacterClasses
+    ngram: int
+    approximate: bool
+    # Only present, on its own, for out-of-range options
+    error: str
+
+
+class SqrtResult(TypedDict, total=False):
+    number: float
+    square_root: float
+    # Only present, on its own, for negative input
+    error: str
+
+
+class ExactArithmeticResult(TypedDict, total=False):
+    operation: str
+    # Numbers are strings: integers, decimals or fractions like "1/3"
+    a: str
+    b: str
+    result: str
+    # "integer", "decimal" or "fraction"
+    type: str
+    # Only present, on its own, for input that is not a number
+    error: str
+
+
+class ExactSqrtResult(TypedDict, total=False):
+    number: str
+    digits: int
+    square_root: str
+    exact: bool
+    # "decimal" or "isqrt"
+    method: str
+    # Only present, on its own, for negative or invalid input
+    error: str
+
+
+class EvaluationError(TypedDict):
+    index: int
+    error: str
+
+
+class EvaluateResult(TypedDict, total=False):
+    # Variable names the expression uses, sorted
+    variables: List[str]
+    # With `variables`: the single result
+    result: float
+    # With `bindings`: one result per binding, null where that row failed
+    count: int
+    results: List[Optional[float]]
+    errors: List[EvaluationError]
+    # Only present, on its own, for an invalid expression or missing variable
+    error: str
+
+
+class ConvertResult(TypedDict, total=False):
+    value: float
+    # Unit symbols, whichever name the request used
+    from_unit: str
+    to_unit: str
+    dimension: str
+    result: float
+    # Only present, on its own, for an unknown unit or mismatched dimensions
+    error: str
+
+
+class UnitsResult(TypedDict):
+    # dimension -> unit symbol -> unit name
+    dimensions: Dict[str, Dict[str, str]]
@@ -0,0 +1,286 @@
+"""
+Result cache for deterministic tools.
+
+Responses are cached as serialized JSON bytes keyed on the tool name and its
+validated (normalized) parameters, so a hit skips both the tool body and the
+serialization. Two backends share one interface:
+
+  - ResultCache:  in-process LRU with max entries, max bytes and a TTL
+  - SQLiteCache:  a shared on-disk store (a local stand-in for Redis) so
+                  several uvicorn workers see each other's hits
+
+Configure with environment variables:
+  MCP_CACHE              "memory" (default), "sqlite" or "off"
+  MCP_CACHE_MAX_ENTRIES  default 10000
+  MCP_CACHE_MAX_BYTES    default 64 MiB
+  MCP_CACHE_TTL          seconds, default 300 (0 disables expiry)
+  MCP_CACHE_PATH         SQLite file for the shared backend
+"""
+
+from collections import OrderedDict
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+
+
+def render_json(data):
+    """Serialize exactly like Starlette's JSONResponse."""
+    return json.dumps(
+        data, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def cache_key(tool, params):
+    """Build a cache key from a tool name and its validated parameters."""
+    return tool + "?" + json.dumps(params, sort_keys=True, separators=(",", ":"))
+
+
+class CacheStats:
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def as_dict(self):
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+class ResultCache:
+    """Thread-safe in-process LRU cache of serialized responses with a TTL."""
+
+    backend = "memory"
+    # Lookups are dict operations: callers may run them on the event loop
+    blocking = False
+
+    def __init__(self, max_entries=10000, max_bytes=64 * 1024 * 1024, ttl=300.0):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.stats = CacheStats()
+        self._entries = OrderedDict()  # key -> (body, expires_at, size)
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.stats.misses += 1
+                return None
+            body, expires_at, _ = entry
+            if expires_at and expires_at <= time.monotonic():
+                self._remove(key)
+                self.stats.expirations += 1
+                self.stats.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.stats.hits += 1
+            return body
+
+    def put(self, key, body):
+        # Keys embed the params (e.g. a whole analyze-text input), so count them too
+        size = len(body) + len(key)
+        if size > self.max_bytes:
+            return
+        expires_at = time.monotonic() + self.ttl if self.ttl else 0
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (body, expires_at, size)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.stats.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def invalidate(self, tools):
+        """Drop every cached result of the named tools."""
+        prefixes = tuple(tool + "?" for tool in tools)
+        with self._lock:
+            for key in [key for key in self._entries if key.startswith(prefixes)]:
+                self._remove(key)
+
+    def _remove(self, key):
+        _, _, size = self._entries.pop(key)
+        self._bytes -= size
+
+    def info(self):
+        with self._lock:
+            return {
+                "backend": self.backend,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "ttl": self.ttl,
+                **self.stats.as_dict(),
+            }
+
+
+class SQLiteCache:
+    """Cache shared between worker processes through one SQLite file.
+
+    Entries carry a wall-clock expiry and a last-access time used for LRU
+    eviction. Triggers keep the entry count and byte total in a one-row
+    `totals` table, so enforcing the limits never scans `results`. Every
+    method blocks on the file, so the registry calls get/put on a thread
+    (see `blocking`). Hit/miss counters are per process.
+    """
+
+    backend = "sqlite"
+    blocking = True
+
+    def __init__(self, path, max_entries=10000, max_bytes=64 * 1024 * 1024, ttl=300.0):
+        self.path = path
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.stats = CacheStats()
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        db = self._connect()
+        # Workers start together; one of them creates the schema and seeds the totals
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS results ("
+                "key TEXT PRIMARY KEY, body BLOB NOT NULL, size INTEGER NOT NULL, "
+                "expires_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+            )
+            db.execute("CREATE INDEX IF NOT EXISTS results_lru ON results (accessed_at)")
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS totals ("
+                "id INTEGER PRIMARY KEY CHECK (id = 0), entries INTEGER NOT NULL, bytes INTEGER NOT NULL)"
+            )
+            # A file written before the totals existed is counted once here
+            db.execute(
+                "INSERT OR IGNORE INTO totals "
+                "SELECT 0, COUNT(*), COALESCE(SUM(size), 0) FROM results"
+            )
+            db.execute(
+                "CREATE TRIGGER IF NOT EXISTS results_insert AFTER INSERT ON results BEGIN "
+                "UPDATE totals SET entries = entries + 1, bytes = bytes + new.size; END"
+            )
+            db.execute(
+                "CREATE TRIGGER IF NOT EXISTS results_delete AFTER DELETE ON results BEGIN "
+                "UPDATE totals SET entries = entries - 1, bytes = bytes - old.size; END"
+            )
+            db.execute(
+                "CREATE TRIGGER IF NOT EXISTS results_resize AFTER UPDATE OF size ON results BEGIN "
+                "UPDATE totals SET bytes = bytes - old.size + new.size; END"
+            )
+            db.execute("COMMIT")
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+
+    def _connect(self):
+        db = getattr(self._local, "db", None)
+        if db is None:
+            db = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=OFF")
+            self._local.db = db
+        return db
+
+    def _count(self, *names):
+        with self._lock:
+            for name in names:
+                setattr(self.stats, name, getattr(self.stats, name) + 1)
+
+    def get(self, key):
+        db = self._connect()
+        row = db.execute("SELECT body, expires_at FROM results WHERE key = ?", (key,)).fetchone()
+        now = time.time()
+        if row is None:
+            self._count("misses")
+            return None
+        body, expires_at = row
+        if expires_at and expires_at <= now:
+            db.execute("DELETE FROM results WHERE key = ?", (key,))
+            self._count("expirations", "misses")
+            return None
+        db.execute("UPDATE results SET accessed_at = ? WHERE key = ?", (now, key))
+        self._count("hits")
+        return bytes(body)
+
+    def put(self, key, body):
+        size = len(body) + len(key)
+        if size > self.max_bytes:
+            return
+        now = time.time()
+        db = self._connect()
+        # An upsert, not INSERT OR REPLACE: REPLACE's implicit delete skips the delete trigger
+        db.execute(
+            "INSERT INTO results VALUES (?, ?, ?, ?, ?) ON CONFLICT (key) DO UPDATE SET "
+            "body = excluded.body, size = excluded.size, "
+            "expires_at = excluded.expires_at, accessed_at = excluded.accessed_at",
+            (key, body, size, now + self.ttl if self.ttl else 0, now),
+        )
+        count, total = db.execute("SELECT entries, bytes FROM totals").fetchone()
+        while count > self.max_entries or total > self.max_bytes:
+            oldest = db.execute(
+                "SELECT key, size FROM results ORDER BY accessed_at LIMIT 1"
+            ).fetchone()
+            if oldest is None:
+                break
+            db.execute("DELETE FROM results WHERE key = ?", (oldest[0],))
+            count -= 1
+            total -= oldest[1]
+            self._count("evictions")
+
+    def clear(self):
+        self._connect().execute("DELETE FROM results")
+
+    def invalidate(self, tools):
+        """Drop every cached result of the named tools."""
+        db = self._connect()
+        for tool in tools:
+            # Keys are "tool?params"; "@" sorts right after "?"
+            db.execute("DELETE FROM results WHERE key >= ? AND key < ?", (tool + "?", tool + "@"))
+
+    def info(self):
+        count, total = self._connect().execute("SELECT entries, bytes FROM totals").fetchone()
+        with self._lock:
+            stats = self.stats.as_dict()
+        return {
+            "backend": self.backend,
+            "entries": count,
+            "bytes": total,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "ttl": self.ttl,
+            **stats,
+        }
+
+
+def cache_from_env(environ=os.environ):
+    """Build the result cache described by the MCP_CACHE* variables, or None."""
+    backend = environ.get("MCP_CACHE", "memory").lower()
+    if backend == "off":
+        return None
+    options = {
+        "max_entries": int(environ.get("MCP_CACHE_MAX_ENTRIES", 10000)),
+        "max_bytes": int(environ.get("MCP_CACHE_MAX_BYTES", 64 * 1024 * 1024)),
+        "ttl": float(environ.get("MCP_CACHE_TTL", 300)),
+    }
+    if backend == "sqlite":
+        path = environ.get("MCP_CACHE_PATH", os.path.join(tempfile.gettempdir(), "fastapi-mcp-cache.sqlite3"))
+        return SQLiteCache(path, **options)
+    return ResultCache(**options)
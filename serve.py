@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+Production launcher for the FastAPI MCP Server.
+
+Runs several uvicorn worker processes without --reload:
+
+  python3 serve.py                       # one worker per CPU, pre-fork
+  python3 serve.py --workers 4 --reuse-port
+  python3 serve.py --loop uvloop --http httptools --drain-delay 5
+
+Two ways to spread connections over workers:
+  - pre-fork (default): the master binds one listening socket and every
+    worker accepts from it
+  - --reuse-port: every worker binds its own SO_REUSEPORT socket and the
+    kernel balances new connections between them (Linux/BSD)
+
+With MCP_PROFILING=1 the master also forwards SIGUSR2 to every worker, so
+GET /admin/profile on any worker samples all of them (see profiler.py).
+With MCP_HOT_RELOAD=1 it forwards SIGHUP, so `kill -HUP <master>` or POST
+/admin/reload on any worker reloads changed tool modules in all of them
+without a restart (see reloader.py).
+
+On SIGTERM/SIGINT the master asks every worker to stop. Each worker first
+reports not-ready on /readyz for --drain-delay seconds, then stops accepting
+and lets in-flight requests finish (up to --graceful-timeout) before exiting.
+Workers that crash are restarted.
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import os
+import secrets
+import signal
+import socket
+import sys
+import time
+
+import uvicorn
+
+from metrics import remove_snapshot
+from profiler import PROFILE_DIR, PROFILE_SIGNAL, PROFILING, remove_profile_dir
+
+# As in reloader.py, which the master does not import: it would create the
+# tool registry (and its cache connections) before the workers are forked
+HOT_RELOAD = os.environ.get("MCP_HOT_RELOAD", "0") == "1"
+RELOAD_SIGNAL = signal.SIGHUP
+METRICS_DIR = os.environ.get("MCP_METRICS_DIR")
+
+
+class DrainingServer(uvicorn.Server):
+    """uvicorn.Server that reports not-ready for a while before shutting down."""
+
+    def __init__(self, config, app, drain_delay):
+        super().__init__(config)
+        self.app = app
+        self.drain_delay = drain_delay
+
+    def handle_exit(self, sig, frame):
+        if self.app.state.draining or not self.drain_delay:
+            self.app.state.draining = True
+            super().handle_exit(sig, frame)
+            return
+        # Keep serving while load balancers notice /readyz returning 503
+        self.app.state.draining = True
+        asyncio.get_event_loop().call_later(self.drain_delay, super().handle_exit, sig, frame)
+
+
+def bind_socket(host, port, reuse_port=False, backlog=2048):
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    if reuse_port:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+def run_worker(args, sock=None):
+    """Run one uvicorn server in this process."""
+    # Forked workers inherit the master's handlers until uvicorn installs its own
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.default_int_handler)
+    from main import app
+
+    if sock is None:
+        sock = bind_socket(args.host, args.port, reuse_port=args.reuse_port, backlog=args.backlog)
+    config = uvicorn.Config(
+        app,
+        loop=args.loop,
+        http=args.http,
+        backlog=args.backlog,
+        timeout_keep_alive=args.keep_alive,
+        timeout_graceful_shutdown=args.graceful_timeout,
+        access_log=args.access_log,
+        log_level=args.log_level,
+    )
+    server = DrainingServer(config, app, args.drain_delay)
+    server.run(sockets=[sock])
+
+
+class Master:
+    """Pre-fork supervisor: starts workers, restarts crashed ones, drains on exit."""
+
+    def __init__(self, args):
+        self.args = args
+        self.ctx = multiprocessing.get_context("fork" if hasattr(os, "fork") else "spawn")
+        self.sock = None if args.reuse_port else bind_socket(args.host, args.port, backlog=args.backlog)
+        self.workers = []
+        self.stopping = False
+
+    def spawn(self):
+        worker = self.ctx.Process(target=run_worker, args=(self.args, self.sock), daemon=False)
+        worker.start()
+        return worker
+
+    def reap(self, worker):
+        """Forget an exited worker: its metrics snapshot must not outlive it."""
+        if METRICS_DIR is not None and worker.pid is not None:
+            remove_snapshot(METRICS_DIR, worker.pid)
+
+    def handle_signal(self, sig, frame):
+        self.stopping = True
+
+    def forward_signal(self, sig, frame):
+        for worker in self.workers:
+            if worker.pid is not None:
+                try:
+                    os.kill(worker.pid, sig)
+                except ProcessLookupError:
+                    pass
+
+    def run(self):
+        signal.signal(signal.SIGTERM, self.handle_signal)
+        signal.signal(signal.SIGINT, self.handle_signal)
+        if PROFILING:
+            # Workers find the master and the shared profile directory through these
+            os.environ["MCP_PROFILE_MASTER"] = str(os.getpid())
+            os.environ["MCP_PROFILE_DIR"] = PROFILE_DIR
+            signal.signal(PROFILE_SIGNAL, self.forward_signal)
+        # Every worker must verify MCP session ids signed by the others
+        os.environ.setdefault("MCP_SESSION_KEY", secrets.token_hex(32))
+        if HOT_RELOAD:
+            os.environ["MCP_RELOAD_MASTER"] = str(os.getpid())
+            signal.signal(RELOAD_SIGNAL, self.forward_signal)
+        print(f"Starting {self.args.workers} workers on http://{self.args.host}:{self.args.port} "
+              f"({'SO_REUSEPORT' if self.args.reuse_port else 'pre-fork'}, pid {os.getpid()})")
+        self.workers = [self.spawn() for _ in range(self.args.workers)]
+
+        while not self.stopping:
+            for i, worker in enumerate(self.workers):
+                if not worker.is_alive() and not self.stopping:
+                    print(f"Worker {worker.pid} exited with code {worker.exitcode}; restarting")
+                    self.reap(worker)
+                    self.workers[i] = self.spawn()
+            time.sleep(0.5)
+        self.shutdown()
+
+    def shutdown(self):
+        print("Shutting down: draining workers...")
+        for worker in self.workers:
+            if worker.is_alive():
+                os.kill(worker.pid, signal.SIGTERM)
+        deadline = time.monotonic() + self.args.drain_delay + (self.args.graceful_timeout or 30) + 5
+        for worker in self.workers:
+            worker.join(max(0, deadline - time.monotonic()))
+        for worker in self.workers:
+            if worker.is_alive():
+                print(f"Worker {worker.pid} did not stop in time; killing")
+                worker.kill()
+                worker.join()
+        for worker in self.workers:
+            self.reap(worker)
+        if self.sock is not None:
+            self.sock.close()
+        if PROFILING:
+            remove_profile_dir()
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default=os.environ.get("HOST", "127.0.0.1"))
+    parser.add_argument("--port", type=int, default=int(os.environ.get("PORT", 8000)))
+    parser.add_argument("--workers", type=int, default=int(os.environ.get("WEB_CONCURRENCY", os.cpu_count() or 1)),
+                        help="worker processes (default: CPU count)")
+    parser.add_argument("--loop", choices=["auto", "asyncio", "uvloop"], default="auto",
+                        help="event loop implementation (auto picks uvloop when installed)")
+    parser.add_argument("--http", choices=["auto", "h11", "httptools"], default="auto",
+                        help="HTTP parser (auto picks httptools when installed)")
+    parser.add_argument("--reuse-port", action="store_true",
+                        help="give each worker its own SO_REUSEPORT socket instead of sharing one")
+    parser.add_argument("--backlog", type=int, default=2048)
+    parser.add_argument("--keep-alive", type=int, default=5, help="keep-alive timeout in seconds")
+    parser.add_argument("--drain-delay", type=float, default=0.0,
+                        help="seconds to report not-ready before stopping on SIGTERM")
+    parser.add_argument("--graceful-timeout", type=int, default=30,
+                        help="seconds to wait for in-flight requests on shutdown")
+    parser.add_argument("--log-level", default="info")
+    parser.add_argument("--no-access-log", dest="access_log", action="store_false")
+    args = parser.parse_args(argv)
+    if args.reuse_port and not hasattr(socket, "SO_REUSEPORT"):
+        parser.error("SO_REUSEPORT is not available on this platform")
+    args.workers = max(1, args.workers)
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    if args.workers == 1 and not args.reuse_port:
+        run_worker(args)
+    else:
+        Master(args).run()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+"""
+Fixed-memory streaming summaries for the approximate text-analysis mode.
+
+  CountMinSketch  frequency estimates that never undercount
+  HyperLogLog     distinct-count estimate (about 0.8% error at precision 14)
+  TopK            heap of the heaviest keys seen so far, fed with estimates
+
+Updates take a whole batch of hashed keys at once (one chunk's distinct
+terms) and run as numpy array operations. Keys are hashed with hash_keys
+rather than hash(), which is salted per process, so summaries built in
+different processes can be merged.
+"""
+
+from hashlib import blake2b
+import heapq
+
+import numpy as np
+
+
+# Keys up to this many characters are hashed together as a numpy matrix
+SHORT_KEY = 32
+
+_FNV_OFFSET = np.uint64(0xCBF29CE484222325)
+_FNV_PRIME = np.uint64(0x100000001B3)
+
+
+def hash64(key):
+    return int.from_bytes(blake2b(key.encode("utf-8", "surrogatepass"), digest_size=8).digest(), "little")
+
+
+def _mix(h):
+    # splitmix64 finalizer, so every output bit depends on every input bit
+    h ^= h >> np.uint64(30)
+    h *= np.uint64(0xBF58476D1CE4E5B9)
+    h ^= h >> np.uint64(27)
+    h *= np.uint64(0x94D049BB133111EB)
+    h ^= h >> np.uint64(31)
+    return h
+
+
+def hash_keys(keys):
+    """uint64 hash of each key.
+
+    Short keys are laid out as a (keys x SHORT_KEY) matrix of code points and
+    hashed with FNV-1a one column at a time, so the Python work is per column
+    rather than per key; longer keys fall back to hash64.
+    """
+    keys = np.array(list(keys), dtype=object)
+    hashes = np.empty(len(keys), dtype=np.uint64)
+    lengths = np.fromiter(map(len, keys), dtype=np.intp, count=len(keys))
+    short = lengths <= SHORT_KEY
+    if short.any():
+        matrix = keys[short].astype(f"U{SHORT_KEY}")
+        codes = matrix.view(np.uint32).reshape(len(matrix), SHORT_KEY).astype(np.uint64)
+        h = np.full(len(matrix), _FNV_OFFSET, dtype=np.uint64)
+        for column in range(int(lengths[short].max())):
+            c = codes[:, column]
+            # Padding is NUL; leave those keys' hashes as they are
+            h = np.where(c != 0, (h ^ c) * _FNV_PRIME, h)
+        hashes[short] = _mix(h)
+    for i in np.flatnonzero(~short):
+        hashes[i] = hash64(keys[i])
+    return hashes
+
+
+class CountMinSketch:
+    """`depth` rows of `width` counters; estimate = min over rows."""
+
+    def __init__(self, width=1 << 16, depth=4):
+        self.width = width
+        self.depth = depth
+        self.table = np.zeros((depth, width), dtype=np.int64)
+        self._rows = np.arange(depth)[:, None]
+
+    def _columns(self, hashes):
+        # Kirsch-Mitzenmacher: row i uses h1 + i * h2 (uint64 arithmetic wraps)
+        h1 = hashes & np.uint64(0xFFFFFFFF)
+        h2 = (hashes >> np.uint64(32)) | np.uint64(1)
+        steps = np.arange(self.depth, dtype=np.uint64)[:, None]
+        return ((h1 + steps * h2) % np.uint64(self.width)).astype(np.intp)
+
+    def add(self, hashes, counts):
+        """Add `counts` for the keys with `hashes`; returns their new estimates."""
+        columns = self._columns(hashes)
+        np.add.at(self.table, (self._rows, columns), counts)
+        return self.table[self._rows, columns].min(axis=0)
+
+    def estimate(self, hashes):
+        return self.table[self._rows, self._columns(hashes)].min(axis=0)
+
+    def merge(self, other):
+        self.table += other.table
+
+
+class HyperLogLog:
+    def __init__(self, precision=14):
+        self.precision = precision
+        self.size = 1 << precision
+        self.registers = np.zeros(self.size, dtype=np.uint8)
+
+    def add(self, hashes):
+        index = (hashes >> np.uint64(64 - self.precision)).astype(np.intp)
+        # Position of the first 1 bit in the remaining 64 - precision bits;
+        # frexp's exponent is the bit length
+        rest = hashes << np.uint64(self.precision)
+        _, bit_length = np.frexp(rest.astype(np.float64))
+        rank = np.minimum(65 - bit_length, 65 - self.precision).astype(np.uint8)
+        np.maximum.at(self.registers, index, rank)
+
+    def count(self):
+        m = self.size
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / np.ldexp(1.0, -self.registers.astype(np.int32)).sum()
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if estimate <= 2.5 * m and zeros:
+            # Small-range correction: linear counting
+            estimate = m * np.log(m / zeros)
+        return int(round(estimate))
+
+    def merge(self, other):
+        np.maximum(self.registers, other.registers, out=self.registers)
+
+
+class TopK:
+    """The `capacity` keys with the largest reported counts.
+
+    A min-heap orders the candidates so the smallest can be evicted in
+    O(log capacity); entries made stale by a later update are skipped lazily.
+    """
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.counts = {}
+        self.heap = []
+
+    def threshold(self):
+        """A count that any new key must exceed to get in (0 while not full)."""
+        if len(self.counts) < self.capacity:
+            return 0
+        # Stale entries hold older, smaller counts, so this never overstates it
+        return self.heap[0][0]
+
+    def offer(self, key, count):
+        counts = self.counts
+        if key not in counts and len(counts) >= self.capacity:
+            heap = self.heap
+            while counts.get(heap[0][1]) != heap[0][0]:
+                heapq.heappop(heap)
+            if count <= heap[0][0]:
+                return
+            del counts[heapq.heappop(heap)[1]]
+        counts[key] = count
+        heapq.heappush(self.heap, (count, key))
+        if len(self.heap) > 4 * self.capacity:
+            self.heap = [(c, k) for k, c in counts.items()]
+            heapq.heapify(self.heap)
@@ -2,6 +2,13 @@
 
 # FastAPI MCP Server Startup Script
 # This script safely starts your MCP server
+#
+# Usage:
+#   ./start_server.sh           Development: single process with --reload
+#   ./start_server.sh --prod    Production: multi-worker launcher (serve.py)
+#                               extra arguments are passed to serve.py
+#                               with MCP_HOT_RELOAD=1, `kill -HUP <pid>` picks up
+#                               changed tools without a restart
 
 # Colors
 GREEN='\033[0;32m'
@@ -21,11 +28,26 @@ if [ ! -f "main.py" ]; then
     cd /home/khadijab/fastapi-mcp-demo || exit 1
 fi
 
+MODE="dev"
+if [ "$1" = "--prod" ]; then
+    MODE="prod"
+    shift
+fi
+
 echo -e "${YELLOW}[1] Checking for processes on port 8000...${NC}"
 if lsof -ti:8000 > /dev/null 2>&1; then
-    echo -e "${RED}⚠️  Port 8000 is in use. Killing old processes...${NC}"
-    kill -9 $(lsof -ti:8000) 2>/dev/null
-    sleep 1
+    echo -e "${RED}⚠️  Port 8000 is in use. Asking old processes to shut down...${NC}"
+    # Graceful stop first so in-flight requests can finish
+    kill -TERM $(lsof -ti:8000) 2>/dev/null
+    for i in $(seq 1 30); do
+        lsof -ti:8000 > /dev/null 2>&1 || break
+        sleep 1
+    done
+    if lsof -ti:8000 > /dev/null 2>&1; then
+        echo -e "${RED}⚠️  Still running after 30s, forcing...${NC}"
+        kill -9 $(lsof -ti:8000) 2>/dev/null
+        sleep 1
+    fi
     echo -e "${GREEN}✓ Port 8000 is now free!${NC}"
 else
     echo -e "${GREEN}✓ Port 8000 is free!${NC}"
@@ -54,5 +76,9 @@ echo -e "${BLUE}═════════════════════
 echo ""
 
 # Start the server
-uvicorn main:app --reload
+if [ "$MODE" = "prod" ]; then
+    exec python3 serve.py --host 0.0.0.0 --port 8000 "$@"
+else
+    uvicorn main:app --reload
+fi
 
@@ -0,0 +1,65 @@
+from admission import AdmissionControl, _parse_networks
+
+
+def _scope(peer, *headers):
+    return {"type": "http", "client": (peer, 50000),
+            "headers": [(name.encode(), value.encode()) for name, value in headers]}
+
+
+def test_client_headers_are_ignored_without_trusted_proxies():
+    control = AdmissionControl()
+    assert control.client_id(_scope("203.0.113.7", ("x-client-id", "me"))) == "203.0.113.7"
+    assert control.client_id(_scope("203.0.113.7", ("x-forwarded-for", "198.51.100.1"))) == "203.0.113.7"
+
+
+def test_rotating_client_ids_share_one_bucket():
+    control = AdmissionControl(client_rate=1.0, client_burst=2.0)
+    results = [control.check_rate(control.client_id(_scope("203.0.113.7", ("x-client-id", str(n)))), "/x", 0.0)
+               for n in range(5)]
+    assert results[:2] == [None, None]
+    assert all(r is not None and r[0] == "client_rate" for r in results[2:])
+
+
+def test_trusted_proxy_names_the_client():
+    control = AdmissionControl(trusted_proxies=_parse_networks("127.0.0.1, 10.0.0.0/8"))
+    assert control.client_id(_scope("127.0.0.1", ("x-client-id", "tenant-a"))) == "tenant-a"
+    # The nearest untrusted hop; the leftmost entry was written by the caller
+    forwarded = ("x-forwarded-for", "6.6.6.6, 198.51.100.1, 10.1.2.3")
+    assert control.client_id(_scope("10.0.0.5", forwarded)) == "198.51.100.1"
+    assert control.client_id(_scope("10.0.0.5")) == "10.0.0.5"
+    # Headers from a peer outside the trusted networks are still ignored
+    assert control.client_id(_scope("203.0.113.7", ("x-client-id", "tenant-a"))) == "203.0.113.7"
+
+
+def test_tool_limits_apply_to_every_transport(monkeypatch):
+    from fastapi.testclient import TestClient
+
+    import main
+    from admission import admission
+
+    monkeypatch.setattr(admission, "tool_limits", {"add": (1.0, 2.0)})
+    admission.bind(main.registry)
+    client = TestClient(main.app)
+    try:
+        rest = [client.get("/tools/add", params={"a": n, "b": 1}).status_code for n in range(3)]
+        assert rest == [200, 200, 429]
+
+        batch = client.post("/tools/batch", json={"calls": [{"tool": "add", "params": {"a": 1, "b": n}}
+                                                             for n in range(3)]}).json()["results"]
+        assert all(item.get("reason") == "tool_rate" for item in batch)
+
+        mcp = client.post("/mcp", json={"jsonrpc": "2.0", "id": 1, "method": "tools/call",
+                                        "params": {"name": "add", "arguments": {"a": 5, "b": 5}}}).json()
+        assert mcp["result"]["isError"] and mcp["result"]["structuredContent"]["reason"] == "tool_rate"
+
+        with client.websocket_connect("/ws") as ws:
+            ws.receive_json()
+            ws.send_json({"id": 1, "tool": "add", "params": {"a": 7, "b": 7}})
+            assert ws.receive_json()["reason"] == "tool_rate"
+
+        # Other tools are not limited
+        assert client.get("/tools/multiply", params={"a": 2, "b": 3}).status_code == 200
+    finally:
+        monkeypatch.undo()
+        admission.tools.buckets.clear()
+        admission.bind(main.registry)
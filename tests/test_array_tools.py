@@ -0,0 +1,43 @@
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+
+client = TestClient(main.app)
+
+
+def _add_array(a, b):
+    return client.post("/tools/add/array", json={"a": a, "b": b})
+
+
+@pytest.mark.parametrize("a, b", [
+    (2 ** 53 + 1, 0),
+    (2 ** 60 + 1, 2 ** 60 - 3),
+    (-(2 ** 62) + 1, -5),
+    (123, 456),
+])
+def test_add_array_matches_the_scalar_tool(a, b):
+    response = _add_array([a, 1], [b, 2])
+    assert response.status_code == 200
+    scalar = client.get("/tools/add", params={"a": a, "b": b}).json()["result"]
+    assert response.json()["result"] == [scalar, 3] == [a + b, 3]
+
+
+@pytest.mark.parametrize("a", [[2 ** 62], [-(2 ** 62)], [2 ** 63], [2 ** 70]])
+def test_add_array_rejects_integers_beyond_its_range(a):
+    response = _add_array(a, [0])
+    assert response.status_code == 422
+    assert "2**62" in response.json()["error"]
+
+
+def test_add_array_rejects_large_integers_parsed_as_floats():
+    response = _add_array([1.0, 2 ** 53 + 1], [0, 0])
+    assert response.status_code == 422
+    assert "2**53" in response.json()["error"]
+    assert _add_array([1.0, 2 ** 53 - 1], [0, 0]).json()["result"] == [1, 2 ** 53 - 1]
+
+
+def test_add_array_still_rejects_fractions_and_non_numbers():
+    assert _add_array([1.5], [1]).status_code == 422
+    assert _add_array(["x"], [1]).status_code == 422
+    assert _add_array([1, 2], [1]).status_code == 422
@@ -0,0 +1,150 @@
+import asyncio
+import threading
+
+import pytest
+
+from execution import BoundedPool, PoolFullError, SingleFlight
+
+
+class Boom(Exception):
+    pass
+
+
+async def _until(condition):
+    while not condition():
+        await asyncio.sleep(0)
+
+
+def test_every_waiter_gets_the_leaders_exception():
+    async def scenario():
+        flights = SingleFlight()
+        release = asyncio.Event()
+        starts = 0
+
+        async def failing():
+            nonlocal starts
+            starts += 1
+            await release.wait()
+            raise Boom("leader failed")
+
+        waiters = [asyncio.create_task(flights.run("k", failing)) for _ in range(5)]
+        await _until(lambda: flights.flights.get("k") is not None and flights.flights["k"].waiters == 5)
+        release.set()
+        results = await asyncio.gather(*waiters, return_exceptions=True)
+        assert starts == 1
+        assert all(isinstance(r, Boom) for r in results)
+        assert len({id(r) for r in results}) == 1
+        assert flights.flights == {}
+
+    asyncio.run(scenario())
+
+
+def test_cancelling_one_waiter_leaves_the_others_running():
+    async def scenario():
+        flights = SingleFlight()
+        release = asyncio.Event()
+        cancelled = False
+
+        async def work():
+            nonlocal cancelled
+            try:
+                await release.wait()
+            except asyncio.CancelledError:
+                cancelled = True
+                raise
+            return {"value": 42}
+
+        waiters = [asyncio.create_task(flights.run("k", work)) for _ in range(3)]
+        await _until(lambda: flights.flights.get("k") is not None and flights.flights["k"].waiters == 3)
+        waiters[0].cancel()
+        await asyncio.sleep(0)
+        release.set()
+        results = await asyncio.gather(*waiters, return_exceptions=True)
+        assert isinstance(results[0], asyncio.CancelledError)
+        assert results[1] == results[2] == {"value": 42}
+        assert not cancelled
+        assert flights.executions == 1 and flights.coalesced == 2
+
+    asyncio.run(scenario())
+
+
+def test_cancelling_every_waiter_cancels_the_call_and_the_next_starts_afresh():
+    async def scenario():
+        flights = SingleFlight()
+        release = asyncio.Event()
+        started = []
+        cancelled = []
+
+        async def work():
+            started.append(len(started))
+            try:
+                await release.wait()
+            except asyncio.CancelledError:
+                cancelled.append(True)
+                raise
+            return len(started)
+
+        waiters = [asyncio.create_task(flights.run("k", work)) for _ in range(3)]
+        await _until(lambda: flights.flights.get("k") is not None and flights.flights["k"].waiters == 3)
+        shared = flights.flights["k"].task
+        for waiter in waiters:
+            waiter.cancel()
+        await asyncio.gather(*waiters, return_exceptions=True)
+        await asyncio.sleep(0)
+        assert shared.cancelled()
+        assert cancelled == [True]
+        assert "k" not in flights.flights
+
+        release.set()
+        assert await flights.run("k", work) == 2
+        assert flights.executions == 2
+
+    asyncio.run(scenario())
+
+
+def test_pool_full_error_reaches_every_waiter():
+    async def scenario():
+        pool = BoundedPool("thread", workers=1, queue_depth=0)
+        flights = SingleFlight()
+        gate = threading.Event()
+        try:
+            # Fill the pool's only slot, so the coalesced call is rejected
+            busy = asyncio.ensure_future(pool.run(gate.wait))
+            await _until(lambda: pool.pending == 1)
+            waiters = [asyncio.create_task(flights.run("k", lambda: pool.run(sum, [1, 2]))) for _ in range(4)]
+            results = await asyncio.gather(*waiters, return_exceptions=True)
+            assert all(isinstance(r, PoolFullError) for r in results)
+            assert flights.executions == 1 and flights.coalesced == 3
+            assert pool.rejected == 1
+        finally:
+            gate.set()
+            await busy
+            pool.shutdown()
+
+        assert await flights.run("k", lambda: pool.run(sum, [1, 2])) == 3
+
+    asyncio.run(scenario())
+
+
+@pytest.mark.parametrize("outcome", ["result", "error"])
+def test_waiters_arriving_after_the_call_finished_start_a_new_one(outcome):
+    async def scenario():
+        flights = SingleFlight()
+        calls = 0
+
+        async def work():
+            nonlocal calls
+            calls += 1
+            if outcome == "error":
+                raise Boom(calls)
+            return calls
+
+        for expected in (1, 2):
+            if outcome == "error":
+                with pytest.raises(Boom):
+                    await flights.run("k", work)
+            else:
+                assert await flights.run("k", work) == expected
+        assert calls == 2 and flights.flights == {}
+
+    asyncio.run(scenario())
@@ -0,0 +1,37 @@
+from decimal import Decimal
+from fractions import Fraction
+
+import pytest
+
+from exact_math import DECIMAL_SQRT_DIGITS, exact_sqrt, format_number, kind, parse_number
+from registry import registry
+
+
+@pytest.mark.parametrize("number, root", [("0.01", "0.1"), ("2.25", "1.5"), ("1e-100", "0." + "0" * 49 + "1"), ("144", "12")])
+@pytest.mark.parametrize("digits", [DECIMAL_SQRT_DIGITS, DECIMAL_SQRT_DIGITS + 1, 60, 1000])
+def test_exact_root_format_does_not_depend_on_digits(number, root, digits):
+    result = registry.tools["sqrt-exact"].fn(number, digits)
+    assert result["exact"] is True
+    assert result["square_root"] == root
+    assert result["method"] == ("decimal" if digits <= DECIMAL_SQRT_DIGITS else "isqrt")
+
+
+@pytest.mark.parametrize("digits", [DECIMAL_SQRT_DIGITS, DECIMAL_SQRT_DIGITS + 1])
+def test_exact_root_keeps_the_input_kind(digits):
+    assert isinstance(exact_sqrt(Decimal("2.25"), digits)[0], Decimal)
+    assert exact_sqrt(144, digits)[0] == 12 and isinstance(exact_sqrt(144, digits)[0], int)
+    assert exact_sqrt(Fraction(9, 4), digits)[0] == Fraction(3, 2)
+
+
+@pytest.mark.parametrize("digits", [DECIMAL_SQRT_DIGITS, DECIMAL_SQRT_DIGITS + 1])
+def test_inexact_root_is_rounded_to_digits(digits):
+    root, exact, _ = exact_sqrt(2, digits)
+    assert not exact
+    assert len(format_number(root).replace(".", "")) == digits
+    assert format_number(root).startswith("1.41421356237309504880")
+
+
+def test_underscore_separated_integers_are_integers():
+    assert parse_number("1_000") == 1000
+    assert kind(parse_number("1_000")) == "integer"
+    assert kind(parse_number("1_000.5")) == "decimal"
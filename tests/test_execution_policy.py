@@ -0,0 +1,34 @@
+import asyncio
+
+import pytest
+
+import main  # noqa: F401  (registers every tool and fills registry.dispatch)
+from basic_tools import INLINE_TEXT
+from execution import BoundedPool
+from registry import registry
+
+
+@pytest.fixture
+def process_pool(monkeypatch):
+    """A private process pool in place of the shared one, shut down afterwards."""
+    pool = BoundedPool("process", workers=1, queue_depth=0)
+    monkeypatch.setitem(registry.pools, "process", pool)
+    yield pool
+    pool.shutdown()
+
+
+def _analyze(text):
+    return asyncio.run(registry.dispatch["analyze-text"](text=text))
+
+
+def test_short_texts_are_analyzed_inline(process_pool):
+    result = _analyze("The quick brown fox")
+    assert result["word_count"] == 4
+    assert process_pool.completed == 0 and process_pool.executor is None
+
+
+def test_long_texts_go_to_the_process_pool(process_pool):
+    text = "word " * (INLINE_TEXT // 5 + 1)
+    result = _analyze(text)
+    assert result["word_count"] == INLINE_TEXT // 5 + 1
+    assert process_pool.completed == 1
@@ -0,0 +1,37 @@
+import pytest
+
+from expressions import VECTOR_MIN_BINDINGS, compile_program, evaluate_many
+
+
+def _both_paths(expression, bindings):
+    """evaluate_many over all bindings at once (vectorized) and one at a time (scalar)."""
+    program = compile_program((("result", expression),))
+    assert len(bindings) >= VECTOR_MIN_BINDINGS
+    vectorized = evaluate_many(program, bindings)
+    results, errors = [], []
+    for index, binding in enumerate(bindings):
+        (result,), row_errors = evaluate_many(program, [binding])
+        results.append(result)
+        errors.extend({**error, "index": index} for error in row_errors)
+    return vectorized, (results, errors)
+
+
+@pytest.mark.parametrize("expression", [
+    "1 / (x / y)",
+    "x / y",
+    "1 / (1 / (y - 1))",
+    "0 * sqrt(x) + 1",
+    "multiply(x, 1e308) * 10 / 1e308",
+    "sqrt(x * x) + y",
+])
+def test_vectorized_and_scalar_paths_agree(expression):
+    bindings = [{"x": float(i - 3), "y": float(i % 3)} for i in range(2 * VECTOR_MIN_BINDINGS)]
+    vectorized, scalar = _both_paths(expression, bindings)
+    assert vectorized == scalar
+
+
+def test_division_by_zero_inside_the_expression_is_reported():
+    bindings = [{"x": 1.0, "y": 0.0}] * VECTOR_MIN_BINDINGS
+    results, errors = evaluate_many(compile_program((("result", "1 / (x / y)"),)), bindings)
+    assert results == [None] * VECTOR_MIN_BINDINGS
+    assert {error["error"] for error in errors} == {"Division by zero"}
@@ -0,0 +1,41 @@
+from fastapi.testclient import TestClient
+
+import main
+from mcp_server import SessionIds
+
+INITIALIZE = {"jsonrpc": "2.0", "id": 1, "method": "initialize", "params": {}}
+PING = {"jsonrpc": "2.0", "id": 2, "method": "ping"}
+
+
+def test_session_ids_verify_in_any_process_with_the_key():
+    worker_a, worker_b = SessionIds(b"deployment key"), SessionIds(b"deployment key")
+    session_id = worker_a.new()
+    assert worker_b.valid(session_id)
+    assert not SessionIds(b"another key").valid(session_id)
+    assert not worker_b.valid(session_id[:-1] + ("0" if session_id[-1] != "0" else "1"))
+    assert not worker_b.valid("not-a-session")
+
+
+def test_session_ids_expire():
+    sessions = SessionIds(b"key", ttl=60)
+    payload = f"{0:x}.{'ab' * 16}"
+    assert not sessions.valid(f"{payload}.{sessions._sign(payload)}")
+
+
+def test_ended_sessions_are_remembered_boundedly():
+    sessions = SessionIds(b"key", max_ended=2)
+    ids = [sessions.new() for _ in range(3)]
+    for session_id in ids:
+        sessions.end(session_id)
+    assert len(sessions.ended) == 2
+    assert not sessions.valid(ids[-1])
+
+
+def test_http_session_lifecycle():
+    client = TestClient(main.app)
+    response = client.post("/mcp", json=INITIALIZE)
+    session_id = response.headers["mcp-session-id"]
+    assert client.post("/mcp", json=PING, headers={"mcp-session-id": session_id}).status_code == 200
+    assert client.post("/mcp", json=PING, headers={"mcp-session-id": "forged"}).status_code == 404
+    assert client.delete("/mcp", headers={"mcp-session-id": session_id}).status_code == 204
+    assert client.post("/mcp", json=PING, headers={"mcp-session-id": session_id}).status_code == 404
@@ -0,0 +1,41 @@
+import os
+import subprocess
+import sys
+
+from metrics import Metrics, scrape, snapshot_path, write_snapshot
+
+
+def _worker_snapshot(directory, pid, requests):
+    metrics = Metrics()
+    metrics.route_stats(("/tools/add", "GET")).statuses[200] = requests
+    write_snapshot(directory, metrics)
+    os.replace(snapshot_path(directory, os.getpid()), snapshot_path(directory, pid))
+
+
+def _add_requests(text):
+    line = next(line for line in text.splitlines()
+                if line.startswith('mcp_requests_total{route="/tools/add"'))
+    return int(line.rsplit(" ", 1)[1])
+
+
+def test_scrape_skips_and_deletes_snapshots_of_exited_workers(tmp_path):
+    directory = str(tmp_path)
+    exited = subprocess.Popen([sys.executable, "-c", "pass"])
+    exited.wait()
+    running = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(30)"])
+    try:
+        _worker_snapshot(directory, exited.pid, 5)
+        _worker_snapshot(directory, running.pid, 7)
+        assert _add_requests(scrape(Metrics(), directory)) == 7
+        assert not os.path.exists(snapshot_path(directory, exited.pid))
+        assert os.path.exists(snapshot_path(directory, running.pid))
+    finally:
+        running.kill()
+        running.wait()
+
+
+def test_scrape_ignores_unrelated_files(tmp_path):
+    (tmp_path / "metrics-notes.json").write_text("{}")
+    own = Metrics()
+    own.route_stats(("/tools/add", "GET")).statuses[200] = 2
+    assert _add_requests(scrape(own, str(tmp_path))) == 2
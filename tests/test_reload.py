@@ -0,0 +1,99 @@
+import asyncio
+import shutil
+
+import httpx
+import pytest
+
+import main
+from reloader import tool_modules
+
+CONCURRENCY = 16
+PARAMS = 20
+
+
+@pytest.fixture
+def editable_basic_tools(tmp_path):
+    """Point the mounted basic_tools at a copy the test can edit; restore it afterwards."""
+    record = tool_modules.modules["basic_tools"]
+    original = record.path
+    copy = tmp_path / "basic_tools.py"
+    shutil.copy(original, copy)
+    record.path = str(copy)
+    yield copy
+    tool_modules.modules["basic_tools"].path = original
+    asyncio.run(tool_modules.reload(["basic_tools"], force=True))
+
+
+def _edit(path, version):
+    source = path.read_text()
+    start = source.index('"operation": "addition')
+    end = source.index(",", start) + 1
+    path.write_text(source[:start] + f'"operation": "addition v{version}",' + source[end:])
+
+
+async def _add(client, n, via):
+    params = {"a": n % PARAMS, "b": 1}
+    if via == "rest":
+        response = await client.get("/tools/add", params=params)
+        return response.status_code, response.json().get("operation")
+    if via == "batch":
+        response = await client.post("/tools/batch", json={"calls": [{"tool": "add", "params": params}]})
+        item = response.json()["results"][0] if response.status_code == 200 else {}
+        return response.status_code, item.get("result", {}).get("operation")
+    response = await client.post("/mcp", json={"jsonrpc": "2.0", "id": n, "method": "tools/call",
+                                               "params": {"name": "add", "arguments": params}})
+    result = response.json().get("result", {})
+    return response.status_code, None if result.get("isError", True) else result["structuredContent"]["operation"]
+
+
+async def _load(client, stop, seen, failures, calls):
+    n = 0
+    while not stop.is_set():
+        # In-process calls of a cached tool never suspend; a real client would wait on its socket
+        await asyncio.sleep(0)
+        n += 1
+        via = ("rest", "batch", "mcp")[n % 3]
+        try:
+            status, operation = await _add(client, n, via)
+        except Exception as e:  # a dropped request counts as a failure
+            failures.append((via, repr(e)))
+            continue
+        calls[0] += 1
+        if status != 200 or operation is None:
+            failures.append((via, status))
+        else:
+            seen.add(operation)
+
+
+def test_reload_under_load_drops_nothing_and_serves_the_new_version(editable_basic_tools):
+    async def scenario():
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            for version in (1, 2, 3):
+                stop = asyncio.Event()
+                seen, failures, calls = set(), [], [0]
+                workers = [asyncio.create_task(_load(client, stop, seen, failures, calls))
+                           for _ in range(CONCURRENCY)]
+                await asyncio.sleep(0.05)
+                _edit(editable_basic_tools, version)
+                before = calls[0]
+                # A units change also reloads basic_tools, which imports it
+                report = await tool_modules.reload(["units"] if version == 2 else None)
+                # The modules load on a thread while calls keep being served
+                assert calls[0] > before
+                await asyncio.sleep(0.05)
+                stop.set()
+                await asyncio.gather(*workers)
+
+                assert "basic_tools" in report["reloaded"]
+                assert failures == []
+                previous = "addition" if version == 1 else f"addition v{version - 1}"
+                assert seen <= {previous, f"addition v{version}"}
+                assert f"addition v{version}" in seen
+
+                # Every call after the swap, including ones cached before it, gets the new version
+                for n in range(3 * PARAMS):
+                    status, operation = await _add(client, n, ("rest", "batch", "mcp")[n % 3])
+                    assert (status, operation) == (200, f"addition v{version}")
+
+    asyncio.run(scenario())
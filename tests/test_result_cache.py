@@ -0,0 +1,80 @@
+import asyncio
+import sqlite3
+import threading
+
+from registry import ToolRegistry
+from result_cache import ResultCache, SQLiteCache
+
+
+def _scanned(path):
+    with sqlite3.connect(path) as db:
+        return db.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM results").fetchone()
+
+
+def _totals(cache):
+    info = cache.info()
+    return info["entries"], info["bytes"]
+
+
+def test_sqlite_totals_track_every_change(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    cache = SQLiteCache(path, max_entries=3, ttl=0)
+    for n in range(5):
+        cache.put(f"add?{n}", b"x" * (n + 1))
+        assert _totals(cache) == _scanned(path)
+    assert _totals(cache)[0] == 3 and cache.stats.evictions == 2
+
+    # Overwriting a key with a different size
+    cache.put("add?4", b"y" * 40)
+    assert _totals(cache) == _scanned(path)
+    assert cache.get("add?4") == b"y" * 40
+
+    cache.invalidate(["add"])
+    assert _totals(cache) == _scanned(path) == (0, 0)
+    cache.put("sqrt?1", b"1")
+    cache.clear()
+    assert _totals(cache) == (0, 0)
+
+
+def test_sqlite_expired_entries_leave_the_totals(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    cache = SQLiteCache(path, ttl=-1)
+    cache.put("add?1", b"3")
+    assert cache.get("add?1") is None
+    assert _totals(cache) == _scanned(path) == (0, 0)
+    assert cache.stats.expirations == 1
+
+
+def test_sqlite_totals_are_seeded_from_an_older_file(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    with sqlite3.connect(path) as db:
+        db.execute("CREATE TABLE results (key TEXT PRIMARY KEY, body BLOB NOT NULL, size INTEGER NOT NULL, "
+                   "expires_at REAL NOT NULL, accessed_at REAL NOT NULL)")
+        db.execute("INSERT INTO results VALUES ('add?1', x'33', 6, 0, 0)")
+    cache = SQLiteCache(path)
+    assert _totals(cache) == (1, 6)
+    # A second worker opening the same file does not count the rows again
+    assert _totals(SQLiteCache(path)) == (1, 6)
+
+
+def test_blocking_backends_are_called_off_the_event_loop(tmp_path):
+    threads = []
+
+    class Recording(SQLiteCache):
+        def get(self, key):
+            threads.append(threading.current_thread())
+            return super().get(key)
+
+        def put(self, key, body):
+            threads.append(threading.current_thread())
+            super().put(key, body)
+
+    async def scenario(cache):
+        registry = ToolRegistry(cache=cache)
+        await registry.cache_put("add?1", b"3")
+        return await registry.cache_get("add?1")
+
+    assert asyncio.run(scenario(Recording(str(tmp_path / "cache.sqlite3")))) == b"3"
+    assert len(threads) == 2 and threading.main_thread() not in threads
+
+    assert asyncio.run(scenario(ResultCache())) == b"3"
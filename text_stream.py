@@ -0,0 +1,462 @@
+"""
+Incremental text statistics for the analyze-text tool.
+
+TextStats consumes text chunk by chunk and keeps only counters, so documents
+of any size can be analyzed with constant memory. The counts are identical to
+len(text), len(text.split()) and the str.isupper/islower/isdigit tallies of
+the original analyze_text_tool. Stats of consecutive pieces of a text can be
+combined with merge(), which is how analyze_mapped's parallel slices of one
+file are put back together.
+
+ExtendedTextStats adds word/n-gram frequencies, top-k terms, unique-word,
+sentence and line counts and a Unicode character-class histogram, computed in
+the same pass. Its exact mode keeps one counter entry per distinct term; the
+approximate mode replaces those with fixed-size sketches (see sketches.py)
+so memory stays bounded however large the vocabulary grows.
+"""
+
+from collections import Counter
+import codecs
+import heapq
+import mmap
+import os
+import re
+import string
+import unicodedata
+
+import numpy as np
+
+from sketches import CountMinSketch, HyperLogLog, TopK, hash_keys
+
+# Default chunk size for reading request bodies and files
+CHUNK_SIZE = 64 * 1024
+# Chunk size for scanning memory-mapped files
+FILE_CHUNK_SIZE = 1024 * 1024
+# Pages of a mapped file already scanned are released this often, keeping RSS flat
+RELEASE_EVERY = 8 * 1024 * 1024
+
+# char -> (isupper, islower, isdigit), filled lazily; bounded by the Unicode range
+_CHAR_CLASS = {}
+
+
+def _classify(char):
+    flags = _CHAR_CLASS.get(char)
+    if flags is None:
+        flags = _CHAR_CLASS[char] = (char.isupper(), char.islower(), char.isdigit())
+    return flags
+
+
+class TextStats:
+    """Running character/word/case/digit counts over a stream of text chunks."""
+
+    def __init__(self):
+        self.character_count = 0
+        self.word_count = 0
+        self.uppercase_count = 0
+        self.lowercase_count = 0
+        self.digit_count = 0
+        # Whether the last character seen so far was part of a word
+        self._in_word = False
+        # Whether the text starts inside a word (None until the first chunk)
+        self._starts_in_word = None
+
+    def feed(self, chunk):
+        """Add one chunk of text to the running totals."""
+        if not chunk:
+            return
+        if self._starts_in_word is None:
+            self._starts_in_word = not chunk[0].isspace()
+        self.character_count += len(chunk)
+
+        # A word split across the chunk boundary is counted once
+        words = len(chunk.split())
+        if self._in_word and not chunk[0].isspace():
+            words -= 1
+        self.word_count += words
+        self._in_word = not chunk[-1].isspace()
+
+        self._count_chars(Counter(chunk))
+
+    def _count_chars(self, chars):
+        # Classify each distinct character once instead of every occurrence
+        for char, count in chars.items():
+            upper, lower, digit = _classify(char)
+            if upper:
+                self.uppercase_count += count
+            elif lower:
+                self.lowercase_count += count
+            if digit:
+                self.digit_count += count
+
+    def merge(self, other):
+        """Add the stats of the text that directly follows this one."""
+        if other._starts_in_word is None:
+            return
+        if self._starts_in_word is None:
+            self._starts_in_word = other._starts_in_word
+        self.character_count += other.character_count
+        self.word_count += other.word_count
+        if self._in_word and other._starts_in_word:
+            self.word_count -= 1
+        self.uppercase_count += other.uppercase_count
+        self.lowercase_count += other.lowercase_count
+        self.digit_count += other.digit_count
+        self._in_word = other._in_word
+
+    def result(self):
+        return {
+            "character_count": self.character_count,
+            "word_count": self.word_count,
+            "uppercase_count": self.uppercase_count,
+            "lowercase_count": self.lowercase_count,
+            "digit_count": self.digit_count,
+        }
+
+
+# Stripped from both ends of a token to get the word it counts as
+WORD_PUNCTUATION = string.punctuation + "\u2018\u2019\u201c\u201d\u00ab\u00bb\u2026\u2013\u2014"
+# A token ending in one of these, before any closing quotes/brackets, ends a sentence
+SENTENCE_END = ".!?\u2026"
+_CLOSERS = "\"')]}\u2019\u201d\u00bb"
+
+_EDGE_PUNCTUATION = re.compile(f"(?<!\\S)[{re.escape(WORD_PUNCTUATION)}]+|[{re.escape(WORD_PUNCTUATION)}]+(?!\\S)")
+_SENTENCE_ENDS = re.compile(f"[{re.escape(SENTENCE_END)}][{re.escape(_CLOSERS)}]*(?!\\S)")
+
+# char -> character class name, filled lazily like _CHAR_CLASS
+_CHAR_CATEGORY = {}
+_CATEGORY_NAMES = {"L": "letter", "N": "number", "P": "punctuation", "S": "symbol", "M": "mark"}
+CHARACTER_CLASSES = ("letter", "number", "whitespace", "punctuation", "symbol", "mark", "other")
+
+MAX_TOP_K = 1000
+MAX_NGRAM = 3
+
+
+def _rank(item):
+    # Most frequent first, ties alphabetical, so results do not depend on
+    # the order terms were first seen (chunking, slicing)
+    term, count = item
+    return -count, term
+
+
+def _category(char):
+    name = _CHAR_CATEGORY.get(char)
+    if name is None:
+        if char.isspace():
+            name = "whitespace"
+        else:
+            name = _CATEGORY_NAMES.get(unicodedata.category(char)[0], "other")
+        _CHAR_CATEGORY[char] = name
+    return name
+
+
+class ExtendedTextStats(TextStats):
+    """TextStats plus frequency, sentence, line and character-class statistics.
+
+    Tokens are the same whitespace-separated words TextStats counts. Each is
+    lowercased and stripped of surrounding punctuation to get the word used
+    for frequencies ("Hello," and "hello" are one word); tokens with no word
+    characters left count towards word_count only. Terms are runs of `ngram`
+    consecutive words. A token split across two chunks is held back until
+    the next chunk, so every statistic is independent of chunk boundaries.
+
+    With approximate=True, term counts come from a Count-Min sketch (never
+    below the true count), the top-k list from a heap of the heaviest
+    candidates and unique_word_count from a HyperLogLog, all fixed size.
+    """
+
+    def __init__(self, top_k=10, ngram=1, approximate=False):
+        super().__init__()
+        self.top_k = top_k
+        self.ngram = ngram
+        self.approximate = approximate
+        self.newline_count = 0
+        self.sentence_count = 0
+        self.character_classes = dict.fromkeys(CHARACTER_CLASSES, 0)
+        # Lowercased partial token at the end of the last chunk
+        self._carry = ""
+        # The first and last n-1 words, so n-grams continue across chunks
+        # and across merged slices
+        self._leading = []
+        self._previous = []
+        # Whether tokens have been seen since the last sentence end
+        self._open_sentence = False
+        self._last_char = ""
+        if approximate:
+            self.sketch = CountMinSketch()
+            self.unique = HyperLogLog()
+            self.heavy = TopK(max(4 * top_k, 64))
+        else:
+            self.terms = Counter()
+            # Only needed separately when terms are n-grams
+            self.words = self.terms if ngram == 1 else Counter()
+
+    def feed(self, chunk):
+        if not chunk:
+            return
+        super().feed(chunk)
+        self.newline_count += chunk.count("\n")
+        self._last_char = chunk[-1]
+
+        # Hold back a trailing partial token; the carry never holds whitespace,
+        # so only the new chunk needs scanning for the cut
+        text = self._carry + chunk.lower()
+        cut = len(text)
+        stop = len(self._carry)
+        while cut > stop and not text[cut - 1].isspace():
+            cut -= 1
+        if cut == stop:
+            self._carry = text
+            return
+        self._carry = text[cut:]
+        self._count_text(text[:cut])
+
+    def _count_chars(self, chars):
+        super()._count_chars(chars)
+        classes = self.character_classes
+        for char, count in chars.items():
+            classes[_category(char)] += count
+
+    def _count_text(self, text):
+        """Count lowercased text made of whole tokens."""
+        # Regex passes and Counter.update over iterables run in C; no Python
+        # code runs per token in exact mode
+        self.sentence_count += len(_SENTENCE_ENDS.findall(text))
+        tail = text.rstrip()
+        if tail:
+            # Tokens after the last sentence end start one more, unterminated, sentence
+            self._open_sentence = not tail.rstrip(_CLOSERS).endswith(tuple(SENTENCE_END))
+        words = _EDGE_PUNCTUATION.sub("", text).split()
+        if not words:
+            return
+        n = self.ngram
+        if n == 1:
+            terms = words
+        else:
+            if len(self._leading) < n - 1:
+                self._leading += words[:n - 1 - len(self._leading)]
+            sequence = self._previous + words
+            self._previous = sequence[-(n - 1):]
+            terms = map(" ".join, zip(*(sequence[i:] for i in range(n))))
+        self._add(terms, words)
+
+    def _add(self, terms, words):
+        if not self.approximate:
+            self.terms.update(terms)
+            if self.ngram > 1:
+                self.words.update(words)
+            return
+        n = self.ngram
+        counts = Counter(terms)
+        keys = list(counts)
+        hashes = hash_keys(keys)
+        estimates = self.sketch.add(hashes, np.fromiter(counts.values(), np.int64, len(keys)))
+        # Only terms already above the current cut-off can enter the top-k
+        heavy = self.heavy
+        for i in np.flatnonzero(estimates > heavy.threshold()):
+            heavy.offer(keys[i], int(estimates[i]))
+        if n == 1:
+            self.unique.add(hashes)
+        elif words:
+            self.unique.add(hash_keys(set(words)))
+
+    def _flush(self):
+        if self._carry:
+            carry, self._carry = self._carry, ""
+            self._count_text(carry)
+
+    def merge(self, other):
+        """Add the stats of the text that directly follows this one.
+
+        `other` must start at whitespace (file_slices cuts there), so no
+        token is split between the two.
+        """
+        if other._starts_in_word is None:
+            return
+        if self._in_word and other._starts_in_word:
+            raise ValueError("Merged text must start at whitespace")
+        self._flush()
+        other._flush()
+        super().merge(other)
+        for name, count in other.character_classes.items():
+            self.character_classes[name] += count
+        self.newline_count += other.newline_count
+        self.sentence_count += other.sentence_count
+        if other.word_count:
+            self._open_sentence = other._open_sentence
+        self._last_char = other._last_char
+
+        n = self.ngram
+        if self.approximate:
+            self.sketch.merge(other.sketch)
+            self.unique.merge(other.unique)
+            # Re-rank both candidate lists against the merged counts
+            candidates = list(self.heavy.counts.keys() | other.heavy.counts.keys())
+            self.heavy = TopK(self.heavy.capacity)
+            if candidates:
+                for term, count in zip(candidates, self.sketch.estimate(hash_keys(candidates)).tolist()):
+                    self.heavy.offer(term, count)
+        else:
+            self.terms.update(other.terms)
+            if n > 1:
+                self.words.update(other.words)
+        if n > 1:
+            # The n-grams that span the boundary
+            sequence = self._previous + other._leading
+            if len(self._leading) < n - 1:
+                self._leading = (self._leading + other._leading)[:n - 1]
+            if len(other._leading) < n - 1:
+                self._previous = sequence[-(n - 1):]
+            else:
+                self._previous = other._previous
+            spanning = list(map(" ".join, zip(*(sequence[i:] for i in range(n)))))
+            if spanning:
+                self._add(spanning, [])
+
+    def result(self):
+        self._flush()
+        if self.approximate:
+            top = heapq.nsmallest(self.top_k, self.heavy.counts.items(), key=_rank)
+            unique = self.unique.count()
+        else:
+            top = heapq.nsmallest(self.top_k, self.terms.items(), key=_rank)
+            unique = len(self.words)
+        lines = self.newline_count + (1 if self._last_char and self._last_char != "\n" else 0)
+        return {
+            **super().result(),
+            "line_count": lines,
+            "sentence_count": self.sentence_count + (1 if self._open_sentence else 0),
+            "unique_word_count": unique,
+            "top_terms": [{"term": term, "count": count} for term, count in top],
+            "character_classes": dict(self.character_classes),
+            "ngram": self.ngram,
+            "approximate": self.approximate,
+        }
+
+
+def make_stats(options=None):
+    """TextStats, or ExtendedTextStats(**options) for extended analysis."""
+    return TextStats() if options is None else ExtendedTextStats(**options)
+
+
+def analyze_text(text):
+    """Analyze a complete string in one pass."""
+    stats = TextStats()
+    stats.feed(text)
+    return stats.result()
+
+
+def check_options(top_k, ngram):
+    """Return an error message for out-of-range extended options, else None."""
+    if not 1 <= top_k <= MAX_TOP_K:
+        return f"top_k must be between 1 and {MAX_TOP_K}"
+    if not 1 <= ngram <= MAX_NGRAM:
+        return f"ngram must be between 1 and {MAX_NGRAM}"
+    return None
+
+
+_TRUE = ("1", "true", "yes", "on")
+
+
+def options_from_query(query):
+    """Extended-analysis options from ?extended=true&top_k=&ngram=&approximate=.
+
+    Returns (options, error): options is None for the basic analysis.
+    """
+    if query.get("extended", "").lower() not in _TRUE:
+        return None, None
+    try:
+        top_k = int(query.get("top_k", 10))
+        ngram = int(query.get("ngram", 1))
+    except ValueError:
+        return None, "top_k and ngram must be integers"
+    error = check_options(top_k, ngram)
+    if error:
+        return None, error
+    return {"top_k": top_k, "ngram": ngram, "approximate": query.get("approximate", "").lower() in _TRUE}, None
+
+
+def analyze_text_extended(text, top_k=10, ngram=1, approximate=False):
+    """Extended analysis of a complete string, fed in CHUNK_SIZE slices."""
+    stats = ExtendedTextStats(top_k, ngram, approximate)
+    for start in range(0, len(text), CHUNK_SIZE):
+        stats.feed(text[start:start + CHUNK_SIZE])
+    return stats.result()
+
+
+async def analyze_byte_stream(chunks, encoding="utf-8", stats=None):
+    """Analyze an async iterator of encoded byte chunks.
+
+    Multi-byte characters split across chunks are reassembled by an
+    incremental decoder. Raises UnicodeDecodeError on invalid input.
+    `stats` defaults to a fresh TextStats; pass an ExtendedTextStats for
+    the extended result.
+    """
+    decoder = codecs.getincrementaldecoder(encoding)()
+    if stats is None:
+        stats = TextStats()
+    async for chunk in chunks:
+        stats.feed(decoder.decode(chunk))
+    stats.feed(decoder.decode(b"", final=True))
+    return stats.result()
+
+
+def analyze_bytes(data, options=None):
+    """Stats of a UTF-8 byte string. Raises UnicodeDecodeError on invalid input."""
+    stats = make_stats(options)
+    text = data.decode("utf-8")
+    for start in range(0, len(text), FILE_CHUNK_SIZE):
+        stats.feed(text[start:start + FILE_CHUNK_SIZE])
+    return stats
+
+
+_ASCII_SPACE = re.compile(rb"[ \t\n\r\f\v]")
+
+
+def file_slices(path, parts):
+    """Split a file into up to `parts` (start, end) byte ranges of similar size.
+
+    Every range after the first starts at an ASCII whitespace byte, which in
+    UTF-8 is always a whole character between two tokens, so slices can be
+    decoded and tokenized independently and merged in order.
+    """
+    size = os.path.getsize(path)
+    if parts <= 1 or size == 0:
+        return [(0, size)]
+    boundaries = [0]
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        for i in range(1, parts):
+            match = _ASCII_SPACE.search(mapped, max(size * i // parts, boundaries[-1] + 1))
+            if match is None:
+                break
+            boundaries.append(match.start())
+    boundaries.append(size)
+    return list(zip(boundaries, boundaries[1:]))
+
+
+def analyze_mapped(path, start=0, end=None, options=None):
+    """Stats of bytes [start, end) of a UTF-8 file, scanned through a memory map.
+
+    Only FILE_CHUNK_SIZE of decoded text is alive at a time and scanned pages
+    are released every RELEASE_EVERY bytes, so memory use does not grow with
+    the file. Returns the stats object, for result() or merge().
+    """
+    stats = make_stats(options)
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        end = size if end is None else min(end, size)
+        if start >= end:
+            return stats
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            release = hasattr(mmap, "MADV_DONTNEED")
+            if release:
+                mapped.madvise(mmap.MADV_SEQUENTIAL)
+            released = start - start % mmap.PAGESIZE
+            for position in range(start, end, FILE_CHUNK_SIZE):
+                stats.feed(decoder.decode(mapped[position:min(position + FILE_CHUNK_SIZE, end)]))
+                if release and position - released >= RELEASE_EVERY:
+                    upto = position - position % mmap.PAGESIZE
+                    mapped.madvise(mmap.MADV_DONTNEED, released, upto - released)
+                    released = upto
+    stats.feed(decoder.decode(b"", final=True))
+    return stats
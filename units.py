@@ -0,0 +1,191 @@
+"""
+Table-driven unit conversion.
+
+Every unit is an affine map to its dimension's base unit,
+base = value * scale + offset, with exact (Fraction) scales and offsets.
+At import the conversion between every pair of units of a dimension is
+composed once, exactly, into a lookup table:
+
+  result = value * numerator / denominator + offset
+
+so converting is a table lookup and three float operations, the same for
+a scalar or a NumPy column. Keeping numerator and denominator apart means
+a conversion like Celsius -> Fahrenheit is computed as value * 9 / 5 + 32,
+exactly what temp-convert always computed, and metric prefixes divide by
+1000 rather than multiply by an inexact 0.001.
+
+Units are looked up by symbol ("km", "F") or by name, case-insensitively
+("kilometres", "Fahrenheit", "degF").
+"""
+
+from fractions import Fraction
+
+from fastapi import APIRouter
+
+from registry import tool
+from response_models import ConvertResult, UnitsResult
+
+router = APIRouter()
+
+# dimension -> [(symbol, names, scale, offset)], the base unit first with scale 1
+DIMENSIONS = {
+    "temperature": [
+        ("K", ("kelvin", "kelvins"), 1, 0),
+        ("C", ("celsius", "degC", "°C"), 1, Fraction("273.15")),
+        ("F", ("fahrenheit", "degF", "°F"), Fraction(5, 9), Fraction("459.67") * Fraction(5, 9)),
+        ("R", ("rankine", "degR", "°R"), Fraction(5, 9), 0),
+    ],
+    "length": [
+        ("m", ("metre", "metres", "meter", "meters"), 1, 0),
+        ("km", ("kilometre", "kilometres", "kilometer", "kilometers"), 1000, 0),
+        ("cm", ("centimetre", "centimetres", "centimeter", "centimeters"), Fraction(1, 100), 0),
+        ("mm", ("millimetre", "millimetres", "millimeter", "millimeters"), Fraction(1, 1000), 0),
+        ("um", ("micrometre", "micrometres", "micrometer", "micrometers", "µm"), Fraction(1, 10**6), 0),
+        ("nm", ("nanometre", "nanometres", "nanometer", "nanometers"), Fraction(1, 10**9), 0),
+        ("in", ("inch", "inches"), Fraction("0.0254"), 0),
+        ("ft", ("foot", "feet"), Fraction("0.3048"), 0),
+        ("yd", ("yard", "yards"), Fraction("0.9144"), 0),
+        ("mi", ("mile", "miles"), Fraction("1609.344"), 0),
+        ("nmi", ("nautical mile", "nautical miles"), 1852, 0),
+    ],
+    "mass": [
+        ("kg", ("kilogram", "kilograms"), 1, 0),
+        ("g", ("gram", "grams"), Fraction(1, 1000), 0),
+        ("mg", ("milligram", "milligrams"), Fraction(1, 10**6), 0),
+        ("t", ("tonne", "tonnes"), 1000, 0),
+        ("lb", ("pound", "pounds", "lbs"), Fraction("0.45359237"), 0),
+        ("oz", ("ounce", "ounces"), Fraction("0.45359237") / 16, 0),
+        ("st", ("stone", "stones"), Fraction("0.45359237") * 14, 0),
+    ],
+    "time": [
+        ("s", ("second", "seconds", "sec"), 1, 0),
+        ("ns", ("nanosecond", "nanoseconds"), Fraction(1, 10**9), 0),
+        ("us", ("microsecond", "microseconds", "µs"), Fraction(1, 10**6), 0),
+        ("ms", ("millisecond", "milliseconds"), Fraction(1, 1000), 0),
+        ("min", ("minute", "minutes"), 60, 0),
+        ("h", ("hour", "hours", "hr"), 3600, 0),
+        ("d", ("day", "days"), 86400, 0),
+        ("wk", ("week", "weeks"), 7 * 86400, 0),
+        # Julian year, as used for light-years
+        ("yr", ("year", "years"), Fraction("365.25") * 86400, 0),
+    ],
+    "data": [
+        ("B", ("byte", "bytes"), 1, 0),
+        ("bit", ("bit", "bits"), Fraction(1, 8), 0),
+        ("kbit", ("kilobit", "kilobits"), 1000 // 8, 0),
+        ("Mbit", ("megabit", "megabits"), 10**6 // 8, 0),
+        ("Gbit", ("gigabit", "gigabits"), 10**9 // 8, 0),
+        ("KB", ("kilobyte", "kilobytes"), 10**3, 0),
+        ("MB", ("megabyte", "megabytes"), 10**6, 0),
+        ("GB", ("gigabyte", "gigabytes"), 10**9, 0),
+        ("TB", ("terabyte", "terabytes"), 10**12, 0),
+        ("PB", ("petabyte", "petabytes"), 10**15, 0),
+        ("KiB", ("kibibyte", "kibibytes"), 2**10, 0),
+        ("MiB", ("mebibyte", "mebibytes"), 2**20, 0),
+        ("GiB", ("gibibyte", "gibibytes"), 2**30, 0),
+        ("TiB", ("tebibyte", "tebibytes"), 2**40, 0),
+        ("PiB", ("pebibyte", "pebibytes"), 2**50, 0),
+    ],
+}
+
+# Integers beyond this are not exact as floats; a factor that needs them is
+# stored as one rounded quotient instead
+_EXACT_FLOAT_INT = 2 ** 53
+
+
+class UnitError(ValueError):
+    """Raised for an unknown unit or a conversion between dimensions."""
+
+
+def _build():
+    """(unit name -> symbol, symbol -> dimension, from -> to -> (numerator, denominator, offset))."""
+    names = {}
+    dimensions = {}
+    table = {}
+    for dimension, units in DIMENSIONS.items():
+        for symbol, aliases, _, _ in units:
+            dimensions[symbol] = dimension
+            for name in (symbol, *aliases):
+                key = name.lower()
+                if names.setdefault(key, symbol) != symbol:
+                    raise ValueError(f"Unit name '{name}' is used by both {names[key]} and {symbol}")
+            names[symbol] = symbol
+        for source, _, source_scale, source_offset in units:
+            targets = table[source] = {}
+            for target, _, target_scale, target_offset in units:
+                # value -> base -> target, composed exactly
+                factor = Fraction(source_scale) / Fraction(target_scale)
+                offset = (Fraction(source_offset) - Fraction(target_offset)) / Fraction(target_scale)
+                if factor.numerator < _EXACT_FLOAT_INT and factor.denominator < _EXACT_FLOAT_INT:
+                    numerator, denominator = float(factor.numerator), float(factor.denominator)
+                else:
+                    numerator, denominator = float(factor), 1.0
+                targets[target] = numerator, denominator, float(offset)
+    return names, dimensions, table
+
+
+UNIT_NAMES, UNIT_DIMENSIONS, CONVERSIONS = _build()
+
+
+def unit_symbol(name):
+    symbol = UNIT_NAMES.get(name) or UNIT_NAMES.get(name.strip().lower())
+    if symbol is None:
+        raise UnitError(f"Unknown unit '{name}'; GET /tools/convert/units lists them")
+    return symbol
+
+
+def conversion(from_unit, to_unit):
+    """(numerator, denominator, offset) converting `from_unit` values to `to_unit`."""
+    # Symbols index the table directly; other names are resolved first
+    targets = CONVERSIONS.get(from_unit) or CONVERSIONS[unit_symbol(from_unit)]
+    factors = targets.get(to_unit) or targets.get(unit_symbol(to_unit))
+    if factors is None:
+        source, target = unit_symbol(from_unit), unit_symbol(to_unit)
+        raise UnitError(f"Cannot convert {UNIT_DIMENSIONS[source]} ({source}) "
+                        f"to {UNIT_DIMENSIONS[target]} ({target})")
+    return factors
+
+
+def apply_conversion(factors, value):
+    """Convert a float or a NumPy column with factors from conversion()."""
+    numerator, denominator, offset = factors
+    return value * numerator / denominator + offset
+
+
+# Used by temp-convert and temp-convert-array
+CELSIUS_TO_FAHRENHEIT = conversion("C", "F")
+CELSIUS_TO_KELVIN = conversion("C", "K")
+
+
+# Tool: Unit Conversion
+@router.get("/tools/convert")
+@tool("convert", "Converts a value between units of temperature, length, mass, time or data size",
+      params={"value": "Value to convert", "from_unit": "Unit of the value, e.g. 'km', 'F', 'MiB'",
+              "to_unit": "Unit to convert to"}, response=ConvertResult)
+def convert_tool(value: float, from_unit: str, to_unit: str):
+    """
+    MCP Tool: Converts a value from one unit to another.
+    """
+    try:
+        source, target = unit_symbol(from_unit), unit_symbol(to_unit)
+        factors = conversion(source, target)
+    except UnitError as e:
+        return {"error": str(e)}
+    return {
+        "value": value,
+        "from_unit": source,
+        "to_unit": target,
+        "dimension": UNIT_DIMENSIONS[source],
+        "result": apply_conversion(factors, value),
+    }
+
+
+# Tool: Unit List
+@router.get("/tools/convert/units")
+@tool("convert-units", "Lists the units the convert tools accept, by dimension", response=UnitsResult)
+def convert_units_tool():
+    """
+    MCP Tool: Lists the supported units and their names.
+    """
+    return {"dimensions": {dimension: {symbol: aliases[0] for symbol, aliases, _, _ in units}
+                           for dimension, units in DIMENSIONS.items()}}
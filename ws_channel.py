@@ -0,0 +1,219 @@
+"""
+WebSocket channel carrying many concurrent tool calls over one connection.
+
+GET /ws upgrades to a WebSocket of JSON messages. A client sends
+
+  {"id": 1, "tool": "add", "params": {"a": 1, "b": 2}}
+
+and gets back, as soon as that call finishes (not necessarily in the order
+the calls were sent), a record shaped like a batch result:
+
+  {"id": 1, "result": {...}}    or    {"id": 1, "error": "...", ...}
+
+`id` is any JSON value the client picks to match replies to calls. Calls go
+through the same validation, result cache, execution policies, admission
+control and call log (transport "ws") as the REST routes.
+
+Flow control: at most MCP_WS_MAX_IN_FLIGHT calls of a connection run at
+once. With the window full the server stops reading from the socket until a
+reply has been sent, so a client that floods calls, or stops reading its
+replies, is held back by TCP backpressure instead of growing server memory.
+The first message from the server announces the limits:
+
+  {"type": "hello", "max_in_flight": 32, "heartbeat": 20, "idle_timeout": 60}
+
+Heartbeat: after `heartbeat` seconds without sending anything the server
+sends {"type": "ping"}, which clients answer with {"type": "pong"} (clients
+may send pings too). A connection with no calls running that has sent
+nothing for `idle_timeout` seconds is closed with code 4408.
+
+Environment variables (0 disables the heartbeat or the idle timeout):
+  MCP_WS_MAX_IN_FLIGHT  calls running at once per connection, default 32
+  MCP_WS_HEARTBEAT      seconds of silence before the server pings, default 20
+  MCP_WS_IDLE_TIMEOUT   seconds without a client message before closing, default 60
+"""
+
+import asyncio
+import json
+import math
+import os
+import sys
+import time
+import traceback
+
+from fastapi import APIRouter, WebSocket
+
+from admission import admission, rejection
+from calllog import call_log
+from registry import logged_outcome, registry
+
+router = APIRouter()
+
+MAX_IN_FLIGHT = max(1, int(os.environ.get("MCP_WS_MAX_IN_FLIGHT", 32)))
+HEARTBEAT = float(os.environ.get("MCP_WS_HEARTBEAT", 20))
+IDLE_TIMEOUT = float(os.environ.get("MCP_WS_IDLE_TIMEOUT", 60))
+# Application close codes are 4000-4999; 4408 mirrors HTTP 408 Request Timeout
+IDLE_CLOSE_CODE = 4408
+
+
+class ChannelStats:
+    """Connection and message counters for /ws/stats and /metrics."""
+
+    def __init__(self):
+        self.connections = 0
+        self.opened = 0
+        self.calls = 0
+        self.in_flight = 0
+        self.invalid = 0
+        self.idle_closed = 0
+
+    def info(self):
+        return {
+            "connections": self.connections,
+            "opened": self.opened,
+            "calls": self.calls,
+            "in_flight": self.in_flight,
+            "invalid": self.invalid,
+            "idle_closed": self.idle_closed,
+            "limits": {"max_in_flight": MAX_IN_FLIGHT, "heartbeat": HEARTBEAT, "idle_timeout": IDLE_TIMEOUT},
+        }
+
+
+channel_stats = ChannelStats()
+
+
+async def run_call(client, name, params):
+    """The reply record (without its id) for one call, admitted like a REST request
+    (the per-tool limit is applied by logged_outcome)."""
+    fn = registry.dispatch.get(name) if isinstance(name, str) else None
+    if fn is None:
+        return {"error": f"Unknown tool '{name}'"}
+    if not isinstance(params, dict):
+        return {"error": "'params' must be an object"}
+    rejected = admission.check_client(client, time.monotonic())
+    holds_slot = False
+    if rejected is None and admission.max_in_flight:
+        reason = await admission.acquire()
+        if reason is not None:
+            rejected = reason, admission.queue_timeout
+        holds_slot = reason is None
+    if rejected is not None:
+        reason, retry_after = rejected
+        status, error = rejection(reason)
+        if call_log is not None:
+            call_log.record("ws", name, params, status, 0.0)
+        return {**error, "retry_after": max(1, math.ceil(retry_after))}
+    admission.admitted += 1
+    try:
+        return await logged_outcome("ws", name, fn, params)
+    finally:
+        if holds_slot:
+            admission.release()
+
+
+class Channel:
+    """One /ws connection: a reader, a task per call in flight, and a heartbeat."""
+
+    def __init__(self, websocket):
+        self.websocket = websocket
+        self.client = admission.client_id(websocket.scope)
+        self.window = asyncio.Semaphore(MAX_IN_FLIGHT)
+        self.send_lock = asyncio.Lock()
+        self.tasks = set()
+        self.last_received = self.last_sent = time.monotonic()
+
+    async def send(self, message):
+        text = json.dumps(message)
+        async with self.send_lock:
+            await self.websocket.send_text(text)
+        self.last_sent = time.monotonic()
+
+    async def run(self):
+        channel_stats.connections += 1
+        channel_stats.opened += 1
+        heartbeat = asyncio.create_task(self.heartbeat())
+        try:
+            await self.send({"type": "hello", "max_in_flight": MAX_IN_FLIGHT,
+                             "heartbeat": HEARTBEAT, "idle_timeout": IDLE_TIMEOUT})
+            while True:
+                # A full window stops the reading, which pushes back on the client
+                await self.window.acquire()
+                message = await self.websocket.receive()
+                if message["type"] == "websocket.disconnect":
+                    break
+                self.last_received = time.monotonic()
+                await self.dispatch(message.get("text") or message.get("bytes"))
+        finally:
+            heartbeat.cancel()
+            for task in list(self.tasks):
+                task.cancel()
+            channel_stats.connections -= 1
+
+    async def dispatch(self, data):
+        """Start a call, or answer a control or malformed message; holds one window slot."""
+        try:
+            message = json.loads(data)
+        except (TypeError, ValueError):
+            message = None
+        if isinstance(message, dict) and "tool" in message:
+            task = asyncio.create_task(self.call(message.get("id"), message["tool"], message.get("params") or {}))
+            self.tasks.add(task)
+            task.add_done_callback(self.tasks.discard)
+            return
+        try:
+            kind = message.get("type") if isinstance(message, dict) else None
+            if kind == "ping":
+                await self.send({"type": "pong"})
+            elif kind != "pong":
+                channel_stats.invalid += 1
+                await self.send({"id": message.get("id") if isinstance(message, dict) else None,
+                                 "error": "Expected {\"id\", \"tool\", \"params\"} or a ping/pong message"})
+        finally:
+            self.window.release()
+
+    async def call(self, msg_id, name, params):
+        channel_stats.calls += 1
+        channel_stats.in_flight += 1
+        try:
+            reply = await run_call(self.client, name, params)
+            await self.send({"id": msg_id, **reply})
+        except (RuntimeError, OSError):
+            # The socket closed before the reply could be sent
+            pass
+        except Exception:
+            # A reply for every id, even when the call itself broke
+            traceback.print_exc(file=sys.stderr)
+            try:
+                await self.send({"id": msg_id, "error": "Internal error"})
+            except (RuntimeError, OSError):
+                pass
+        finally:
+            channel_stats.in_flight -= 1
+            self.window.release()
+
+    async def heartbeat(self):
+        """Ping a quiet connection and close an idle one."""
+        while True:
+            now = time.monotonic()
+            deadlines = []
+            if HEARTBEAT:
+                deadlines.append(self.last_sent + HEARTBEAT)
+            if IDLE_TIMEOUT:
+                deadlines.append(self.last_received + IDLE_TIMEOUT)
+            if not deadlines:
+                return
+            await asyncio.sleep(max(0.05, min(deadlines) - now))
+            now = time.monotonic()
+            if IDLE_TIMEOUT and not self.tasks and now - self.last_received >= IDLE_TIMEOUT:
+                channel_stats.idle_closed += 1
+                await self.websocket.close(code=IDLE_CLOSE_CODE, reason="idle timeout")
+                return
+            if HEARTBEAT and now - self.last_sent >= HEARTBEAT:
+                await self.send({"type": "ping"})
+
+
+@router.websocket("/ws")
+async def tool_channel(websocket: WebSocket):
+    """WebSocket carrying concurrent tool calls, replies matched by id."""
+    await websocket.accept()
+    await Channel(websocket).run()